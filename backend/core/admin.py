@@ -4,12 +4,13 @@ from .models import User, School
 from .forms import UserAdminCreationForm, UserAdminChangeForm
 from .admin_views import bulk_upload_students, complete_user_data_view
 from django.utils.html import format_html
+from django.utils import timezone
 from django.urls import reverse
 from .models import QuestionBank, SCQQuestion, MCQQuestion, FIBQuestion
 from ckeditor_uploader.widgets import CKEditorUploadingWidget
 from django.utils.safestring import mark_safe
 from django.shortcuts import redirect , render , get_object_or_404
-from .models import Quiz, QuizQuestionAssignment, StudentQuizAttempt
+from .models import Quiz, QuizQuestionAssignment, StudentQuizAttempt, RosterImportJob, OutboundEmail, PeriodicJobRun, PeriodicJobState
 from .models import (
     Grade, Subject, Chapter, Topic, Week, TopicQuiz, WeekQuiz,
     TopicProgress, WeekProgress
@@ -394,6 +395,7 @@ class FIBQuestionAdmin(admin.ModelAdmin):
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
+from django.utils import timezone
 from django.shortcuts import redirect
 from django.http import HttpResponseRedirect
 from .models import Quiz
@@ -467,6 +469,66 @@ class StudentQuizAttemptAdmin(admin.ModelAdmin):
     list_display = ['student', 'quiz', 'started_at', 'completed_at']
     list_filter = ['quiz']
 
+@admin.register(RosterImportJob)
+class RosterImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'school', 'created_by', 'status', 'processed_rows', 'total_rows', 'uploaded', 'skipped', 'created_at']
+    list_filter = ['status']
+    readonly_fields = [
+        'school', 'created_by', 'allowed_roles', 'send_welcome_emails', 'status',
+        'total_rows', 'processed_rows', 'uploaded', 'skipped', 'errors', 'result',
+        'error_message', 'created_at', 'started_at', 'finished_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    # The body is never shown: welcome and password emails carry passwords.
+    exclude = ['body']
+    readonly_fields = [
+        'subject', 'from_email', 'recipients', 'status', 'attempts',
+        'next_attempt_at', 'claim_token', 'claimed_at', 'last_error', 'created_at', 'sent_at',
+    ]
+    actions = ['retry_now']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        # A sending row still belongs to a worker, and requeueing it would
+        # send it twice; finished rows have had their body cleared.
+        updated = queryset.exclude(
+            status__in=[OutboundEmail.STATUS_SENT, OutboundEmail.STATUS_SENDING],
+        ).exclude(body="").update(
+            status=OutboundEmail.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            claim_token=None,
+        )
+        self.message_user(request, f"🔁 {updated} email(s) queued for another attempt.")
+
+@admin.register(PeriodicJobState)
+class PeriodicJobStateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run_at', 'last_status', 'last_finished_at', 'locked_by', 'locked_until']
+    readonly_fields = ['name', 'locked_by', 'locked_until', 'last_started_at', 'last_finished_at', 'last_status']
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(PeriodicJobRun)
+class PeriodicJobRunAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'node', 'started_at', 'duration_ms']
+    list_filter = ['name', 'status']
+    readonly_fields = ['name', 'node', 'status', 'started_at', 'finished_at', 'duration_ms', 'output', 'error_message']
+
+    def has_add_permission(self, request):
+        return False
+
 @admin.register(Grade)
 class GradeAdmin(admin.ModelAdmin):
     list_display = ['name']
@@ -1,4 +1,3 @@
-import openpyxl
 import re
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
@@ -13,9 +12,7 @@ from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Case, When, IntegerField
 from django.utils.html import format_html
-from .forms import UploadSCQForm
 from .models import SCQQuestion, QuestionBank
-from core.forms import UploadSCQForm, UploadMCQForm, UploadFIBForm
 from core.models import (
     SCQQuestion, MCQQuestion, FIBQuestion, QuestionBank,
     QuizQuestionAssignment, Quiz, Topic, Week, TopicQuiz, WeekQuiz
@@ -34,6 +31,8 @@ from .models import Grade, Subject, Chapter
 from django.db.models.functions import Lower, Cast
 from django import forms
 from django.core.paginator import Paginator
+from core.backups import BACKUP_SUFFIX, create_backup, list_backup_files, restore_from_file
+from core.question_registry import register_questions
 from core.utils import send_account_notification_email  # ‚úÖ Add this at the top
 from django.db.models import Count, OuterRef, Subquery, IntegerField, Value, Case, When, F, Func, Q
 from django.db import transaction
@@ -42,7 +41,6 @@ from django.views.decorators.http import require_POST
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
 from django.http import FileResponse, HttpResponseRedirect
-from django.core.management import call_command
 from datetime import date  # ‚úÖ add this import at the top
 import io
 from django.http import HttpResponse
@@ -61,6 +59,16 @@ def bulk_upload_students(request):
             from core.roster_upload import import_roster_from_file
 
             file = request.FILES['excel_file']
+            if form.cleaned_data.get('run_in_background'):
+                from core.roster_import_jobs import enqueue_roster_import
+
+                job = enqueue_roster_import(file, created_by=request.user)
+                messages.success(
+                    request,
+                    f"⏳ Roster import #{job.id} queued. It will run in the background worker.",
+                )
+                return redirect('/admin/core/user/complete_user_data/')
+
             result = import_roster_from_file(file)
 
             for item in result["errors"]:
@@ -323,116 +331,6 @@ def complete_user_data_view(request):
         'today': date.today(),
     })
 
-def bulk_upload_scq(request, bank_id):
-    bank = QuestionBank.objects.get(id=bank_id)
-
-    if bank.question_type != 'SCQ':
-        messages.error(request, "Invalid bank type. This bank only supports SCQs.")
-        return redirect('admin:core_questionbanktitle_changelist')
-
-    if request.method == 'POST':
-        form = UploadSCQForm(request.POST, request.FILES)
-        if form.is_valid():
-            file = request.FILES['file']
-            wb = openpyxl.load_workbook(file)
-            sheet = wb.active
-
-            rows_added = 0
-            for row in sheet.iter_rows(min_row=2, values_only=True):  # Skip header
-                question_text, option_1, option_2, option_3, option_4, correct_answer = row
-                SCQQuestion.objects.create(
-                    question_bank=bank,
-                    question_text=question_text,
-                    option_1=option_1,
-                    option_2=option_2,
-                    option_3=option_3,
-                    option_4=option_4,
-                    correct_answer=correct_answer
-                )
-                rows_added += 1
-
-            messages.success(request, f"{rows_added} SCQ questions uploaded successfully!")
-            return redirect('admin-question-bank')
-    else:
-        form = UploadSCQForm(initial={'question_bank_id': bank.id})
-
-    return render(request, 'admin/core/scq_upload_form.html', {'form': form, 'bank': bank})
-
-def bulk_upload_mcq(request, bank_id):
-    bank = QuestionBank.objects.get(id=bank_id)
-
-    if bank.question_type != 'MCQ':
-        messages.error(request, "Invalid bank type. This bank only supports MCQs.")
-        return redirect('admin:core_questionbanktitle_changelist')
-
-    if request.method == 'POST':
-        form = UploadMCQForm(request.POST, request.FILES)
-        if form.is_valid():
-            file = request.FILES['file']
-            wb = openpyxl.load_workbook(file)
-            sheet = wb.active
-
-            rows_added = 0
-            for row in sheet.iter_rows(min_row=2, values_only=True):  # Skip header
-                question_text, option_1, option_2, option_3, option_4, correct_answers = row
-
-                # Parse correct_answers like "A,C"
-                correct_list = [opt.strip().upper() for opt in correct_answers.split(',') if opt.strip()]
-
-                MCQQuestion.objects.create(
-                    question_bank=bank,
-                    question_text=question_text,
-                    option_1=option_1,
-                    option_2=option_2,
-                    option_3=option_3,
-                    option_4=option_4,
-                    correct_answers=correct_list,
-                )
-                rows_added += 1
-
-            messages.success(request, f"{rows_added} MCQ questions uploaded successfully!")
-            return redirect('admin-question-bank')
-    else:
-        form = UploadMCQForm(initial={'question_bank_id': bank.id})
-
-    return render(request, 'admin/core/mcq_upload_form.html', {'form': form, 'bank': bank})
-
-# core/admin_views.py
-
-def bulk_upload_fib(request, bank_id):
-    bank = QuestionBank.objects.get(id=bank_id)
-
-    if bank.question_type != 'FIB':
-        messages.error(request, "This bank only supports FIB questions.")
-        return redirect('admin:core_questionbanktitle_changelist')
-
-    if request.method == 'POST':
-        form = UploadFIBForm(request.POST, request.FILES)
-        if form.is_valid():
-            file = request.FILES['file']
-            wb = openpyxl.load_workbook(file)
-            sheet = wb.active
-
-            rows_added = 0
-            for row in sheet.iter_rows(min_row=2, values_only=True):  # Skip header
-                question_text, correct_answers = row
-                answer_list = [ans.strip() for ans in correct_answers.split(',') if ans.strip()]
-
-                FIBQuestion.objects.create(
-                    question_bank=bank,
-                    question_text=question_text,
-                    correct_answers=answer_list,
-                )
-                rows_added += 1
-
-            messages.success(request, f"{rows_added} FIB questions uploaded successfully!")
-            return redirect('admin-question-bank')
-    else:
-        form = UploadFIBForm(initial={'question_bank_id': bank.id})
-
-    return render(request, 'admin/core/fib_upload_form.html', {'form': form, 'bank': bank})
-
-
 def preview_questions(request, bank_id):
     bank = get_object_or_404(QuestionBank, id=bank_id)
     questions = []
@@ -619,33 +517,19 @@ def admin_list_quizzes_view(request):
 def list_backups(request):
     """
     GET  -> Show backups on disk.
-    POST -> Create a fresh JSON backup ON DISK and redirect back to the list.
+    POST -> Create a fresh compressed backup ON DISK and redirect back to the list.
     """
-    backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
-    os.makedirs(backup_dir, exist_ok=True)
-
     if request.method == "POST":
-        timestamp = timezone.localtime(timezone.now()).strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"backup_{timestamp}.json"
-        filepath = os.path.join(backup_dir, filename)
-
-        # ✅ Dump straight to disk (NOT in memory)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            call_command(
-                'dumpdata',
-                '--natural-primary', '--natural-foreign',
-                # ✅ REMOVE indent to keep file smaller & faster
-                stdout=f
-            )
-
-        messages.success(request, f"Backup '{filename}' created successfully.")
+        # ✅ Streams model by model into a .jsonl.gz file (NOT in memory)
+        record = create_backup()
+        messages.success(
+            request,
+            f"Backup '{record.filename}' created successfully ({record.size_bytes / 1024:.1f} KiB).",
+        )
         return redirect("list_backups")
 
-    backup_files = [f for f in os.listdir(backup_dir) if f.endswith('.json')]
-    backup_files.sort(reverse=True)
-
     return render(request, 'admin/backups.html', {
-        'backup_files': backup_files
+        'backup_files': list_backup_files()
     })
 
 
@@ -676,7 +560,7 @@ def restore_backup(request, filename):
         messages.error(request, "Backup file not found.")
     else:
         try:
-            call_command('loaddata', filepath)
+            restore_from_file(filepath)
             messages.success(request, f"{filename} restored successfully.")
         except Exception as e:
             messages.error(request, f"Restore failed: {str(e)}")
@@ -773,6 +657,52 @@ def delete_question_bank(request, bank_id):
 
     return render(request, 'admin/core/confirm_delete_question_bank.html', {'bank': bank})
 
+QUESTION_MODELS_BY_BANK_TYPE = {
+    'SCQ': SCQQuestion,
+    'MCQ': MCQQuestion,
+    'FIB': FIBQuestion,
+}
+
+
+def next_copy_title(base_title):
+    """
+    First free title in the sequence "… (Copy)", "… (Copy 2)", "… (Copy 3)",
+    worked out from a single query over the existing copies.
+    """
+    taken = set(
+        QuestionBank.objects.filter(title__startswith=f"{base_title} (Copy")
+        .values_list('title', flat=True)
+    )
+    title_candidate = f"{base_title} (Copy)"
+    counter = 2
+    while title_candidate in taken:
+        title_candidate = f"{base_title} (Copy {counter})"
+        counter += 1
+    return title_candidate
+
+
+def clone_bank_questions(original, new_bank):
+    """
+    Copy every question of `original` into `new_bank` with one SELECT and a
+    bulk_create. Each copy gets a fresh question_id so there are no clashes.
+    """
+    model = QUESTION_MODELS_BY_BANK_TYPE.get(original.type)
+    if model is None:
+        return 0
+
+    copied_fields = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname not in ('id', 'question_id', 'question_bank_id')
+    ]
+    copies = [
+        model(question_id=uuid.uuid4(), question_bank=new_bank, **values)
+        for values in model.objects.filter(question_bank=original).order_by('id').values(*copied_fields)
+    ]
+    model.objects.bulk_create(copies)
+    register_questions(original.type.lower(), copies)
+    return len(copies)
+
+
 @staff_member_required
 def duplicate_question_bank(request, bank_id):
     """
@@ -782,67 +712,12 @@ def duplicate_question_bank(request, bank_id):
     """
     original = get_object_or_404(QuestionBank, id=bank_id)
 
-    # ----- 1. Create the new QuestionBank -----
-    base_title = original.title
-
-    # First candidate: "Title (Copy)"
-    title_candidate = f"{base_title} (Copy)"
-    counter = 2
-    while QuestionBank.objects.filter(title=title_candidate).exists():
-        title_candidate = f"{base_title} (Copy {counter})"
-        counter += 1
-
-    # Copy basic fields
-    new_bank = QuestionBank()
-    new_bank.title = title_candidate
-
-    # Your project sometimes uses `type` and sometimes `question_type`.
-    # We copy both if they exist, so it stays safe with your current model.
-    if hasattr(original, "type"):
-        new_bank.type = original.type
-    if hasattr(original, "question_type"):
-        new_bank.question_type = original.question_type
-
-    # If you have any other simple fields you want to carry over
-    # (e.g. description, created_by, subject, etc.), copy them here similarly:
-    # new_bank.description = original.description
-
-    new_bank.save()
-
-    # Decide which question model to copy from
-    bank_type = getattr(original, "type", None) or getattr(original, "question_type", None)
-
-    # ----- 2. Duplicate questions based on bank type -----
-    # We always set a *new* question_id so there are no clashes.
-    if bank_type == "SCQ":
-        queryset = SCQQuestion.objects.filter(question_bank=original)
-        for q in queryset:
-            q.pk = None           # new DB row
-            q.id = None           # in case `id` is explicit
-            if hasattr(q, "question_id"):
-                q.question_id = uuid.uuid4()
-            q.question_bank = new_bank
-            q.save()
-
-    elif bank_type == "MCQ":
-        queryset = MCQQuestion.objects.filter(question_bank=original)
-        for q in queryset:
-            q.pk = None
-            q.id = None
-            if hasattr(q, "question_id"):
-                q.question_id = uuid.uuid4()
-            q.question_bank = new_bank
-            q.save()
-
-    elif bank_type == "FIB":
-        queryset = FIBQuestion.objects.filter(question_bank=original)
-        for q in queryset:
-            q.pk = None
-            q.id = None
-            if hasattr(q, "question_id"):
-                q.question_id = uuid.uuid4()
-            q.question_bank = new_bank
-            q.save()
+    with transaction.atomic():
+        new_bank = QuestionBank.objects.create(
+            title=next_copy_title(original.title),
+            type=original.type,
+        )
+        clone_bank_questions(original, new_bank)
 
     messages.success(
         request,
@@ -1387,16 +1262,16 @@ def week_detail_assign_view(request, week_id):
 @require_POST
 def upload_restore_backup(request):
     """
-    Accept a .json backup file from the admin, temporarily store it,
-    run loaddata to restore, then delete the temp file.
+    Accept a .jsonl.gz (or legacy .json) backup file from the admin,
+    temporarily store it, restore it, then delete the temp file.
     """
     file_obj = request.FILES.get('backup_file')
     if not file_obj:
         messages.error(request, "No file selected.")
         return redirect('list_backups')
 
-    if not file_obj.name.lower().endswith('.json'):
-        messages.error(request, "Please upload a .json backup file.")
+    if not file_obj.name.lower().endswith(('.json', BACKUP_SUFFIX)):
+        messages.error(request, "Please upload a .jsonl.gz or .json backup file.")
         return redirect('list_backups')
 
     # Save to MEDIA_ROOT/backups/tmp_<filename>
@@ -1412,7 +1287,7 @@ def upload_restore_backup(request):
 
     # Try restore
     try:
-        call_command('loaddata', temp_path)
+        restore_from_file(temp_path)
         messages.success(request, f"Backup '{file_obj.name}' restored successfully.")
     except Exception as e:
         messages.error(request, f"Restore failed: {str(e)}")
@@ -0,0 +1,223 @@
+"""
+Parsed answer keys for SCQ/MCQ/FIB questions, kept in a bounded in-process
+LRU/TTL cache keyed by question_id.
+
+A class usually takes the same quiz at the same time, so every answer
+submitted, finalized or graded for a report re-reads the same few dozen
+questions. The key holds what grading needs, already normalized, so a hit
+costs neither a query nor HTML parsing.
+
+Every question has a version token in the shared `catalog` cache, and each
+local entry remembers the token it was built under. Question saves and
+deletes (see signals) bump the token, so every worker on every host drops
+its copy on the next lookup; the tokens of a lookup are read with one
+get_many.
+"""
+import html
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+from cachetools import TTLCache
+from django.utils.html import strip_tags
+
+from core.cache_layer import ANSWER_KEYS, CATALOG, bump_namespace, namespace_versions, record
+from core.question_registry import QUESTION_MODELS, resolve_question_types
+from core.utils import normalize_numeric_commas, normalize_text
+
+ANSWER_KEY_CACHE_SIZE = 20_000
+ANSWER_KEY_TTL_SECONDS = 5 * 60
+
+_answer_keys = TTLCache(maxsize=ANSWER_KEY_CACHE_SIZE, ttl=ANSWER_KEY_TTL_SECONDS)
+_answer_keys_lock = threading.Lock()
+
+# Bumped by clear_answer_keys to drop every worker's keys at once.
+ALL_ANSWER_KEYS_NAMESPACE = "answer-keys"
+
+
+def answer_key_namespace(question_id):
+    return f"answer-key:{question_id}"
+
+
+def _current_versions(question_ids):
+    """{question_id: version token}, combining the global and per-question versions."""
+    namespaces = {question_id: answer_key_namespace(question_id) for question_id in question_ids}
+    versions = namespace_versions(CATALOG, [ALL_ANSWER_KEYS_NAMESPACE, *namespaces.values()])
+    everything = versions[ALL_ANSWER_KEYS_NAMESPACE]
+    return {question_id: (everything, versions[namespace]) for question_id, namespace in namespaces.items()}
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    question_id: str
+    question_type: str
+    # Plain-text question, for result pages.
+    question_text: str
+    # What result pages show as the right answer: the SCQ option text, the
+    # sorted normalized MCQ option texts, or the FIB answers dict.
+    correct_answer: object
+    # Normalized form compared against normalized student answers.
+    normalized: object
+    # Stored value compared verbatim by the legacy report graders: the SCQ
+    # label, the sorted MCQ labels, or the FIB answers dict.
+    raw: object
+
+
+def _normalize_fib(values):
+    return {
+        str(k).strip().lower(): normalize_numeric_commas(v)
+        for k, v in values.items()
+        if v and str(v).strip()
+    }
+
+
+def _build_key(question_type, question):
+    text = html.unescape(strip_tags(question.question_text)).strip()
+    if question_type == "scq":
+        option_map = {"A": question.option_a, "B": question.option_b, "C": question.option_c, "D": question.option_d}
+        correct_text = option_map.get((question.correct_answer or "").strip().upper())
+        normalized = normalize_text(correct_text) if correct_text else None
+        raw = question.correct_answer
+    elif question_type == "mcq":
+        option_map = {"a": question.option_a, "b": question.option_b, "c": question.option_c, "d": question.option_d}
+        labels = [x.strip().lower() for x in question.correct_answers.split(",")]
+        correct_text = sorted(normalize_text(option_map[label]) for label in labels if label in option_map)
+        normalized = correct_text
+        raw = sorted(x.strip() for x in question.correct_answers.split(","))
+    else:
+        correct_text = question.correct_answers
+        normalized = _normalize_fib(correct_text) if isinstance(correct_text, dict) else None
+        raw = question.correct_answers
+    return AnswerKey(
+        question_id=str(question.question_id),
+        question_type=question_type,
+        question_text=text,
+        correct_answer=correct_text,
+        normalized=normalized,
+        raw=raw,
+    )
+
+
+def get_answer_keys(question_ids, question_type=None):
+    """
+    Return {str(question_id): AnswerKey} for the ids that exist. Misses are
+    typed through the question registry (or taken as `question_type`) and
+    loaded with one query per type.
+    """
+    wanted = {str(question_id) for question_id in question_ids}
+    if not wanted:
+        return {}
+    # Read before loading, so a save racing with the load leaves the entry
+    # under a version that is already stale.
+    versions = _current_versions(wanted)
+    keys = {}
+    with _answer_keys_lock:
+        for question_id in wanted:
+            entry = _answer_keys.get(question_id)
+            if entry is not None and entry[0] == versions[question_id]:
+                keys[question_id] = entry[1]
+    missing = wanted - keys.keys()
+    record(ANSWER_KEYS, "hit", len(keys))
+    record(ANSWER_KEYS, "miss", len(missing))
+    if not missing:
+        return keys
+
+    if question_type is None:
+        types = resolve_question_types(missing)
+    else:
+        types = dict.fromkeys(missing, question_type)
+    ids_by_type = defaultdict(list)
+    for question_id, id_type in types.items():
+        ids_by_type[id_type].append(question_id)
+
+    loaded = {}
+    for id_type, ids in ids_by_type.items():
+        for question in QUESTION_MODELS[id_type].objects.filter(question_id__in=ids):
+            loaded[str(question.question_id)] = _build_key(id_type, question)
+    with _answer_keys_lock:
+        _answer_keys.update({question_id: (versions[question_id], key) for question_id, key in loaded.items()})
+    keys.update(loaded)
+    return keys
+
+
+def get_answer_keys_for_answers(answers):
+    """Keys for StudentAnswer rows, looking each up in its own type's table."""
+    ids_by_type = defaultdict(set)
+    for answer in answers:
+        if answer.question_type in QUESTION_MODELS:
+            ids_by_type[answer.question_type].add(answer.question_id)
+    keys = {}
+    for question_type, question_ids in ids_by_type.items():
+        keys.update(get_answer_keys(question_ids, question_type=question_type))
+    return keys
+
+
+def get_answer_key(question_id):
+    return get_answer_keys([question_id]).get(str(question_id))
+
+
+def answer_key_for(keys, question_id, question_type):
+    """The key for an answer from `keys`, or None if its stored type differs."""
+    key = keys.get(str(question_id))
+    if key is None or key.question_type != question_type:
+        return None
+    return key
+
+
+def invalidate_answer_keys(*question_ids):
+    """Drop the keys of `question_ids` in every process."""
+    bump_namespace(CATALOG, *(answer_key_namespace(question_id) for question_id in question_ids))
+    with _answer_keys_lock:
+        for question_id in question_ids:
+            _answer_keys.pop(str(question_id), None)
+
+
+def clear_answer_keys():
+    """Drop every key in every process."""
+    bump_namespace(CATALOG, ALL_ANSWER_KEYS_NAMESPACE)
+    with _answer_keys_lock:
+        _answer_keys.clear()
+
+
+def answer_key_cache_info():
+    """Size of this process's cache, for diagnostics."""
+    with _answer_keys_lock:
+        return {"size": len(_answer_keys), "maxsize": _answer_keys.maxsize, "ttl": _answer_keys.ttl}
+
+
+def grade_answer(key, answer_data):
+    """
+    Whether `answer_data` is right for `key`, comparing normalized text the
+    way quiz taking and finalization always have.
+    """
+    if key is None:
+        return False
+    if key.question_type == "scq":
+        selected = answer_data.get("selected") if isinstance(answer_data, dict) else answer_data
+        return normalize_text(selected) == key.normalized if selected and key.normalized else False
+    if key.question_type == "mcq":
+        selected = answer_data.get("selected", []) if isinstance(answer_data, dict) else answer_data
+        if isinstance(selected, str):
+            selected = [selected]
+        return sorted(normalize_text(x) for x in selected or []) == key.normalized
+    if key.question_type == "fib":
+        if isinstance(answer_data, dict) and key.normalized is not None:
+            return _normalize_fib(answer_data) == key.normalized
+        return False
+    return False
+
+
+def grade_answer_exact(key, answer_data):
+    """
+    Whether `answer_data` matches the stored key verbatim, as the student
+    results list and performance reports have always graded.
+    """
+    if key is None or not isinstance(answer_data, dict):
+        return False
+    if key.question_type == "scq":
+        return answer_data.get("selected") == key.raw
+    if key.question_type == "mcq":
+        return sorted(answer_data.get("selected") or []) == key.raw
+    if key.question_type == "fib":
+        return answer_data == key.raw
+    return False
@@ -0,0 +1,181 @@
+"""
+Packed answer sheets for completed attempts.
+
+A finished quiz leaves one StudentAnswer row per question. pack_answer_sheets
+folds an old attempt's rows into a single document on the attempt and
+deletes them:
+
+    {"v": 1, "ids": [question_id hex, ...], "types": "smf...",
+     "answers": [answer_data, ...], "correct": "101..."}
+
+`types` holds one letter per question (s/m/f), and `correct` the normalized
+grade each answer had when packed. Readers go through load_attempt_answers
+(or load_queryset_answers for reports over many attempts), which return the
+same SheetAnswer records for packed and unpacked attempts.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.answer_keys import answer_key_for, get_answer_keys_for_answers, grade_answer
+from core.models import StudentAnswer, StudentQuizAttempt
+
+SHEET_VERSION = 1
+PACK_AFTER = timedelta(days=30)
+PACK_BATCH_SIZE = 500
+# Attempt ids per StudentAnswer query, kept under database parameter limits.
+LOAD_BATCH_SIZE = 500
+
+TYPE_CODES = {"scq": "s", "mcq": "m", "fib": "f"}
+CODE_TYPES = {code: question_type for question_type, code in TYPE_CODES.items()}
+
+
+@dataclass(frozen=True)
+class SheetAnswer:
+    # A StudentQuizAttempt, or an ArchivedQuizAttempt (core.attempt_archive).
+    attempt: StudentQuizAttempt
+    question_id: uuid.UUID
+    question_type: str
+    answer_data: object
+    # Grade recorded when the sheet was packed; None for unpacked rows.
+    is_correct: bool = None
+
+
+def pack_answer_sheet(answers, answer_keys):
+    """The packed sheet for one attempt's StudentAnswer rows, in row order."""
+    return {
+        "v": SHEET_VERSION,
+        "ids": [answer.question_id.hex for answer in answers],
+        "types": "".join(TYPE_CODES[answer.question_type] for answer in answers),
+        "answers": [answer.answer_data for answer in answers],
+        "correct": "".join(
+            "1" if grade_answer(answer_key_for(answer_keys, answer.question_id, answer.question_type), answer.answer_data)
+            else "0"
+            for answer in answers
+        ),
+    }
+
+
+def unpack_answer_sheet(attempt, sheet):
+    return [
+        SheetAnswer(
+            attempt=attempt,
+            question_id=uuid.UUID(question_id),
+            question_type=CODE_TYPES[code],
+            answer_data=answer_data,
+            is_correct=correct == "1",
+        )
+        for question_id, code, answer_data, correct in zip(
+            sheet["ids"], sheet["types"], sheet["answers"], sheet["correct"]
+        )
+    ]
+
+
+def load_attempt_answers(attempts):
+    """
+    {attempt.id: [SheetAnswer, ...]} for `attempts`, read from their packed
+    sheets or, for attempts not yet packed, with one StudentAnswer query.
+    """
+    attempts = list(attempts)
+    answers = {attempt.id: [] for attempt in attempts}
+    unpacked = {}
+    for attempt in attempts:
+        if attempt.answer_sheet is not None:
+            answers[attempt.id] = unpack_answer_sheet(attempt, attempt.answer_sheet)
+        else:
+            unpacked[attempt.id] = attempt
+    unpacked_ids = list(unpacked)
+    for start in range(0, len(unpacked_ids), LOAD_BATCH_SIZE):
+        rows = StudentAnswer.objects.filter(attempt_id__in=unpacked_ids[start:start + LOAD_BATCH_SIZE]).order_by("id")
+        for row in rows:
+            answers[row.attempt_id].append(_row_answer(row, unpacked[row.attempt_id]))
+    return answers
+
+
+def _row_answer(row, attempt):
+    return SheetAnswer(
+        attempt=attempt,
+        question_id=row.question_id,
+        question_type=row.question_type,
+        answer_data=row.answer_data,
+    )
+
+
+def _related_paths(select_related, prefix):
+    """Flatten a QuerySet's select_related tree into lookups under `prefix`."""
+    if not isinstance(select_related, dict) or not select_related:
+        return [prefix]
+    return [
+        path
+        for field, nested in select_related.items()
+        for path in _related_paths(nested, f"{prefix}__{field}")
+    ]
+
+
+def load_queryset_answers(attempts):
+    """
+    Every answer of the `attempts` queryset as one flat list of SheetAnswers.
+
+    For reports over many attempts (a whole class): only packed attempts are
+    loaded with their sheets, and unpacked rows are read with the attempt
+    filter as a subquery rather than a list of ids. Related objects the
+    queryset selects are selected for each row's attempt too.
+    """
+    answers = []
+    for attempt in attempts.filter(answer_sheet__isnull=False):
+        answers.extend(unpack_answer_sheet(attempt, attempt.answer_sheet))
+    rows = (
+        StudentAnswer.objects.filter(attempt__in=attempts.filter(answer_sheet__isnull=True).values("id"))
+        .select_related(*_related_paths(attempts.query.select_related, "attempt"))
+        .order_by("attempt_id", "id")
+    )
+    answers.extend(_row_answer(row, row.attempt) for row in rows)
+    return answers
+
+
+def attempt_sheet_answers(attempt):
+    return load_attempt_answers([attempt])[attempt.id]
+
+
+def pack_answer_sheets(*, older_than=PACK_AFTER, batch_size=PACK_BATCH_SIZE):
+    """
+    Pack every attempt completed more than `older_than` ago and delete its
+    StudentAnswer rows, one transaction per batch. Returns
+    {"attempts": n, "answers": n}.
+    """
+    cutoff = timezone.now() - older_than
+    pending = StudentQuizAttempt.objects.filter(
+        completed_at__lt=cutoff, answer_sheet__isnull=True
+    ).order_by("id")
+    totals = {"attempts": 0, "answers": 0}
+    last_id = 0
+    while True:
+        attempts = list(pending.filter(id__gt=last_id).only("id")[:batch_size])
+        if not attempts:
+            break
+        last_id = attempts[-1].id
+        rows_by_attempt = {attempt.id: [] for attempt in attempts}
+        rows = list(StudentAnswer.objects.filter(attempt_id__in=rows_by_attempt).order_by("id"))
+        for row in rows:
+            rows_by_attempt[row.attempt_id].append(row)
+        answer_keys = get_answer_keys_for_answers(rows)
+
+        packed_at = timezone.now()
+        packed = []
+        for attempt in attempts:
+            attempt_rows = rows_by_attempt[attempt.id]
+            # Rows of a type the sheet cannot encode stay unpacked.
+            if any(row.question_type not in TYPE_CODES for row in attempt_rows):
+                continue
+            attempt.answer_sheet = pack_answer_sheet(attempt_rows, answer_keys)
+            attempt.answers_packed_at = packed_at
+            packed.append(attempt)
+        with transaction.atomic():
+            StudentQuizAttempt.objects.bulk_update(packed, ["answer_sheet", "answers_packed_at"])
+            StudentAnswer.objects.filter(attempt__in=packed).delete()
+        totals["attempts"] += len(packed)
+        totals["answers"] += sum(len(rows_by_attempt[attempt.id]) for attempt in packed)
+    return totals
@@ -0,0 +1,191 @@
+"""
+Archive tables for old quiz attempts.
+
+archive_attempts moves completed attempts older than the cutoff out of
+StudentQuizAttempt/StudentAnswer into ArchivedQuizAttempt, with the answers
+packed into the attempt's answer sheet, and adds them to the per student,
+subject and grade ArchivedAttemptSummary totals. Dashboards keep reading the
+live tables only, which hold the current academic year; student history
+(results lists, single result, quiz history, task completion, performance
+reports) reads both.
+
+Attempts that a question report points to stay live so the report keeps its
+link.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from core.answer_keys import answer_key_for, get_answer_keys_for_answers, grade_answer_exact
+from core.answer_sheets import TYPE_CODES, load_attempt_answers, pack_answer_sheet
+from core.latest_attempts import latest_attempts_queryset
+from core.models import ArchivedAttemptSummary, ArchivedQuizAttempt, StudentQuizAttempt
+
+ARCHIVE_BATCH_SIZE = 500
+
+
+def archive_cutoff():
+    return timezone.now() - timedelta(days=settings.ATTEMPT_ARCHIVE_AFTER_DAYS)
+
+
+def get_completed_attempt(attempt_id):
+    """The completed attempt with this id, live or archived, or None."""
+    attempt = StudentQuizAttempt.objects.filter(id=attempt_id, completed_at__isnull=False).first()
+    if attempt is None:
+        attempt = ArchivedQuizAttempt.objects.filter(id=attempt_id).first()
+    return attempt
+
+
+def completed_attempts_for(student):
+    """The student's completed attempts, live and archived, newest first."""
+    attempts = list(
+        StudentQuizAttempt.objects.filter(student=student, completed_at__isnull=False).select_related("quiz")
+    )
+    attempts += ArchivedQuizAttempt.objects.filter(student=student).select_related("quiz")
+    return sorted(attempts, key=lambda attempt: attempt.completed_at, reverse=True)
+
+
+def latest_completed_attempts_for(student, *related):
+    """
+    The student's latest completed attempt per quiz, live or archived, newest
+    first, with `related` selected. A quiz whose attempts were all archived
+    is represented by its newest archived attempt.
+    """
+    latest = {
+        attempt.quiz_id: attempt
+        for attempt in latest_attempts_queryset(student=student).select_related(*related)
+    }
+    archived = (
+        ArchivedQuizAttempt.objects.filter(student=student)
+        .defer("answer_sheet", "meta")
+        .select_related(*related)
+        .order_by("completed_at", "id")
+    )
+    for attempt in archived:
+        current = latest.get(attempt.quiz_id)
+        if current is None or (attempt.completed_at, attempt.id) > (current.completed_at, current.id):
+            latest[attempt.quiz_id] = attempt
+    return sorted(latest.values(), key=lambda attempt: attempt.completed_at, reverse=True)
+
+
+def completed_quiz_ids_for(student):
+    """Ids of the quizzes the student has completed, live or archived."""
+    live = StudentQuizAttempt.objects.filter(student=student, completed_at__isnull=False).values_list("quiz_id", flat=True)
+    archived = ArchivedQuizAttempt.objects.filter(student=student).values_list("quiz_id", flat=True)
+    return set(live.distinct()) | set(archived.distinct())
+
+
+def best_completed_attempt(student, quiz, exclude_id=None):
+    """The student's highest-scoring completed attempt at `quiz`, live or archived."""
+    candidates = [
+        StudentQuizAttempt.objects.filter(student=student, quiz=quiz, completed_at__isnull=False)
+        .select_related("student")
+        .exclude(id=exclude_id)
+        .order_by("-score")
+        .first(),
+        ArchivedQuizAttempt.objects.filter(student=student, quiz=quiz)
+        .defer("answer_sheet", "meta")
+        .order_by("-score")
+        .first(),
+    ]
+    candidates = [attempt for attempt in candidates if attempt is not None]
+    return max(candidates, key=lambda attempt: attempt.score, default=None)
+
+
+def _add_to_summaries(totals):
+    """Add {(student_id, subject_id, grade_id): Counter} to the summary rows."""
+    existing = {
+        (summary.student_id, summary.subject_id, summary.grade_id): summary
+        for summary in ArchivedAttemptSummary.objects.select_for_update().filter(
+            student_id__in={key[0] for key in totals}
+        )
+    }
+    changed, created = [], []
+    for (student_id, subject_id, grade_id), counts in totals.items():
+        summary = existing.get((student_id, subject_id, grade_id))
+        if summary is None:
+            summary = ArchivedAttemptSummary(student_id=student_id, subject_id=subject_id, grade_id=grade_id)
+            created.append(summary)
+        else:
+            changed.append(summary)
+        for field in ("attempts", "answers", "correct_answers", "score"):
+            setattr(summary, field, getattr(summary, field) + counts[field])
+        summary.updated_at = timezone.now()
+    ArchivedAttemptSummary.objects.bulk_create(created)
+    ArchivedAttemptSummary.objects.bulk_update(
+        changed, ["attempts", "answers", "correct_answers", "score", "updated_at"]
+    )
+
+
+def archive_attempts(*, before=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move attempts completed before `before` (default: ATTEMPT_ARCHIVE_AFTER_DAYS
+    ago) to the archive, one transaction per batch. Returns
+    {"attempts": n, "answers": n}.
+    """
+    before = before or archive_cutoff()
+    pending = StudentQuizAttempt.objects.filter(
+        completed_at__lt=before, question_reports__isnull=True
+    ).order_by("id")
+    totals = {"attempts": 0, "answers": 0}
+    last_id = 0
+    while True:
+        attempts = list(pending.filter(id__gt=last_id).select_related("quiz", "student")[:batch_size])
+        if not attempts:
+            break
+        last_id = attempts[-1].id
+        answers_by_attempt = load_attempt_answers(attempts)
+        answer_keys = get_answer_keys_for_answers(
+            answer for answers in answers_by_attempt.values() for answer in answers
+        )
+
+        archived_at = timezone.now()
+        archived = []
+        summary_totals = defaultdict(Counter)
+        for attempt in attempts:
+            answers = answers_by_attempt[attempt.id]
+            # Answers of a type the sheet cannot encode stay live.
+            if any(answer.question_type not in TYPE_CODES for answer in answers):
+                continue
+            archived.append(
+                ArchivedQuizAttempt(
+                    id=attempt.id,
+                    student_id=attempt.student_id,
+                    quiz_id=attempt.quiz_id,
+                    started_at=attempt.started_at,
+                    completed_at=attempt.completed_at,
+                    score=attempt.score,
+                    total=attempt.total,
+                    meta=attempt.meta,
+                    answer_sheet=attempt.answer_sheet or pack_answer_sheet(answers, answer_keys),
+                    archived_at=archived_at,
+                )
+            )
+            counts = summary_totals[(attempt.student_id, attempt.quiz.subject_id, attempt.quiz.grade_id)]
+            counts["attempts"] += 1
+            counts["answers"] += len(answers)
+            counts["correct_answers"] += sum(
+                1 for answer in answers
+                if grade_answer_exact(
+                    answer_key_for(answer_keys, answer.question_id, answer.question_type), answer.answer_data
+                )
+            )
+            counts["score"] += max(attempt.score, 0)
+
+        with transaction.atomic():
+            ArchivedQuizAttempt.objects.bulk_create(archived)
+            _add_to_summaries(summary_totals)
+            # Regular delete of the loaded attempts: the latest-attempt flag
+            # and school snapshots follow through the attempt signals, which
+            # find each student already loaded.
+            archived_ids = {attempt.id for attempt in archived}
+            collector = Collector(using=router.db_for_write(StudentQuizAttempt))
+            collector.collect([attempt for attempt in attempts if attempt.id in archived_ids])
+            collector.delete()
+        totals["attempts"] += len(archived)
+        totals["answers"] += sum(len(answers_by_attempt[attempt.id]) for attempt in archived)
+    return totals
@@ -0,0 +1,103 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.cache_layer import USERS, cached_get, get_cache
+
+# Cached user records are dropped on every User save/delete; the TTL only
+# bounds how long a record can survive a write that bypassed the signals
+# (queryset.update(), raw deletes).
+USER_CACHE_TTL_SECONDS = 60
+
+# A cached record holds every concrete user field except the password hash,
+# plus the school and grade rows, so views read the cached user (and
+# `user.school` / `user.grade`) without a query. Only the password loads on
+# demand.
+UNCACHED_USER_FIELDS = {"password"}
+CACHED_USER_RELATIONS = ("school", "grade")
+
+
+def user_cache_key(user_id):
+    return f"auth-user:v2:{user_id}"
+
+
+def _field_values(instance, exclude=()):
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in exclude
+    }
+
+
+def _from_field_values(model, values):
+    # from_db expects values in concrete-field order.
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+def invalidate_cached_users(*user_ids):
+    get_cache(USERS).delete_many([user_cache_key(user_id) for user_id in user_ids if user_id])
+
+
+class SchoolAwareJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps a copy of each user in the `users` cache for
+    a short TTL, so chatty endpoints (submit_answer on every click)
+    skip the user lookup. On a miss the user is loaded with its school and grade in
+    the same query, so permission checks and views can read `user.school` /
+    `user.grade` without further lookups.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = self._get_cached_user(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.select_related("school", "grade").get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self._cache_user(user_id, user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def _cacheable(self):
+        # The cached record is keyed by primary key and has no password hash.
+        return api_settings.USER_ID_FIELD == "id" and not api_settings.CHECK_REVOKE_TOKEN
+
+    def _get_cached_user(self, user_id):
+        if not self._cacheable():
+            return None
+        record = cached_get(USERS, user_cache_key(user_id))
+        if record is None:
+            return None
+        user = _from_field_values(self.user_model, record["user"])
+        for name in CACHED_USER_RELATIONS:
+            field = self.user_model._meta.get_field(name)
+            values = record[name]
+            field.set_cached_value(user, _from_field_values(field.related_model, values) if values else None)
+        return user
+
+    def _cache_user(self, user_id, user):
+        # `user` was loaded with its school and grade selected.
+        if self._cacheable():
+            record = {"user": _field_values(user, exclude=UNCACHED_USER_FIELDS)}
+            for name in CACHED_USER_RELATIONS:
+                related = getattr(user, name)
+                record[name] = _field_values(related) if related is not None else None
+            get_cache(USERS).set(user_cache_key(user_id), record, USER_CACHE_TTL_SECONDS)
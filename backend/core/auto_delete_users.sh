@@ -1,4 +0,0 @@
-#!/bin/bash
-cd "$(dirname "$0")/.."
-source venv/bin/activate
-python manage.py delete_expired_users
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""
+Streaming database backups.
+
+A backup is a gzip-compressed JSON-lines file: one header line, then one
+serialized object per line in the same shape `dumpdata` produces (natural
+keys included). Models are read in primary-key chunks and objects are
+restored in batches, so neither side holds the whole database in memory.
+
+Incremental backups only carry the append-heavy tables (attempts, answers,
+payments) changed since the previous backup, plus the schools, grades,
+subjects, chapters, quizzes and users created since then so those rows have
+their parents; restore the last full backup, then each later incremental one
+in order. Edits to existing parent rows are only in full backups. Attempts archived in between come
+back as archive rows, and restoring those removes the live copies an earlier
+backup brought back (SUPERSEDED_ON_RESTORE).
+"""
+import gzip
+import json
+import os
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, router, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.answer_keys import clear_answer_keys
+from core.cache_layer import ANALYTICS, CATALOG, USERS, get_cache
+from core.latest_attempts import refresh_latest_attempts
+from core.models import BackupRecord, StudentQuizAttempt
+
+BACKUP_FORMAT = "learnify-backup"
+BACKUP_FORMAT_VERSION = 1
+BACKUP_SUFFIX = ".jsonl.gz"
+BACKUP_CHUNK_SIZE = 2000
+RESTORE_BATCH_SIZE = 1000
+
+def _created_since(since, max_pk):
+    return Q(pk__gt=max_pk or 0)
+
+
+# label -> rows to include in an incremental backup, given the previous
+# backup's start time and the highest primary key it had seen.
+INCREMENTAL_MODELS = {
+    "core.School": _created_since,
+    "core.Grade": _created_since,
+    "core.Subject": _created_since,
+    "core.Chapter": _created_since,
+    "core.Quiz": _created_since,
+    "core.User": _created_since,
+    "core.StudentQuizAttempt": lambda since, max_pk: (
+        Q(pk__gt=max_pk or 0) | Q(completed_at__gte=since) | Q(answers_packed_at__gte=since)
+    ),
+    "core.StudentAnswer": lambda since, max_pk: Q(pk__gt=max_pk or 0) | Q(attempt__completed_at__gte=since),
+    "core.ArchivedQuizAttempt": lambda since, max_pk: Q(archived_at__gte=since),
+    "core.ArchivedAttemptSummary": lambda since, max_pk: Q(updated_at__gte=since),
+    "payments.Payment": lambda since, max_pk: Q(initiated_at__gte=since) | Q(completed_at__gte=since),
+}
+
+
+# label -> model whose row with the same primary key a restored row of
+# `label` replaces. Archiving keeps the attempt id and deletes the live
+# attempt, which no backup can carry as a row.
+SUPERSEDED_ON_RESTORE = {
+    "core.ArchivedQuizAttempt": "core.StudentQuizAttempt",
+}
+
+
+class BackupError(Exception):
+    pass
+
+
+def backup_dir():
+    path = os.path.join(settings.MEDIA_ROOT, "backups")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def backup_models():
+    """Every model dumpdata would include, ordered so dependencies come first."""
+    app_list = {
+        app_config: None
+        for app_config in apps.get_app_configs()
+        if app_config.models_module is not None
+    }
+    return [
+        model for model in serializers.sort_dependencies(app_list.items(), allow_cycles=True)
+        if not model._meta.proxy and router.allow_migrate_model("default", model)
+    ]
+
+
+def _chunk_queryset(model):
+    natural_fk_fields = [
+        field.name for field in model._meta.concrete_fields
+        if field.is_relation and hasattr(field.remote_field.model, "natural_key")
+    ]
+    queryset = model._base_manager.order_by("pk")
+    if natural_fk_fields:
+        queryset = queryset.select_related(*natural_fk_fields)
+    m2m_fields = [field.name for field in model._meta.many_to_many]
+    if m2m_fields:
+        queryset = queryset.prefetch_related(*m2m_fields)
+    return queryset
+
+
+def _iter_chunks(queryset, chunk_size):
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def _max_int_pks(models):
+    max_pks = {}
+    for model in models:
+        if model._meta.pk.get_internal_type() in ("AutoField", "BigAutoField", "SmallAutoField"):
+            max_pks[model._meta.label] = model._base_manager.aggregate(max_pk=Max("pk"))["max_pk"]
+    return max_pks
+
+
+def create_backup(*, incremental=False, chunk_size=BACKUP_CHUNK_SIZE):
+    """
+    Write a full (or incremental) backup and return its BackupRecord.
+    An incremental backup without any earlier backup raises BackupError.
+    """
+    started_at = timezone.now()
+    started = time.monotonic()
+    models = backup_models()
+    filters = {}
+    if incremental:
+        previous = BackupRecord.objects.filter(finished_at__isnull=False).order_by("-started_at").first()
+        if previous is None:
+            raise BackupError("No earlier backup to build an incremental backup on; take a full backup first.")
+        since = parse_datetime(previous.watermarks["since"])
+        max_pks = previous.watermarks.get("max_pks", {})
+        models = [model for model in models if model._meta.label in INCREMENTAL_MODELS]
+        filters = {
+            model._meta.label: INCREMENTAL_MODELS[model._meta.label](since, max_pks.get(model._meta.label))
+            for model in models
+        }
+
+    kind = BackupRecord.KIND_INCREMENTAL if incremental else BackupRecord.KIND_FULL
+    stamp = timezone.localtime(started_at).strftime("%Y-%m-%d_%H-%M-%S")
+    filename = f"backup_{stamp}_{kind}_{uuid.uuid4().hex[:6]}{BACKUP_SUFFIX}"
+    path = os.path.join(backup_dir(), filename)
+    watermarks = {"since": started_at.isoformat(), "max_pks": _max_int_pks(models)}
+
+    row_count = 0
+    temp_path = f"{path}.part"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as out:
+        out.write(json.dumps({
+            "format": BACKUP_FORMAT,
+            "version": BACKUP_FORMAT_VERSION,
+            "kind": kind,
+            "created_at": started_at.isoformat(),
+        }) + "\n")
+        for model in models:
+            queryset = _chunk_queryset(model)
+            if model._meta.label in filters:
+                queryset = queryset.filter(filters[model._meta.label])
+            for chunk in _iter_chunks(queryset, chunk_size):
+                for item in serializers.serialize(
+                    "python",
+                    chunk,
+                    use_natural_foreign_keys=True,
+                    use_natural_primary_keys=True,
+                ):
+                    out.write(json.dumps(item, cls=DjangoJSONEncoder) + "\n")
+                row_count += len(chunk)
+    os.replace(temp_path, path)
+
+    return BackupRecord.objects.create(
+        kind=kind,
+        filename=filename,
+        started_at=started_at,
+        finished_at=timezone.now(),
+        size_bytes=os.path.getsize(path),
+        row_count=row_count,
+        watermarks={**watermarks, "duration_seconds": round(time.monotonic() - started, 2)},
+    )
+
+
+def _load_batch(batch, deferred, models_seen, attempt_pairs):
+    superseded = {}
+    for obj in serializers.deserialize("python", batch, handle_forward_references=True):
+        obj.save()
+        models_seen.add(type(obj.object))
+        if isinstance(obj.object, StudentQuizAttempt):
+            attempt_pairs.add((obj.object.student_id, obj.object.quiz_id))
+        if obj.deferred_fields:
+            deferred.append(obj)
+        label = SUPERSEDED_ON_RESTORE.get(obj.object._meta.label)
+        if label:
+            superseded.setdefault(label, []).append(obj.object.pk)
+    for label, pks in superseded.items():
+        apps.get_model(label)._base_manager.filter(pk__in=pks).delete()
+    return len(batch)
+
+
+def restore_streaming_backup(path, *, batch_size=RESTORE_BATCH_SIZE):
+    """
+    Load a .jsonl.gz backup in batches inside one transaction, like loaddata
+    but without reading the whole file. Returns the number of objects loaded.
+    The latest-attempt flags of every restored (student, quiz) pair are
+    recomputed at the end, since raw saves skip that receiver.
+    """
+    loaded = 0
+    models_seen = set()
+    deferred = []
+    attempt_pairs = set()
+    with gzip.open(path, "rt", encoding="utf-8") as backup:
+        header = json.loads(backup.readline() or "{}")
+        if header.get("format") != BACKUP_FORMAT:
+            raise BackupError("Not a Learnify backup file.")
+
+        with transaction.atomic(), connection.constraint_checks_disabled():
+            batch = []
+            for line in backup:
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    loaded += _load_batch(batch, deferred, models_seen, attempt_pairs)
+                    batch = []
+            if batch:
+                loaded += _load_batch(batch, deferred, models_seen, attempt_pairs)
+            for obj in deferred:
+                obj.save_deferred_fields()
+            refresh_latest_attempts(attempt_pairs)
+            connection.check_constraints(table_names=[model._meta.db_table for model in models_seen])
+
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), models_seen)
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for statement in sequence_sql:
+                cursor.execute(statement)
+    clear_caches_after_restore()
+    return loaded
+
+
+def clear_caches_after_restore():
+    """
+    Drop every cached copy of restored data. Restores save with raw=True,
+    and the cache invalidation receivers skip raw saves instead of running
+    a query per restored row.
+    """
+    for name in (CATALOG, ANALYTICS, USERS):
+        get_cache(name).clear()
+    clear_answer_keys()
+
+
+def restore_from_file(path):
+    """Restore a streaming backup, or a legacy dumpdata .json file via loaddata."""
+    if path.endswith(BACKUP_SUFFIX):
+        return restore_streaming_backup(path)
+    with transaction.atomic():
+        call_command("loaddata", path)
+        refresh_latest_attempts(StudentQuizAttempt.objects.values_list("student_id", "quiz_id").distinct())
+    clear_caches_after_restore()
+    return None
+
+
+def list_backup_files():
+    return sorted(
+        (name for name in os.listdir(backup_dir()) if name.endswith((".json", BACKUP_SUFFIX))),
+        reverse=True,
+    )
@@ -0,0 +1,166 @@
+"""
+Named caches shared by all workers (see CACHES in settings).
+
+- `catalog`: grades, subjects and quizzes, and the versions of the
+  in-process answer keys (core.answer_keys); changes rarely.
+- `analytics`: per-school dashboards and reports.
+- `users`: short-lived authenticated user records.
+- `answers`: write-behind answer buffers (core.student_answers); not counted.
+
+Per-school data lives in a versioned namespace: every key embeds the school's
+current version token, so `bump_namespace` drops everything for a school at
+once without having to know the keys. Hits and misses are counted per cache
+name and flushed to the default cache every few events, so `cache_stats`
+reports totals across workers.
+"""
+import threading
+import uuid
+from collections import Counter
+
+from django.core.cache import caches
+
+CATALOG = "catalog"
+ANALYTICS = "analytics"
+USERS = "users"
+ANSWERS = "answers"
+# Counted like the named caches, but held in process (core.answer_keys).
+ANSWER_KEYS = "answer_keys"
+STATS_NAMES = (CATALOG, ANALYTICS, USERS, ANSWER_KEYS)
+
+STATS_FLUSH_EVERY = 100
+
+_MISSING = object()
+_pending_stats = Counter()
+_pending_lock = threading.Lock()
+
+
+def get_cache(name):
+    return caches[name]
+
+
+# -------------------------------------------------------------------
+# Hit/miss counters
+# -------------------------------------------------------------------
+def _stats_key(name, outcome):
+    return f"cache-stats:{name}:{outcome}"
+
+
+def record(name, outcome, count=1):
+    """Count `count` cache outcomes ("hit" or "miss") for the `name` cache."""
+    if not count:
+        return
+    with _pending_lock:
+        _pending_stats[(name, outcome)] += count
+        if sum(_pending_stats.values()) < STATS_FLUSH_EVERY:
+            return
+    flush_stats()
+
+
+def flush_stats():
+    """Add this process's pending counts to the shared totals."""
+    with _pending_lock:
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+    shared = caches["default"]
+    for (name, outcome), count in pending.items():
+        key = _stats_key(name, outcome)
+        # add+incr is not atomic on every backend; an occasional lost
+        # increment is acceptable for statistics.
+        shared.add(key, 0, None)
+        try:
+            shared.incr(key, count)
+        except ValueError:
+            shared.set(key, count, None)
+
+
+def cache_stats(names=None):
+    """Return {name: {"hits", "misses", "hit_rate"}} across all workers."""
+    flush_stats()
+    shared = caches["default"]
+    stats = {}
+    for name in names or STATS_NAMES:
+        hits = shared.get(_stats_key(name, "hit"), 0)
+        misses = shared.get(_stats_key(name, "miss"), 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def reset_cache_stats(names=None):
+    with _pending_lock:
+        _pending_stats.clear()
+    caches["default"].delete_many(
+        [_stats_key(name, outcome) for name in names or STATS_NAMES for outcome in ("hit", "miss")]
+    )
+
+
+# -------------------------------------------------------------------
+# Counted reads
+# -------------------------------------------------------------------
+def cached_get(name, key, default=None):
+    value = get_cache(name).get(key, _MISSING)
+    record(name, "miss" if value is _MISSING else "hit")
+    return default if value is _MISSING else value
+
+
+def cached_get_or_build(name, key, builder, timeout=_MISSING):
+    """
+    Return the cached value for `key`, calling `builder()` and storing its
+    result on a miss. `timeout` defaults to the cache's configured TIMEOUT.
+    """
+    cache = get_cache(name)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        record(name, "hit")
+        return value
+    record(name, "miss")
+    value = builder()
+    if timeout is _MISSING:
+        cache.set(key, value)
+    else:
+        cache.set(key, value, timeout)
+    return value
+
+
+# -------------------------------------------------------------------
+# Versioned namespaces
+# -------------------------------------------------------------------
+def school_namespace(school_id):
+    return f"school:{school_id}"
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def namespace_version(name, namespace):
+    return namespace_versions(name, [namespace])[namespace]
+
+
+def namespace_versions(name, namespaces):
+    """{namespace: current version token}, read with one get_many."""
+    cache = get_cache(name)
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    for key, namespace in keys.items():
+        if namespace not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[namespace] = cache.get(key)
+    return versions
+
+
+def namespaced_key(name, namespace, *parts):
+    """A key inside `namespace` that stops matching once it is bumped."""
+    version = namespace_version(name, namespace)
+    return ":".join([namespace, version, *(str(part) for part in parts)])
+
+
+def bump_namespace(name, *namespaces):
+    """Drop everything cached under `namespaces` in the `name` cache."""
+    cache = get_cache(name)
+    for namespace in set(namespaces):
+        cache.set(_version_key(namespace), uuid.uuid4().hex, None)
@@ -0,0 +1,152 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 60
+OUTBOX_RETRY_MAX_SECONDS = 60 * 60
+# A row left in "sending" this long belongs to a worker that died mid-batch.
+OUTBOX_STALE_CLAIM = timedelta(minutes=15)
+
+
+def queue_email(subject, body, recipient_list, *, from_email=None):
+    """Write an email to the outbox; the sender worker delivers it later."""
+    recipients = [address for address in (recipient_list or []) if address]
+    if not recipients:
+        return None
+    return OutboundEmail.objects.create(
+        subject=subject[:255],
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=recipients,
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1 min, 2 min, 4 min, ... capped at an hour."""
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_due_emails(limit=OUTBOX_BATCH_SIZE):
+    """
+    Mark up to `limit` due emails as sending under a fresh claim token and
+    return them. The conditional UPDATE keeps concurrent workers from
+    claiming the same rows.
+    """
+    now = timezone.now()
+    due = Q(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now) | Q(
+        status=OutboundEmail.STATUS_SENDING,
+        claimed_at__lt=now - OUTBOX_STALE_CLAIM,
+    )
+    ids = list(
+        OutboundEmail.objects.filter(due)
+        .order_by("next_attempt_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4()
+    OutboundEmail.objects.filter(due, id__in=ids).update(
+        status=OutboundEmail.STATUS_SENDING,
+        claim_token=token,
+        claimed_at=now,
+    )
+    return list(OutboundEmail.objects.filter(claim_token=token).order_by("id"))
+
+
+def _record_failure(email, error):
+    attempts = email.attempts + 1
+    changes = {}
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        status = OutboundEmail.STATUS_FAILED
+        next_attempt_at = email.next_attempt_at
+        # Bodies can carry account passwords; keep none once delivery is over.
+        changes["body"] = ""
+    else:
+        status = OutboundEmail.STATUS_PENDING
+        next_attempt_at = timezone.now() + retry_delay(attempts)
+    OutboundEmail.objects.filter(id=email.id).update(
+        status=status,
+        attempts=attempts,
+        next_attempt_at=next_attempt_at,
+        claim_token=None,
+        last_error=str(error)[:1000],
+        **changes,
+    )
+    return status
+
+
+def _release_claim(emails, error):
+    """
+    Hand claimed emails back untouched when no send was tried, e.g. the mail
+    server was unreachable, so an outage does not use up their attempts.
+    """
+    OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(
+        status=OutboundEmail.STATUS_PENDING,
+        next_attempt_at=timezone.now() + retry_delay(1),
+        claim_token=None,
+        last_error=str(error)[:1000],
+    )
+
+
+def send_outbox_batch(limit=OUTBOX_BATCH_SIZE):
+    """
+    Deliver one batch of due emails over a single SMTP connection. Failed
+    sends are rescheduled with backoff and marked failed after
+    OUTBOX_MAX_ATTEMPTS; if the connection cannot be opened the whole batch
+    is rescheduled without using an attempt. Returns counts of sent, retried
+    and failed emails.
+    """
+    stats = {"sent": 0, "retried": 0, "failed": 0}
+    emails = claim_due_emails(limit)
+    if not emails:
+        return stats
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Outbox could not connect to the mail server: %s", exc)
+        _release_claim(emails, exc)
+        stats["retried"] = len(emails)
+        return stats
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                logger.warning("Outbox email %s failed: %s", email.id, exc)
+                status = _record_failure(email, exc)
+                stats["failed" if status == OutboundEmail.STATUS_FAILED else "retried"] += 1
+                continue
+            OutboundEmail.objects.filter(id=email.id).update(
+                status=OutboundEmail.STATUS_SENT,
+                attempts=email.attempts + 1,
+                body="",
+                claim_token=None,
+                last_error="",
+                sent_at=timezone.now(),
+            )
+            stats["sent"] += 1
+    finally:
+        connection.close()
+    return stats
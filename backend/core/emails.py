@@ -1,23 +1,16 @@
 # backend/core/emails.py
-from django.conf import settings
-from django.core.mail import send_mail
+from core.email_outbox import queue_email
 
 
 FRONTEND_LOGIN_URL = "https://www.learnifypakistan.com/login"
 SUPPORT_EMAIL = "info@learnifypakistan.com"
 
 def _safe_send(subject: str, message: str, recipient_list: list[str]) -> None:
-    """Send an email safely without blocking on errors."""
+    """Queue an email in the outbox without blocking on errors."""
     if not recipient_list:
         return
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipient_list,
-            fail_silently=True,
-        )
+        queue_email(subject, message, recipient_list)
     except Exception:
         pass
 
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce, NullIf
+
+from core.models import ExpiryReminder, OutboundEmail, School, User
+
+EXPIRY_REMINDER_DAYS = 5
+EXPIRY_REMINDER_CHUNK_SIZE = 500
+
+
+def user_reminder_message(full_name, expiry):
+    subject = "📢 Reminder: Your Learnify Pakistan subscription is expiring soon!"
+    message = (
+        f"Dear {full_name},\n\n"
+        f"Your subscription is set to expire on {expiry}.\n"
+        f"Please renew your subscription to continue enjoying access to quizzes, reports, and awards.\n\n"
+        "Visit your Learnify account to renew now.\n\n"
+        "Thank you,\n"
+        "Team Learnify Pakistan"
+    )
+    return subject, message
+
+
+def school_reminder_message(school_name, expiry):
+    subject = "📢 Reminder: Your school's Learnify Pakistan license is expiring soon!"
+    message = (
+        f"Dear {school_name} team,\n\n"
+        f"Your school license is set to expire on {expiry}.\n"
+        "Your teachers and students will lose access to quizzes and reports after that date.\n"
+        "Please renew from the school dashboard to avoid any interruption.\n\n"
+        "Thank you,\n"
+        "Team Learnify Pakistan"
+    )
+    return subject, message
+
+
+def _flush(reminders, emails):
+    if not reminders:
+        return 0
+    with transaction.atomic():
+        ExpiryReminder.objects.bulk_create(reminders)
+        OutboundEmail.objects.bulk_create(emails)
+    count = len(reminders)
+    reminders.clear()
+    emails.clear()
+    return count
+
+
+def _queue(rows, build_reminder, build_message, chunk_size):
+    queued = 0
+    reminders, emails = [], []
+    for object_id, email, name, expiry in rows:
+        subject, body = build_message(name, expiry)
+        reminders.append(build_reminder(object_id, expiry))
+        emails.append(OutboundEmail(
+            subject=subject,
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipients=[email],
+        ))
+        if len(reminders) >= chunk_size:
+            queued += _flush(reminders, emails)
+    return queued + _flush(reminders, emails)
+
+
+def queue_expiry_reminders(target_date, *, chunk_size=EXPIRY_REMINDER_CHUNK_SIZE):
+    """
+    Queue reminder emails for independent users and schools whose
+    subscription ends on `target_date`. Each reminder is recorded next to its
+    outbox email in the same transaction, and already-reminded recipients are
+    excluded in the query, so reruns queue nothing twice.
+
+    School-managed users are covered by their school's reminder.
+    """
+    users = (
+        User.objects.filter(subscription_expiry=target_date, school__isnull=True)
+        .exclude(email__isnull=True)
+        .exclude(email="")
+        .exclude(id__in=ExpiryReminder.objects.filter(
+            expiry_date=target_date,
+            user__isnull=False,
+        ).values("user_id"))
+        .annotate(display_name=Coalesce(NullIf("full_name", Value("")), "username"))
+        .order_by("id")
+        .values_list("id", "email", "display_name", "subscription_expiry")
+    )
+    schools = (
+        School.objects.filter(subscription_expiry=target_date)
+        .exclude(contact_email="")
+        .exclude(id__in=ExpiryReminder.objects.filter(
+            expiry_date=target_date,
+            school__isnull=False,
+        ).values("school_id"))
+        .order_by("id")
+        .values_list("id", "contact_email", "name", "subscription_expiry")
+    )
+
+    return {
+        "users": _queue(
+            users.iterator(chunk_size=chunk_size),
+            lambda user_id, expiry: ExpiryReminder(user_id=user_id, expiry_date=expiry),
+            user_reminder_message,
+            chunk_size,
+        ),
+        "schools": _queue(
+            schools.iterator(chunk_size=chunk_size),
+            lambda school_id, expiry: ExpiryReminder(school_id=school_id, expiry_date=expiry),
+            school_reminder_message,
+            chunk_size,
+        ),
+    }
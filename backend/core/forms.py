@@ -38,6 +38,7 @@ class UserAdminChangeForm(UserChangeForm):
 
 class UploadForm(forms.Form):
     excel_file = forms.FileField()
+    run_in_background = forms.BooleanField(required=False)
 
 
 class SelfRegistrationForm(forms.ModelForm):
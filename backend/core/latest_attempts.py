@@ -0,0 +1,54 @@
+from django.db import transaction
+
+from core.models import StudentQuizAttempt
+
+
+def refresh_latest_attempt(student_id, quiz_id):
+    """
+    Point the is_latest flag of one (student, quiz) pair at its most recently
+    completed attempt. Returns the id of that attempt, or None.
+
+    The pair's rows are locked first, so concurrent refreshes (two tabs
+    finalizing, a finalize racing a delete) apply one after the other
+    instead of both leaving their own attempt flagged.
+    """
+    with transaction.atomic():
+        pair_qs = StudentQuizAttempt.objects.filter(student_id=student_id, quiz_id=quiz_id)
+        rows = list(pair_qs.select_for_update().values_list("id", "completed_at", "is_latest"))
+        completed = [(completed_at, attempt_id) for attempt_id, completed_at, _ in rows if completed_at is not None]
+        latest_id = max(completed)[1] if completed else None
+
+        flagged = {attempt_id for attempt_id, _, is_latest in rows if is_latest}
+        if flagged - {latest_id}:
+            pair_qs.filter(id__in=flagged - {latest_id}).update(is_latest=False)
+        if latest_id is not None and latest_id not in flagged:
+            pair_qs.filter(id=latest_id).update(is_latest=True)
+
+    return latest_id
+
+
+def refresh_latest_attempts(pairs):
+    """refresh_latest_attempt for each (student_id, quiz_id), e.g. after a restore."""
+    for student_id, quiz_id in set(pairs):
+        refresh_latest_attempt(student_id, quiz_id)
+
+
+def latest_attempts_queryset(**filters):
+    """Latest completed attempt per (student, quiz), narrowed by `filters`."""
+    return StudentQuizAttempt.objects.filter(is_latest=True, **filters)
+
+
+def latest_attempts_map(student_ids, quiz_ids=None):
+    """Map (student_id, quiz_id) -> latest completed attempt."""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return {}
+
+    attempts_qs = latest_attempts_queryset(student_id__in=student_ids)
+    if quiz_ids is not None:
+        quiz_ids = list(quiz_ids)
+        if not quiz_ids:
+            return {}
+        attempts_qs = attempts_qs.filter(quiz_id__in=quiz_ids)
+
+    return {(attempt.student_id, attempt.quiz_id): attempt for attempt in attempts_qs}
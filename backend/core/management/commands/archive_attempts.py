@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.attempt_archive import ARCHIVE_BATCH_SIZE, archive_attempts
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed quiz attempts older than --days, with their answers, "
+        "to the archive tables and update the archived performance summaries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ATTEMPT_ARCHIVE_AFTER_DAYS,
+            help=f"Minimum age of a completed attempt in days (default: {settings.ATTEMPT_ARCHIVE_AFTER_DAYS}).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help=f"Attempts moved per transaction (default: {ARCHIVE_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        counts = archive_attempts(
+            before=timezone.now() - timedelta(days=options["days"]),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {counts['attempts']} attempt(s) with {counts['answers']} answer(s).")
+        )
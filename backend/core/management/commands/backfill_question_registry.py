@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.question_registry import REGISTRY_BATCH_SIZE, backfill_question_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Register every SCQ/MCQ/FIB question missing from the question registry "
+        "and drop entries whose question no longer exists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REGISTRY_BATCH_SIZE,
+            help=f"Questions read per query (default: {REGISTRY_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--no-prune",
+            action="store_true",
+            help="Keep registry entries whose question is gone.",
+        )
+
+    def handle(self, *args, **options):
+        counts = backfill_question_registry(batch_size=options["batch_size"], prune=not options["no_prune"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Registered {counts['added']} question(s); removed {counts['removed']} stale entr(ies).")
+        )
@@ -1,24 +1,35 @@
-import os
-import datetime
-from django.core.management.base import BaseCommand
-from django.core.management import call_command
-from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
-class Command(BaseCommand):
-    help = 'Creates a JSON backup of the entire database (no auto-deletion).'
+from core.backups import BACKUP_CHUNK_SIZE, BackupError, create_backup
 
-    def handle(self, *args, **options):
-        backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
-        os.makedirs(backup_dir, exist_ok=True)
 
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M')
-        backup_filename = f"backup_{timestamp}.json"
-        backup_path = os.path.join(backup_dir, backup_filename)
+class Command(BaseCommand):
+    help = (
+        'Creates a gzip-compressed JSON-lines backup of the database (no auto-deletion). '
+        'Pass --incremental to back up only attempts, answers and payments changed '
+        'since the previous backup.'
+    )
 
-        self.stdout.write(self.style.SUCCESS(f"Creating backup: {backup_filename}"))
-        
-        # Dump database to JSON
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            call_command('dumpdata', '--natural-primary', '--natural-foreign', '--indent', '2', stdout=f)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only include append-heavy tables changed since the last backup.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=BACKUP_CHUNK_SIZE,
+            help=f'Rows read per query (default: {BACKUP_CHUNK_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            record = create_backup(incremental=options['incremental'], chunk_size=options['chunk_size'])
+        except BackupError as exc:
+            raise CommandError(str(exc))
 
-        self.stdout.write(self.style.SUCCESS(f"Backup created at {backup_path}"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(
+            f"Backup created: {record.filename} ({record.kind}, {record.row_count} rows, "
+            f"{record.size_bytes / 1024:.1f} KiB, {record.watermarks.get('duration_seconds')} s)"
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.cache_layer import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counts for the named caches across all workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Zero the counters after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        for name, stats in cache_stats().items():
+            rate = "n/a" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+            self.stdout.write(f"{name}: {stats['hits']} hits, {stats['misses']} misses, hit rate {rate}")
+        if options["reset"]:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
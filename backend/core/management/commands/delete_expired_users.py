@@ -1,17 +1,82 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from datetime import timedelta
+
 from core.models import User
+from core.user_cleanup import delete_users_chunk
+
 
 class Command(BaseCommand):
-    help = 'Delete users whose subscription expired more than 60 days ago'
+    help = (
+        'Delete users whose subscription expired more than 60 days ago, in '
+        'small chunks so the cleanup never holds long locks.'
+    )
 
-    def handle(self, *args, **kwargs):
-        threshold_date = timezone.now().date() - timedelta(days=60)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=60,
+            help='Delete users whose subscription expired more than this many days ago (default: 60).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Users deleted per transaction (default: 500).',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Seconds to pause between chunks (default: 0.5).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count what would be deleted.',
+        )
+
+    def handle(self, *args, **options):
+        threshold_date = timezone.now().date() - timedelta(days=options['days'])
         expired_users = User.objects.filter(
             subscription_expiry__lt=threshold_date,
             school_id__isnull=True,
+        ).order_by('id')
+        total = expired_users.count()
+        if not total:
+            self.stdout.write(self.style.SUCCESS('Deleted 0 expired users.'))
+            return
+
+        dry_run = options['dry_run']
+        batch_size = max(1, options['batch_size'])
+        totals = Counter()
+        last_id = 0
+        while True:
+            user_ids = list(
+                expired_users.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            totals.update(delete_users_chunk(user_ids, dry_run=dry_run))
+            verb = 'Would delete' if dry_run else 'Deleted'
+            self.stdout.write(f'{verb} {totals[User._meta.label]}/{total} users...')
+
+            if options['sleep'] and len(user_ids) == batch_size:
+                time.sleep(options['sleep'])
+
+        details = ', '.join(
+            f'{label}: {count}' for label, count in sorted(totals.items())
+            if count and label != User._meta.label
+        )
+        summary = (
+            f"{'Would delete' if dry_run else 'Deleted'} {totals[User._meta.label]} expired users."
         )
-        count = expired_users.count()
-        expired_users.delete()
-        self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired users.'))
\ No newline at end of file
+        if details:
+            summary += f' Related rows: {details}.'
+        self.stdout.write(self.style.SUCCESS(summary))
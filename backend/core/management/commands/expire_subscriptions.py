@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.subscription_expiry import expire_lapsed_subscriptions
+
+
+class Command(BaseCommand):
+    help = "Mark users and schools whose subscription date has passed as expired."
+
+    def handle(self, *args, **options):
+        counts = expire_lapsed_subscriptions()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Expired {counts['users']} users and {counts['schools']} schools."
+            )
+        )
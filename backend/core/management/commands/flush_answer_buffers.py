@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.student_answers import flush_answer_buffers
+
+
+class Command(BaseCommand):
+    help = "Write buffered answers of in-progress quiz attempts to the database."
+
+    def handle(self, *args, **options):
+        counts = flush_answer_buffers()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Flushed {counts['answers']} answers from {counts['attempts']} attempts."
+            )
+        )
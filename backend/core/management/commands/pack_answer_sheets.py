@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.answer_sheets import PACK_AFTER, PACK_BATCH_SIZE, pack_answer_sheets
+
+
+class Command(BaseCommand):
+    help = (
+        "Pack the answers of attempts completed more than --days ago into answer "
+        "sheets on the attempt and delete their StudentAnswer rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=PACK_AFTER.days,
+            help=f"Minimum age of a completed attempt in days (default: {PACK_AFTER.days}).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PACK_BATCH_SIZE,
+            help=f"Attempts packed per transaction (default: {PACK_BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        counts = pack_answer_sheets(older_than=timedelta(days=options["days"]), batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Packed {counts['attempts']} attempt(s); deleted {counts['answers']} answer row(s).")
+        )
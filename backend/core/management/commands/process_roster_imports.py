@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.roster_import_jobs import claim_next_roster_import_job, run_roster_import_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued roster import jobs. Polls for new jobs until stopped; "
+        "pass --once to drain the queue and exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs that are queued now, then exit.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls when the queue is empty (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_roster_import_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+
+            self.stdout.write(f"Running roster import #{job.id}...")
+            job = run_roster_import_job(job)
+            if job.status == job.STATUS_COMPLETED:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Roster import #{job.id}: imported {job.uploaded}, "
+                    f"skipped {job.skipped}, {len(job.errors)} error(s)."
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f"Roster import #{job.id} failed: {job.error_message}"
+                ))
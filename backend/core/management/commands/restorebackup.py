@@ -0,0 +1,33 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backups import BackupError, backup_dir, restore_from_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Restore a backup file. .jsonl.gz backups are streamed in batches; '
+        'legacy .json dumps go through loaddata.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Backup file path, or a file name inside MEDIA_ROOT/backups.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            path = os.path.join(backup_dir(), path)
+        if not os.path.exists(path):
+            raise CommandError(f"Backup file not found: {options['path']}")
+
+        try:
+            loaded = restore_from_file(path)
+        except BackupError as exc:
+            raise CommandError(str(exc))
+
+        detail = f' ({loaded} objects)' if loaded is not None else ''
+        self.stdout.write(self.style.SUCCESS(f'Restored {os.path.basename(path)}{detail}.'))
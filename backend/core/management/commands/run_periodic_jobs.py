@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import PeriodicJobState
+from core.periodic_jobs import (
+    PERIODIC_JOBS,
+    claim_job,
+    ensure_job_states,
+    get_job,
+    node_name,
+    run_due_jobs,
+    run_job,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the periodic maintenance jobs (outbox, expiry reminders, expired-user "
+        "cleanup, backups). Safe to start on every app instance: a database lock "
+        "makes sure each job runs on one node at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due now, then exit.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=30.0,
+            help="Seconds between schedule checks (default: 30).",
+        )
+        parser.add_argument(
+            "--job",
+            help="Run this job now, ignoring its schedule (still honours the lock).",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="Show each job's schedule and last result.",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            self._list()
+            return
+
+        node = node_name()
+        if options["job"]:
+            try:
+                job = get_job(options["job"])
+            except KeyError:
+                raise CommandError(
+                    f"Unknown job '{options['job']}'. Known jobs: "
+                    + ", ".join(job.name for job in PERIODIC_JOBS)
+                )
+            ensure_job_states([job])
+            if not claim_job(job, node=node, force=True):
+                raise CommandError(f"Job '{job.name}' is running on another node.")
+            self._report(run_job(job, node=node))
+            return
+
+        while True:
+            for run in run_due_jobs(node=node):
+                self._report(run)
+            if options["once"]:
+                return
+            time.sleep(options["sleep"])
+
+    def _report(self, run):
+        message = f"{run.name}: {run.status} in {run.duration_ms} ms"
+        if run.status == run.STATUS_SUCCEEDED:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.ERROR(f"{message}: {run.error_message}"))
+
+    def _list(self):
+        ensure_job_states()
+        states = {state.name: state for state in PeriodicJobState.objects.all()}
+        for job in PERIODIC_JOBS:
+            state = states[job.name]
+            lock = f", locked by {state.locked_by}" if state.locked_by else ""
+            self.stdout.write(
+                f"{job.name}: every {job.interval}, next run {state.next_run_at:%Y-%m-%d %H:%M}, "
+                f"last {state.last_status or 'never run'}{lock}"
+            )
@@ -1,36 +1,55 @@
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
-from django.core.mail import send_mail
-from core.models import User
-from datetime import timedelta, date
-from django.conf import settings
+from django.utils import timezone
+
+from core.email_outbox import send_outbox_batch
+from core.expiry_reminders import EXPIRY_REMINDER_DAYS, queue_expiry_reminders
+
 
 class Command(BaseCommand):
-    help = 'Send reminder emails to users whose subscription will expire in 5 days.'
+    help = (
+        "Queue reminder emails for users and school licenses expiring in 5 days, "
+        "then deliver them through the email outbox. Safe to rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=EXPIRY_REMINDER_DAYS,
+            help=f"Remind about subscriptions expiring this many days from today (default: {EXPIRY_REMINDER_DAYS}).",
+        )
+        parser.add_argument(
+            "--queue-only",
+            action="store_true",
+            help="Only queue the reminders; leave delivery to send_outbox_emails.",
+        )
 
-    def handle(self, *args, **kwargs):
-        target_date = date.today() + timedelta(days=5)
-        users_to_notify = User.objects.filter(subscription_expiry=target_date)
+    def handle(self, *args, **options):
+        target_date = timezone.now().date() + timedelta(days=options["days"])
+        queued = queue_expiry_reminders(target_date)
 
-        if not users_to_notify.exists():
-            self.stdout.write("📭 No users expiring in 5 days.")
+        if not queued["users"] and not queued["schools"]:
+            self.stdout.write(f"📭 No new reminders for subscriptions expiring on {target_date}.")
             return
 
-        for user in users_to_notify:
-            if not user.email:
-                continue
-
-            subject = "📢 Reminder: Your Learnify Pakistan subscription is expiring soon!"
-            message = (
-                f"Dear {user.full_name},\n\n"
-                f"Your subscription is set to expire on {user.subscription_expiry}.\n"
-                f"Please renew your subscription to continue enjoying access to quizzes, reports, and awards.\n\n"
-                "Visit your Learnify account to renew now.\n\n"
-                "Thank you,\n"
-                "Team Learnify Pakistan"
-            )
-
-            try:
-                send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
-                self.stdout.write(f"✅ Reminder sent to: {user.email}")
-            except Exception as e:
-                self.stderr.write(f"❌ Failed to send reminder to {user.email}: {str(e)}")
\ No newline at end of file
+        self.stdout.write(
+            f"📨 Queued {queued['users']} user and {queued['schools']} school reminder(s) "
+            f"for {target_date}."
+        )
+        if options["queue_only"]:
+            return
+
+        totals = {"sent": 0, "retried": 0, "failed": 0}
+        while True:
+            stats = send_outbox_batch()
+            if not any(stats.values()):
+                break
+            for key, value in stats.items():
+                totals[key] += value
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Sent {totals['sent']} email(s); {totals['retried']} will be retried, "
+            f"{totals['failed']} failed."
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.email_outbox import OUTBOX_BATCH_SIZE, send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued outbox emails in batches over one SMTP connection per "
+        "batch. Polls until stopped; pass --once to drain what is due and exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the emails that are due now, then exit.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help=f"Emails sent per SMTP connection (default: {OUTBOX_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls when nothing is due (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = send_outbox_batch(options["batch_size"])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"Outbox: sent {stats['sent']}, retrying {stats['retried']}, "
+                    f"failed {stats['failed']}."
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["sleep"])
@@ -1,13 +1,17 @@
 # core/middleware.py
 
-from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 
+from core.subscription_expiry import effective_account_status
+
+
 class AutoExpireUserMiddleware(MiddlewareMixin):
+    """
+    Show a lapsed subscription as expired for the rest of the request without
+    writing it; the expire_subscriptions job stores the status in bulk.
+    """
+
     def process_request(self, request):
         user = request.user
         if user.is_authenticated:
-            if user.subscription_expiry and user.subscription_expiry < timezone.now().date():
-                if user.account_status != 'expired':
-                    user.account_status = 'expired'
-                    user.save(update_fields=['account_status'])
\ No newline at end of file
+            user.account_status = effective_account_status(user)
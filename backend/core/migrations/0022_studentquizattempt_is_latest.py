@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def flag_latest_attempts(apps, schema_editor):
+    StudentQuizAttempt = apps.get_model("core", "StudentQuizAttempt")
+
+    latest_ids = []
+    seen_pairs = set()
+    completed = (
+        StudentQuizAttempt.objects.filter(completed_at__isnull=False)
+        .order_by("student_id", "quiz_id", "-completed_at", "-id")
+        .values_list("id", "student_id", "quiz_id")
+    )
+    for attempt_id, student_id, quiz_id in completed.iterator(chunk_size=5000):
+        key = (student_id, quiz_id)
+        if key in seen_pairs:
+            continue
+        seen_pairs.add(key)
+        latest_ids.append(attempt_id)
+
+    for start in range(0, len(latest_ids), 1000):
+        StudentQuizAttempt.objects.filter(id__in=latest_ids[start:start + 1000]).update(is_latest=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_questionreport_snapshot_and_set_null"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentquizattempt",
+            name="is_latest",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="studentquizattempt",
+            index=models.Index(
+                condition=models.Q(("is_latest", True)),
+                fields=["student", "quiz"],
+                name="attempt_latest_student_quiz",
+            ),
+        ),
+        migrations.RunPython(flag_latest_attempts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.21 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_studentquizattempt_is_latest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentanswer',
+            index=models.Index(fields=['attempt', 'question_id'], name='answer_attempt_question'),
+        ),
+        migrations.AddIndex(
+            model_name='studentquizattempt',
+            index=models.Index(fields=['student', 'quiz', 'completed_at'], name='attempt_student_quiz_done'),
+        ),
+        migrations.AddIndex(
+            model_name='studentquizattempt',
+            index=models.Index(fields=['quiz', 'completed_at'], name='attempt_quiz_done'),
+        ),
+        migrations.AddIndex(
+            model_name='teachertask',
+            index=models.Index(fields=['school', 'is_active'], name='task_school_active'),
+        ),
+        migrations.AddIndex(
+            model_name='teachertask',
+            index=models.Index(fields=['teacher', 'is_active'], name='task_teacher_active'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['school', 'role'], name='user_school_role'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'province', 'city'], name='user_role_province_city'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.21 on 2026-10-19 12:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiryReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expiry_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='expiry_reminders', to='core.school')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='expiry_reminders', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='expiryreminder',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('user', 'expiry_date'), name='expiry_reminder_user_once'),
+        ),
+        migrations.AddConstraint(
+            model_name='expiryreminder',
+            constraint=models.UniqueConstraint(condition=models.Q(('school__isnull', False)), fields=('school', 'expiry_date'), name='expiry_reminder_school_once'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.21 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_periodic_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackupRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=20)),
+                ('filename', models.CharField(max_length=255, unique=True)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('size_bytes', models.PositiveBigIntegerField(default=0)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('watermarks', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.21 on 2026-10-19 13:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def register_existing_questions(apps, schema_editor):
+    QuestionRegistry = apps.get_model("core", "QuestionRegistry")
+    for question_type, model_name in (("scq", "SCQQuestion"), ("mcq", "MCQQuestion"), ("fib", "FIBQuestion")):
+        model = apps.get_model("core", model_name)
+        rows = model.objects.order_by("pk").values_list("pk", "question_id", "question_bank_id")
+        batch = []
+        for pk, question_id, bank_id in rows.iterator(chunk_size=5000):
+            batch.append(
+                QuestionRegistry(
+                    question_id=question_id,
+                    question_type=question_type,
+                    question_bank_id=bank_id,
+                    object_id=pk,
+                )
+            )
+            if len(batch) >= 1000:
+                QuestionRegistry.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        QuestionRegistry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_backuprecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionRegistry',
+            fields=[
+                ('question_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('question_type', models.CharField(choices=[('scq', 'Single Choice'), ('mcq', 'Multiple Choice'), ('fib', 'Fill in the Blank')], max_length=3)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('content_version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question_bank', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registry_entries', to='core.questionbank')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question_bank', 'question_type'], name='core_qreg_bank_type_idx')],
+            },
+        ),
+        migrations.RunPython(register_existing_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def dedupe_student_answers(apps, schema_editor):
+    """
+    Keep only the newest row for each (attempt, question_id). submit_answer
+    used to delete and re-insert, so the highest id is the latest answer.
+    """
+    StudentAnswer = apps.get_model("core", "StudentAnswer")
+    duplicates = (
+        StudentAnswer.objects.values("attempt_id", "question_id")
+        .annotate(rows=Count("id"), keep_id=Max("id"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    batch = []
+    for group in duplicates.iterator(chunk_size=2000):
+        batch.append(group)
+        if len(batch) >= 500:
+            _delete_duplicates(StudentAnswer, batch)
+            batch = []
+    if batch:
+        _delete_duplicates(StudentAnswer, batch)
+
+
+def _delete_duplicates(StudentAnswer, groups):
+    stale = models.Q()
+    for group in groups:
+        stale |= models.Q(attempt_id=group["attempt_id"], question_id=group["question_id"])
+    StudentAnswer.objects.filter(stale).exclude(id__in=[group["keep_id"] for group in groups]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_questionregistry'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_student_answers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='studentanswer',
+            constraint=models.UniqueConstraint(fields=('attempt', 'question_id'), name='answer_attempt_question_unique'),
+        ),
+        # The unique constraint's index covers the same lookups.
+        migrations.RemoveIndex(
+            model_name='studentanswer',
+            name='answer_attempt_question',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_studentanswer_unique_attempt_question'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentquizattempt',
+            name='answer_sheet',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentquizattempt',
+            name='answers_packed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.21 on 2026-10-19 13:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_studentquizattempt_answer_sheet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedQuizAttempt',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('started_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField()),
+                ('score', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('meta', models.JSONField(blank=True, default=dict, null=True)),
+                ('answer_sheet', models.JSONField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attempts', to='core.quiz')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'completed_at'], name='archived_attempt_student_done'), models.Index(fields=['archived_at'], name='archived_attempt_archived_at')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttemptSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('answers', models.PositiveIntegerField(default=0)),
+                ('correct_answers', models.PositiveIntegerField(default=0)),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('grade', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.grade')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attempt_summaries', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject', 'grade'], name='archived_summary_subject_grade')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archivedattemptsummary',
+            constraint=models.UniqueConstraint(fields=('student', 'subject', 'grade'), name='archived_summary_student_subject_grade'),
+        ),
+    ]
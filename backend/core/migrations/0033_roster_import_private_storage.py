@@ -0,0 +1,37 @@
+import core.storage
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def move_roster_uploads(apps, schema_editor):
+    """
+    Take existing roster spreadsheets out of public media: delete those of
+    finished jobs and move queued/running ones to private storage.
+    """
+    RosterImportJob = apps.get_model("core", "RosterImportJob")
+    for job in RosterImportJob.objects.exclude(file="").iterator():
+        name = job.file.name
+        if job.status in ("queued", "running") and default_storage.exists(name):
+            with default_storage.open(name, "rb") as upload:
+                name = core.storage.private_upload_storage.save(name, upload)
+        else:
+            name = ""
+        if default_storage.exists(job.file.name):
+            default_storage.delete(job.file.name)
+        RosterImportJob.objects.filter(pk=job.pk).update(file=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_attempt_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rosterimportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=core.storage.PrivateUploadStorage(), upload_to='roster_imports/'),
+        ),
+        migrations.RunPython(move_roster_uploads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_finished_bodies(apps, schema_editor):
+    """Welcome and password emails carry passwords; drop delivered/failed bodies."""
+    OutboundEmail = apps.get_model("core", "OutboundEmail")
+    OutboundEmail.objects.filter(status__in=["sent", "failed"]).exclude(body="").update(body="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_roster_import_private_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_finished_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_answer_buffer_table(apps, schema_editor):
+    """
+    The write-behind answer buffer lives in its own cache table (see
+    CACHES["answers"]); create it so flush_answer_buffers can always run.
+    """
+    call_command("createcachetable", "learnify_cache_answers", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_outbound_email_clear_finished_bodies'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_answer_buffer_table, migrations.RunPython.noop),
+    ]
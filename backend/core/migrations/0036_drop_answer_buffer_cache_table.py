@@ -0,0 +1,13 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """The answer buffer moved to Redis; its database cache table is unused."""
+
+    dependencies = [
+        ('core', '0035_answer_buffer_cache_table'),
+    ]
+
+    operations = [
+        migrations.RunSQL("DROP TABLE IF EXISTS learnify_cache_answers", migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.21 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_catalog_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='claim_token',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
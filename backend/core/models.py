@@ -8,6 +8,8 @@ from django.utils import timezone
 from django.utils.text import slugify
 from ckeditor_uploader.fields import RichTextUploadingField
 
+from core.storage import private_upload_storage
+
 USER_ROLES = (
     ('admin', 'Admin'),
     ('manager', 'Manager'),
@@ -218,6 +220,12 @@ class User(AbstractUser):
         null=True
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=('school', 'role'), name='user_school_role'),
+            models.Index(fields=('role', 'province', 'city'), name='user_role_province_city'),
+        ]
+
     def is_expired(self):
         return self.subscription_expiry and timezone.now().date() > self.subscription_expiry
 
@@ -305,6 +313,39 @@ class FIBQuestion(models.Model):
         return f"FIB: {self.question_text[:50]}"
 
 
+class QuestionRegistry(models.Model):
+    """
+    One row per SCQ/MCQ/FIB question, so any set of question_ids resolves to
+    its table in a single indexed query. Kept in sync by core.signals and
+    core.question_registry; `backfill_question_registry` repairs drift.
+    """
+    TYPE_SCQ = "scq"
+    TYPE_MCQ = "mcq"
+    TYPE_FIB = "fib"
+
+    TYPE_CHOICES = [
+        (TYPE_SCQ, "Single Choice"),
+        (TYPE_MCQ, "Multiple Choice"),
+        (TYPE_FIB, "Fill in the Blank"),
+    ]
+
+    question_id = models.UUIDField(primary_key=True)
+    question_type = models.CharField(max_length=3, choices=TYPE_CHOICES)
+    question_bank = models.ForeignKey(QuestionBank, on_delete=models.CASCADE, related_name="registry_entries")
+    object_id = models.PositiveBigIntegerField()
+    # Bumped on every save of the question, so caches can tell content apart.
+    content_version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["question_bank", "question_type"], name="core_qreg_bank_type_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.question_type.upper()} {self.question_id}"
+
+
 class Grade(models.Model):
     name = models.CharField(max_length=100, unique=True, default="Grade Temp")
 
@@ -467,6 +508,24 @@ class StudentQuizAttempt(models.Model):
     score = models.IntegerField(default=0)
     total = models.IntegerField(default=0)
     meta = models.JSONField(default=dict, blank=True, null=True)
+    # Marks the most recently completed attempt per (student, quiz); maintained by
+    # core.latest_attempts.refresh_latest_attempt via signals.
+    is_latest = models.BooleanField(default=False, editable=False)
+    # Completed attempts' answers packed into one document by
+    # core.answer_sheets.pack_answer_sheets, which deletes the StudentAnswer rows.
+    answer_sheet = models.JSONField(null=True, blank=True, editable=False)
+    answers_packed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('student', 'quiz'),
+                condition=models.Q(is_latest=True),
+                name='attempt_latest_student_quiz',
+            ),
+            models.Index(fields=('student', 'quiz', 'completed_at'), name='attempt_student_quiz_done'),
+            models.Index(fields=('quiz', 'completed_at'), name='attempt_quiz_done'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.quiz.title}"
@@ -478,10 +537,70 @@ class StudentAnswer(models.Model):
     question_type = models.CharField(max_length=10)
     answer_data = models.JSONField()
 
+    class Meta:
+        constraints = [
+            # One answer per question per attempt; submit_answer upserts on it.
+            models.UniqueConstraint(fields=('attempt', 'question_id'), name='answer_attempt_question_unique'),
+        ]
+
     def __str__(self):
         return f"Answer for Question {self.question_id} in Attempt {self.attempt.id}"
 
 
+class ArchivedQuizAttempt(models.Model):
+    """
+    A completed StudentQuizAttempt moved out of the live table by
+    core.attempt_archive.archive_attempts. It keeps the original id, so
+    result links stay valid, and always carries a packed answer sheet.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey('User', on_delete=models.CASCADE, related_name='archived_attempts')
+    quiz = models.ForeignKey('Quiz', on_delete=models.CASCADE, related_name='archived_attempts')
+    started_at = models.DateTimeField()
+    completed_at = models.DateTimeField()
+    score = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    meta = models.JSONField(default=dict, blank=True, null=True)
+    answer_sheet = models.JSONField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('student', 'completed_at'), name='archived_attempt_student_done'),
+            models.Index(fields=('archived_at',), name='archived_attempt_archived_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} - {self.quiz.title} (archived)"
+
+
+class ArchivedAttemptSummary(models.Model):
+    """
+    Per student, subject and grade totals over archived attempts, so
+    performance reports need not read their answer sheets. Correct answers
+    are counted with the verbatim grading those reports use.
+    """
+    student = models.ForeignKey('User', on_delete=models.CASCADE, related_name='archived_attempt_summaries')
+    subject = models.ForeignKey('Subject', on_delete=models.CASCADE, null=True, blank=True)
+    grade = models.ForeignKey('Grade', on_delete=models.CASCADE, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    answers = models.PositiveIntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(default=0)
+    score = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('student', 'subject', 'grade'), name='archived_summary_student_subject_grade'),
+        ]
+        indexes = [
+            models.Index(fields=('subject', 'grade'), name='archived_summary_subject_grade'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} - {self.subject or 'Unknown'} ({self.answers} answers)"
+
+
 class QuizAttempt(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'student'})
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
@@ -562,6 +681,12 @@ class TeacherTask(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=('school', 'is_active'), name='task_school_active'),
+            models.Index(fields=('teacher', 'is_active'), name='task_teacher_active'),
+        ]
+
     def __str__(self):
         return f"Task by {self.teacher.username} (due {self.due_date})"
 
@@ -643,3 +768,214 @@ class QuestionReport(models.Model):
     def __str__(self):
         quiz_label = self.quiz.title if self.quiz else "deleted quiz"
         return f"Report #{self.id} — {quiz_label} ({self.status})"
+
+
+class RosterImportJob(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="roster_import_jobs",
+    )
+    created_by = models.ForeignKey(
+        "User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="roster_import_jobs",
+    )
+    # Kept out of public media and deleted once the job finishes.
+    file = models.FileField(upload_to="roster_imports/", storage=private_upload_storage, blank=True)
+    allowed_roles = models.JSONField(default=list, blank=True)
+    send_welcome_emails = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    uploaded = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error_message = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # New for every claim; a worker only writes results while it still matches.
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=("status", "created_at"), name="roster_job_status_created"),
+        ]
+
+    def __str__(self):
+        return f"Roster import #{self.id} ({self.status})"
+
+
+class OutboundEmail(models.Model):
+    """
+    Transactional email written by request handlers and delivered later by
+    the `send_outbox_emails` worker, so requests never wait on SMTP.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True, default="")
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=("status", "next_attempt_at"), name="outbox_status_due"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.recipients)} ({self.status})"
+
+
+class ExpiryReminder(models.Model):
+    """One row per reminder queued, so rerunning the reminder job is a no-op."""
+    user = models.ForeignKey(
+        "User",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="expiry_reminders",
+    )
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="expiry_reminders",
+    )
+    expiry_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "expiry_date"),
+                condition=models.Q(user__isnull=False),
+                name="expiry_reminder_user_once",
+            ),
+            models.UniqueConstraint(
+                fields=("school", "expiry_date"),
+                condition=models.Q(school__isnull=False),
+                name="expiry_reminder_school_once",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Expiry reminder for {self.user or self.school} ({self.expiry_date})"
+
+
+class PeriodicJobState(models.Model):
+    """
+    Schedule and lock row for one periodic job. A node runs a job only after
+    winning the conditional UPDATE that sets `locked_by`/`locked_until`.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=20, blank=True, default="")
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class PeriodicJobRun(models.Model):
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    node = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    output = models.TextField(blank=True, default="")
+    error_message = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=("name", "started_at"), name="periodic_run_name_started"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} at {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class BackupRecord(models.Model):
+    """A backup file written by core.backups, with the watermarks used for the next incremental run."""
+    KIND_FULL = "full"
+    KIND_INCREMENTAL = "incremental"
+
+    KIND_CHOICES = [
+        (KIND_FULL, "Full"),
+        (KIND_INCREMENTAL, "Incremental"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255, unique=True)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    row_count = models.PositiveIntegerField(default=0)
+    watermarks = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.filename} ({self.kind})"
@@ -0,0 +1,46 @@
+"""
+Parallel password hashing for bulk user imports.
+
+Kept free of model imports so process-pool workers started with the "spawn"
+method can unpickle `_hash_password` before Django is configured.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many passwords the pool start-up costs more than it saves.
+PARALLEL_HASH_MIN_PASSWORDS = 32
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _hash_password(plain_password):
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(plain_password)
+
+
+def default_hash_workers():
+    from django.conf import settings
+
+    configured = getattr(settings, "ROSTER_IMPORT_HASH_WORKERS", None)
+    if configured is not None:
+        return max(1, int(configured))
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def hash_passwords(plain_passwords, *, workers=None):
+    """Return make_password() of each password, in order."""
+    plain_passwords = list(plain_passwords)
+    workers = default_hash_workers() if workers is None else workers
+    if workers <= 1 or len(plain_passwords) < PARALLEL_HASH_MIN_PASSWORDS:
+        return [_hash_password(password) for password in plain_passwords]
+
+    chunksize = max(1, len(plain_passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(_hash_password, plain_passwords, chunksize=chunksize))
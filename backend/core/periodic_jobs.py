@@ -0,0 +1,126 @@
+import io
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import PeriodicJobRun, PeriodicJobState
+
+logger = logging.getLogger(__name__)
+
+PERIODIC_JOB_OUTPUT_LIMIT = 10_000
+
+
+@dataclass(frozen=True)
+class PeriodicJob:
+    name: str
+    command: str
+    interval: timedelta
+    args: tuple = field(default_factory=tuple)
+    # Random delay added to each next run so nodes started together spread out.
+    jitter: timedelta = timedelta(minutes=5)
+    # How long a claim is honoured before another node may take the job over.
+    lease: timedelta = timedelta(hours=1)
+
+
+PERIODIC_JOBS = (
+    PeriodicJob("send_outbox_emails", "send_outbox_emails", timedelta(minutes=1), ("--once",), jitter=timedelta(seconds=10), lease=timedelta(minutes=15)),
+    PeriodicJob("flush_answer_buffers", "flush_answer_buffers", timedelta(minutes=1), jitter=timedelta(seconds=10), lease=timedelta(minutes=15)),
+    PeriodicJob("expire_subscriptions", "expire_subscriptions", timedelta(hours=1)),
+    PeriodicJob("send_expiry_reminders", "send_expiry_reminders", timedelta(days=1), ("--queue-only",)),
+    PeriodicJob("pack_answer_sheets", "pack_answer_sheets", timedelta(days=1), jitter=timedelta(minutes=30), lease=timedelta(hours=3)),
+    PeriodicJob("delete_expired_users", "delete_expired_users", timedelta(days=1), jitter=timedelta(minutes=30), lease=timedelta(hours=3)),
+    PeriodicJob("backupdata", "backupdata", timedelta(days=7), jitter=timedelta(minutes=30), lease=timedelta(hours=3)),
+)
+
+
+def node_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def get_job(name, jobs=None):
+    for job in PERIODIC_JOBS if jobs is None else jobs:
+        if job.name == name:
+            return job
+    raise KeyError(name)
+
+
+def ensure_job_states(jobs=None):
+    existing = set(PeriodicJobState.objects.values_list("name", flat=True))
+    PeriodicJobState.objects.bulk_create(
+        [
+            PeriodicJobState(name=job.name)
+            for job in (PERIODIC_JOBS if jobs is None else jobs)
+            if job.name not in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def claim_job(job, *, node, force=False):
+    """
+    Take the lock for `job` if it is due (or `force`) and nobody holds an
+    unexpired lease. The single conditional UPDATE makes the claim safe across
+    app instances sharing the database.
+    """
+    now = timezone.now()
+    unlocked = Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    due = Q() if force else Q(next_run_at__lte=now)
+    return bool(
+        PeriodicJobState.objects.filter(unlocked, due, name=job.name).update(
+            locked_by=node,
+            locked_until=now + job.lease,
+            last_started_at=now,
+        )
+    )
+
+
+def run_job(job, *, node):
+    """Run a claimed job, record its history row and schedule the next run."""
+    run = PeriodicJobRun.objects.create(name=job.name, node=node)
+    output = io.StringIO()
+    started = time.monotonic()
+    try:
+        call_command(job.command, *job.args, stdout=output, stderr=output)
+        status, error_message = PeriodicJobRun.STATUS_SUCCEEDED, ""
+    except Exception as exc:
+        logger.exception("Periodic job %s failed", job.name)
+        status, error_message = PeriodicJobRun.STATUS_FAILED, str(exc)
+
+    finished_at = timezone.now()
+    PeriodicJobRun.objects.filter(id=run.id).update(
+        status=status,
+        finished_at=finished_at,
+        duration_ms=int((time.monotonic() - started) * 1000),
+        output=output.getvalue()[-PERIODIC_JOB_OUTPUT_LIMIT:],
+        error_message=error_message,
+    )
+    jitter_seconds = random.uniform(0, job.jitter.total_seconds())
+    PeriodicJobState.objects.filter(name=job.name, locked_by=node).update(
+        next_run_at=finished_at + job.interval + timedelta(seconds=jitter_seconds),
+        locked_by="",
+        locked_until=None,
+        last_finished_at=finished_at,
+        last_status=status,
+    )
+    run.refresh_from_db()
+    return run
+
+
+def run_due_jobs(*, jobs=None, node=None):
+    """Run every job that is due and not locked elsewhere. Returns the runs."""
+    jobs = PERIODIC_JOBS if jobs is None else jobs
+    node = node or node_name()
+    ensure_job_states(jobs)
+    runs = []
+    for job in jobs:
+        if claim_job(job, node=node):
+            runs.append(run_job(job, node=node))
+    return runs
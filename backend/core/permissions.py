@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 from django.utils import timezone
 from rest_framework.permissions import BasePermission
 
@@ -74,8 +76,64 @@ def has_active_subscription(user):
     return True
 
 
+@dataclass(frozen=True)
+class AccessContext:
+    """What a request's user may access, worked out once per request."""
+
+    user: object
+    school: object
+    role: str
+    is_staff_user: bool
+    subscription_active: bool
+
+    @property
+    def is_student(self):
+        return self.role == "student"
+
+    @property
+    def is_teacher(self):
+        return self.role == "teacher"
+
+    @property
+    def is_school_admin(self):
+        return self.role == "school_admin"
+
+
+def get_access_context(request):
+    """
+    Access context for `request.user`, memoized on the underlying HttpRequest
+    so the permission classes and the view share a single computation. It is
+    rebuilt if the request's user object changes.
+    """
+    http_request = getattr(request, "_request", request)
+    user = request.user
+    cached = getattr(http_request, "_access_context", None)
+    if cached is not None and cached.user is user:
+        return cached
+
+    authenticated = bool(user and getattr(user, "is_authenticated", False))
+    role = (getattr(user, "role", None) or "") if authenticated else ""
+    context = AccessContext(
+        user=user,
+        school=_get_user_school(user) if authenticated else None,
+        role=role,
+        is_staff_user=authenticated and bool(
+            getattr(user, "is_superuser", False)
+            or getattr(user, "is_staff", False)
+            or role in ("admin", "manager")
+        ),
+        subscription_active=has_active_subscription(user),
+    )
+    http_request._access_context = context
+    return context
+
+
+def request_has_active_subscription(request):
+    return get_access_context(request).subscription_active
+
+
 class HasPaidSubscription(BasePermission):
     message = "An active subscription is required to access this resource."
 
     def has_permission(self, request, view):
-        return has_active_subscription(request.user)
+        return request_has_active_subscription(request)
@@ -0,0 +1,138 @@
+import json
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from core.models import FIBQuestion, MCQQuestion, SCQQuestion
+from core.question_registry import register_questions
+from core.sheet_reader import is_blank, iter_sheet_records, open_readonly_workbook, read_header
+
+QUESTION_IMPORT_BATCH_SIZE = 500
+OPTION_LABELS = ("A", "B", "C", "D")
+OPTION_COLUMNS = ("option_a", "option_b", "option_c", "option_d")
+OPTION_MAX_LENGTH = 255
+SCQ_COLUMNS = ("question",) + OPTION_COLUMNS + ("correct_answer",)
+MCQ_COLUMNS = ("question",) + OPTION_COLUMNS + ("correct_answers",)
+FIB_COLUMNS = ("question", "correct_answers")
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class QuestionImportResult:
+    created: int = 0
+    rejected: list = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def rejected_count(self):
+        return len(self.rejected)
+
+
+def _text(value):
+    return str(value).strip()
+
+
+def _required(row, columns):
+    missing = [column for column in columns if is_blank(row.get(column))]
+    if missing:
+        raise RowError(f"Missing {', '.join(missing)}.")
+
+
+def _options(row):
+    options = {}
+    for column in OPTION_COLUMNS:
+        value = _text(row[column])
+        if len(value) > OPTION_MAX_LENGTH:
+            raise RowError(f"{column} is longer than {OPTION_MAX_LENGTH} characters.")
+        options[column] = value
+    return options
+
+
+def _build_scq(bank, row):
+    _required(row, SCQ_COLUMNS)
+    label = _text(row["correct_answer"]).upper()
+    if label not in OPTION_LABELS:
+        raise RowError(f"correct_answer must be one of {', '.join(OPTION_LABELS)}, got '{row['correct_answer']}'.")
+    return SCQQuestion(
+        question_bank=bank,
+        question_text=_text(row["question"]),
+        correct_answer=label,
+        **_options(row),
+    )
+
+
+def _build_mcq(bank, row):
+    _required(row, MCQ_COLUMNS)
+    labels = [part.strip().upper() for part in _text(row["correct_answers"]).split(",") if part.strip()]
+    invalid = [label for label in labels if label not in OPTION_LABELS]
+    if not labels or invalid:
+        raise RowError(
+            f"correct_answers must be comma-separated labels from {', '.join(OPTION_LABELS)}, "
+            f"got '{row['correct_answers']}'."
+        )
+    return MCQQuestion(
+        question_bank=bank,
+        question_text=_text(row["question"]),
+        correct_answers=",".join(sorted(set(labels))),
+        **_options(row),
+    )
+
+
+def _build_fib(bank, row):
+    _required(row, FIB_COLUMNS)
+    try:
+        correct_answers = json.loads(_text(row["correct_answers"]))
+    except ValueError:
+        raise RowError('correct_answers is not valid JSON, e.g. {"a": "answer"}.')
+    if not isinstance(correct_answers, dict) or not correct_answers:
+        raise RowError('correct_answers must be a non-empty JSON object, e.g. {"a": "answer"}.')
+    return FIBQuestion(
+        question_bank=bank,
+        question_text=_text(row["question"]),
+        correct_answers=correct_answers,
+    )
+
+
+QUESTION_IMPORTERS = {
+    "SCQ": (SCQQuestion, SCQ_COLUMNS, _build_scq),
+    "MCQ": (MCQQuestion, MCQ_COLUMNS, _build_mcq),
+    "FIB": (FIBQuestion, FIB_COLUMNS, _build_fib),
+}
+
+
+def import_question_records(bank, records):
+    """
+    Validate every (row_number, record) for `bank` first, then insert the
+    valid rows with bulk_create in batches inside one transaction. Invalid
+    rows are reported in `rejected` and never block the valid ones.
+    """
+    model, _columns, build = QUESTION_IMPORTERS[bank.type]
+    result = QuestionImportResult()
+    questions = []
+    for row_number, record in records:
+        try:
+            questions.append(build(bank, record))
+        except RowError as exc:
+            result.rejected.append({"row": row_number, "error": str(exc)})
+
+    if questions:
+        with transaction.atomic():
+            model.objects.bulk_create(questions, batch_size=QUESTION_IMPORT_BATCH_SIZE)
+            register_questions(bank.type.lower(), questions)
+    result.created = len(questions)
+    return result
+
+
+def import_questions_from_file(bank, file_obj):
+    """Import an .xlsx question sheet whose header row names the columns."""
+    _model, columns, _build = QUESTION_IMPORTERS[bank.type]
+    with open_readonly_workbook(file_obj) as workbook:
+        sheet = workbook.active
+        header = read_header(sheet)
+        missing = [column for column in columns if column not in header]
+        if missing:
+            return QuestionImportResult(error=f"Missing column(s): {', '.join(missing)}.")
+        return import_question_records(bank, iter_sheet_records(sheet))
@@ -0,0 +1,130 @@
+from django.db.models import F
+
+from core.models import FIBQuestion, MCQQuestion, QuestionRegistry, SCQQuestion
+
+QUESTION_MODELS = {
+    QuestionRegistry.TYPE_SCQ: SCQQuestion,
+    QuestionRegistry.TYPE_MCQ: MCQQuestion,
+    QuestionRegistry.TYPE_FIB: FIBQuestion,
+}
+REGISTRY_BATCH_SIZE = 1000
+
+
+def _entry(question_type, question):
+    return QuestionRegistry(
+        question_id=question.question_id,
+        question_type=question_type,
+        question_bank_id=question.question_bank_id,
+        object_id=question.pk,
+    )
+
+
+def register_question(question_type, question):
+    """Record a saved question, bumping its content version if already known."""
+    updated = QuestionRegistry.objects.filter(question_id=question.question_id).update(
+        question_type=question_type,
+        question_bank_id=question.question_bank_id,
+        object_id=question.pk,
+        content_version=F("content_version") + 1,
+    )
+    if not updated:
+        QuestionRegistry.objects.bulk_create([_entry(question_type, question)], ignore_conflicts=True)
+
+
+def register_questions(question_type, questions):
+    """
+    Record questions inserted with bulk_create, which sends no signals.
+    Rows whose primary key the backend did not return are looked up once.
+    """
+    questions = list(questions)
+    missing_pks = [question.question_id for question in questions if question.pk is None]
+    if missing_pks:
+        pks = dict(
+            QUESTION_MODELS[question_type].objects.filter(question_id__in=missing_pks).values_list("question_id", "pk")
+        )
+        for question in questions:
+            if question.pk is None:
+                question.pk = pks.get(question.question_id)
+    QuestionRegistry.objects.bulk_create(
+        [_entry(question_type, question) for question in questions if question.pk is not None],
+        batch_size=REGISTRY_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def unregister_question(question_id):
+    QuestionRegistry.objects.filter(question_id=question_id).delete()
+
+
+def resolve_question_types(question_ids):
+    """{str(question_id): question_type} for the registered ids, in one query."""
+    ids = {str(question_id) for question_id in question_ids}
+    if not ids:
+        return {}
+    return {
+        str(question_id): question_type
+        for question_id, question_type in QuestionRegistry.objects.filter(question_id__in=ids).values_list(
+            "question_id", "question_type"
+        )
+    }
+
+
+def resolve_questions(question_ids):
+    """
+    {str(question_id): question} for the registered ids: one registry query,
+    then one query per question type actually present.
+    """
+    ids_by_type = {}
+    for question_id, question_type in resolve_question_types(question_ids).items():
+        ids_by_type.setdefault(question_type, []).append(question_id)
+    questions = {}
+    for question_type, ids in ids_by_type.items():
+        for question in QUESTION_MODELS[question_type].objects.filter(question_id__in=ids):
+            questions[str(question.question_id)] = question
+    return questions
+
+
+def backfill_question_registry(*, batch_size=REGISTRY_BATCH_SIZE, prune=True):
+    """
+    Register every question missing from the registry and, with `prune`,
+    drop entries whose question no longer exists. Returns
+    {"added": n, "removed": n}.
+    """
+    added = 0
+    for question_type, model in QUESTION_MODELS.items():
+        last_pk = 0
+        while True:
+            chunk = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "question_id", "question_bank_id")[:batch_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            known = set(
+                QuestionRegistry.objects.filter(question_id__in=[row[1] for row in chunk]).values_list(
+                    "question_id", flat=True
+                )
+            )
+            new_entries = [
+                QuestionRegistry(
+                    question_id=question_id,
+                    question_type=question_type,
+                    question_bank_id=bank_id,
+                    object_id=pk,
+                )
+                for pk, question_id, bank_id in chunk
+                if question_id not in known
+            ]
+            QuestionRegistry.objects.bulk_create(new_entries, ignore_conflicts=True)
+            added += len(new_entries)
+
+    removed = 0
+    if prune:
+        for question_type, model in QUESTION_MODELS.items():
+            orphans = QuestionRegistry.objects.filter(question_type=question_type).exclude(
+                question_id__in=model.objects.values("question_id")
+            )
+            removed += orphans.delete()[0]
+    return {"added": added, "removed": removed}
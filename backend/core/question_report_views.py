@@ -12,14 +12,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from core.models import (
-    FIBQuestion,
-    MCQQuestion,
-    QuestionReport,
-    Quiz,
-    SCQQuestion,
-    StudentQuizAttempt,
-)
+from core.models import QuestionRegistry, QuestionReport, Quiz, StudentQuizAttempt
+from core.question_registry import QUESTION_MODELS
 
 REPORT_ALLOWED_ROLES = frozenset({"student", "teacher", "admin", "manager"})
 
@@ -41,34 +35,23 @@ def _can_report(user):
 
 
 def _resolve_question(question_uuid, question_type):
+    """
+    Return (question, type) via the question registry; the question is None
+    when the id is unknown or registered under a different type.
+    """
     qtype = (question_type or "").lower()
-    if qtype == "scq":
-        return SCQQuestion.objects.filter(question_id=question_uuid).first(), qtype
-    if qtype == "mcq":
-        return MCQQuestion.objects.filter(question_id=question_uuid).first(), qtype
-    if qtype == "fib":
-        return FIBQuestion.objects.filter(question_id=question_uuid).first(), qtype
-    return None, qtype
+    entry = QuestionRegistry.objects.filter(question_id=question_uuid).first()
+    if entry is None or (qtype and entry.question_type != qtype):
+        return None, qtype
+    question = QUESTION_MODELS[entry.question_type].objects.filter(pk=entry.object_id).first()
+    return question, entry.question_type
 
 
-def _question_in_quiz(quiz, question_uuid, question_type):
-    bank_ids = list(quiz.assignments.values_list("question_bank_id", flat=True))
-    if not bank_ids:
-        return False
-    qtype = (question_type or "").lower()
-    if qtype == "scq":
-        return SCQQuestion.objects.filter(
-            question_id=question_uuid, question_bank_id__in=bank_ids
-        ).exists()
-    if qtype == "mcq":
-        return MCQQuestion.objects.filter(
-            question_id=question_uuid, question_bank_id__in=bank_ids
-        ).exists()
-    if qtype == "fib":
-        return FIBQuestion.objects.filter(
-            question_id=question_uuid, question_bank_id__in=bank_ids
-        ).exists()
-    return False
+def _question_in_quiz(quiz, question_uuid):
+    return QuestionRegistry.objects.filter(
+        question_id=question_uuid,
+        question_bank__quizquestionassignment__quiz=quiz,
+    ).exists()
 
 
 def _short_text(raw_html, max_len=120):
@@ -152,17 +135,9 @@ def report_question(request):
     question_type = (request.data.get("question_type") or "").lower()
     question_obj, resolved_type = _resolve_question(question_uuid, question_type)
     if not question_obj:
-        if not question_type:
-            for candidate in ("scq", "mcq", "fib"):
-                question_obj, resolved_type = _resolve_question(question_uuid, candidate)
-                if question_obj:
-                    break
-        if not question_obj:
-            return _report_response("Question not found.", status.HTTP_404_NOT_FOUND, success=False)
-    elif question_type and resolved_type != question_type:
         return _report_response("Question not found.", status.HTTP_404_NOT_FOUND, success=False)
 
-    if not _question_in_quiz(quiz, question_uuid, resolved_type):
+    if not _question_in_quiz(quiz, question_uuid):
         return _report_response(
             "Question does not belong to this quiz.",
             status.HTTP_400_BAD_REQUEST,
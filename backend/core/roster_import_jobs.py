@@ -0,0 +1,167 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import RosterImportJob
+from core.roster_upload import import_roster_from_file
+
+logger = logging.getLogger(__name__)
+
+# A running job not finished within this long is taken to have lost its worker.
+ROSTER_IMPORT_TIMEOUT = timedelta(hours=1)
+
+
+def enqueue_roster_import(upload, *, school=None, created_by=None, allowed_roles=None, send_welcome_emails=False):
+    return RosterImportJob.objects.create(
+        school=school,
+        created_by=created_by,
+        file=upload,
+        allowed_roles=sorted(allowed_roles or []),
+        send_welcome_emails=send_welcome_emails,
+    )
+
+
+def _delete_upload(job):
+    """Remove the uploaded spreadsheet, which holds plaintext passwords."""
+    if not job.file:
+        return
+    try:
+        job.file.delete(save=False)
+    except Exception:
+        logger.exception("Could not delete the upload of roster import job %s", job.id)
+        return
+    RosterImportJob.objects.filter(id=job.id).update(file="")
+
+
+def _still_claimed(job):
+    """The job's row, if it is still running under the claim `job` was loaded with."""
+    return RosterImportJob.objects.filter(
+        id=job.id,
+        status=RosterImportJob.STATUS_RUNNING,
+        claim_token=job.claim_token,
+    )
+
+
+def fail_stale_roster_import_jobs(now=None):
+    """
+    Fail running jobs started more than ROSTER_IMPORT_TIMEOUT ago, whose
+    worker died, so schools polling them get an answer. Returns the count.
+    """
+    now = now or timezone.now()
+    failed = 0
+    stale = RosterImportJob.objects.filter(
+        status=RosterImportJob.STATUS_RUNNING,
+        started_at__lt=now - ROSTER_IMPORT_TIMEOUT,
+    )
+    for job in stale:
+        updated = _still_claimed(job).update(
+            status=RosterImportJob.STATUS_FAILED,
+            error_message="The import did not finish. Please upload the file again.",
+            finished_at=now,
+        )
+        if updated:
+            logger.warning("Roster import job %s timed out", job.id)
+            _delete_upload(job)
+            failed += 1
+    return failed
+
+
+def claim_next_roster_import_job():
+    """
+    Move the oldest queued job to running and return it, or None. The
+    conditional UPDATE makes the claim safe with several workers, and the
+    claim token it sets keeps a worker whose job was failed meanwhile from
+    overwriting the outcome. Jobs abandoned by a dead worker are failed first.
+    """
+    fail_stale_roster_import_jobs()
+    while True:
+        job_id = (
+            RosterImportJob.objects.filter(status=RosterImportJob.STATUS_QUEUED)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = RosterImportJob.objects.filter(
+            id=job_id,
+            status=RosterImportJob.STATUS_QUEUED,
+        ).update(status=RosterImportJob.STATUS_RUNNING, started_at=timezone.now(), claim_token=uuid.uuid4())
+        if claimed:
+            return RosterImportJob.objects.select_related("school").get(id=job_id)
+
+
+def run_roster_import_job(job):
+    """
+    Import the claimed `job`'s file and record the outcome. If the job was
+    failed meanwhile (see fail_stale_roster_import_jobs), that outcome and
+    the deletion of the upload are left to whoever failed it.
+    """
+    def record_progress(processed, total):
+        _still_claimed(job).update(processed_rows=processed, total_rows=total)
+
+    try:
+        with job.file.open("rb") as file_obj:
+            result = import_roster_from_file(
+                file_obj,
+                school=job.school,
+                allowed_roles=set(job.allowed_roles) or None,
+                send_welcome_emails=job.send_welcome_emails,
+                progress_callback=record_progress,
+            )
+    except Exception as exc:
+        logger.exception("Roster import job %s failed", job.id)
+        updated = _still_claimed(job).update(
+            status=RosterImportJob.STATUS_FAILED,
+            error_message=str(exc),
+            finished_at=timezone.now(),
+        )
+        if updated:
+            _delete_upload(job)
+        job.refresh_from_db()
+        return job
+
+    if result.get("rejected"):
+        status = RosterImportJob.STATUS_FAILED
+        error_message = result["errors"][0].get("error", "Roster upload rejected.")
+    else:
+        status = RosterImportJob.STATUS_COMPLETED
+        error_message = ""
+
+    updated = _still_claimed(job).update(
+        status=status,
+        processed_rows=F("total_rows"),
+        uploaded=result["uploaded"],
+        skipped=result["skipped"],
+        errors=result["errors"],
+        result=result,
+        error_message=error_message,
+        finished_at=timezone.now(),
+    )
+    if updated:
+        _delete_upload(job)
+    else:
+        logger.warning("Roster import job %s finished after it was failed; result discarded", job.id)
+    job.refresh_from_db()
+    return job
+
+
+def serialize_roster_import_job(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "uploaded": job.uploaded,
+        "skipped": job.skipped,
+        "errors": job.errors,
+        "error": job.error_message or None,
+        "emails_sent": (job.result or {}).get("emails_sent"),
+        "emails_skipped": (job.result or {}).get("emails_skipped"),
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -1,10 +1,17 @@
-import openpyxl
+import time
 from pathlib import Path
 
 from django.conf import settings
+from django.db import DatabaseError, transaction
+
 from core.models import Grade, User
+from core.password_hashing import hash_passwords
+from core.school_snapshots import invalidate_school_snapshots
+from core.sheet_reader import iter_sheet_rows, open_readonly_workbook
 
 ROSTER_TEMPLATE_FILENAME = "student_bulk_upload_template.xlsx"
+ROSTER_INSERT_CHUNK_SIZE = 500
+EXISTING_USERNAME_CHUNK_SIZE = 900
 ROSTER_COLUMNS = (
     "username",
     "full_name",
@@ -46,10 +53,16 @@ def _normalize_gender(value):
     return text[0].upper() + text[1:].lower()
 
 
-def _resolve_grade(grade_name):
+def _resolve_grade(grade_name, grade_lookup=None):
     cleaned = str(grade_name or "").strip().replace('"', "").replace("'", "")
     if not cleaned:
         return None, "Grade is required."
+    if grade_lookup is not None:
+        by_name, by_lower_name = grade_lookup
+        grade = by_name.get(cleaned) or by_lower_name.get(cleaned.lower())
+        if grade is None:
+            return None, f"Grade '{grade_name}' does not exist in database."
+        return grade, None
     try:
         return Grade.objects.get(name=cleaned), None
     except Grade.DoesNotExist:
@@ -59,19 +72,31 @@ def _resolve_grade(grade_name):
             return None, f"Grade '{grade_name}' does not exist in database."
 
 
+def _load_grade_lookup():
+    by_name = {}
+    by_lower_name = {}
+    for grade in Grade.objects.order_by("id"):
+        by_name.setdefault(grade.name, grade)
+        by_lower_name.setdefault(grade.name.lower(), grade)
+    return by_name, by_lower_name
+
+
+def _existing_usernames(usernames):
+    usernames = list(usernames)
+    existing = set()
+    for start in range(0, len(usernames), EXISTING_USERNAME_CHUNK_SIZE):
+        chunk = usernames[start:start + EXISTING_USERNAME_CHUNK_SIZE]
+        existing.update(User.objects.filter(username__in=chunk).values_list("username", flat=True))
+    return existing
+
+
 def iter_roster_rows(sheet):
-    for row_number, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-        if not row or not any(cell is not None and str(cell).strip() for cell in row):
-            continue
-        values = list(row[:13])
-        while len(values) < 13:
-            values.append(None)
-        yield row_number, dict(zip(ROSTER_COLUMNS, values))
+    return iter_sheet_rows(sheet, ROSTER_COLUMNS)
 
 
 def count_incoming_students(sheet, *, allowed_roles=None):
     """Count new student rows in a roster upload (excludes existing usernames)."""
-    incoming = 0
+    student_usernames = set()
     for _row_number, row in iter_roster_rows(sheet):
         username = str(row["username"] or "").strip()
         if not username:
@@ -81,10 +106,8 @@ def count_incoming_students(sheet, *, allowed_roles=None):
             continue
         if role != "student":
             continue
-        if User.objects.filter(username=username).exists():
-            continue
-        incoming += 1
-    return incoming
+        student_usernames.add(username)
+    return len(student_usernames - _existing_usernames(student_usernames))
 
 
 def validate_school_seat_capacity(school, sheet, *, allowed_roles=None):
@@ -138,17 +161,116 @@ def _maybe_send_roster_welcome_email(user, plain_password, *, send_welcome_email
         email_stats["emails_skipped"] += 1
 
 
-def import_roster_from_file(file_obj, *, school=None, allowed_roles=None, send_welcome_emails=False):
-    workbook = openpyxl.load_workbook(file_obj)
-    return import_roster_from_workbook(
-        workbook,
+def import_roster_from_file(
+    file_obj,
+    *,
+    school=None,
+    allowed_roles=None,
+    send_welcome_emails=False,
+    progress_callback=None,
+):
+    with open_readonly_workbook(file_obj) as workbook:
+        return import_roster_from_workbook(
+            workbook,
+            school=school,
+            allowed_roles=allowed_roles,
+            send_welcome_emails=send_welcome_emails,
+            progress_callback=progress_callback,
+        )
+
+
+def _roster_user_from_row(row, role, grade_instance, school, activation):
+    if school:
+        school_name = school.name
+        city = school.city
+        province = school.province
+    else:
+        school_name = row["school_name"]
+        city = row["city"]
+        province = row["province"]
+
+    return User(
+        username=str(row["username"]).strip(),
+        full_name=row["full_name"],
+        email=row["email"],
+        role=role,
+        gender=_normalize_gender(row["gender"]),
+        schooling_status=row["schooling_status"],
+        grade=grade_instance,
         school=school,
-        allowed_roles=allowed_roles,
-        send_welcome_emails=send_welcome_emails,
+        school_name=school_name,
+        city=city,
+        province=province,
+        subscription_plan=row["subscription_plan"],
+        language_used_at_home=row["language_used_at_home"] or "",
+        account_status=activation["account_status"],
+        is_active=activation["is_active"],
+        subscription_expiry=activation["subscription_expiry"],
     )
 
 
-def import_roster_from_workbook(workbook, *, school=None, allowed_roles=None, send_welcome_emails=False):
+def _bulk_insert_chunk(chunk, errors):
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _row_number, user, _password in chunk])
+        return [(user, password) for _row_number, user, password in chunk]
+    except DatabaseError:
+        # IntegrityError for a username taken concurrently, DataError on
+        # Postgres for a value too long for its column, ...
+        pass
+
+    inserted = []
+    for row_number, user, password in chunk:
+        try:
+            with transaction.atomic():
+                user.save()
+            inserted.append((user, password))
+        except Exception as exc:
+            errors.append({"row": row_number, "error": str(exc)})
+    return inserted
+
+
+def _insert_roster_chunk(chunk, errors):
+    """
+    Hash and bulk_create one chunk of (row_number, user, plain_password). A
+    chunk that hits a database error (e.g. a username taken concurrently or
+    a value too long for its column) is retried row by row so only the
+    offending rows are reported. Returns the
+    users actually inserted with their plain passwords.
+    """
+    hashed_passwords = hash_passwords(password for _row_number, _user, password in chunk)
+    for (_row_number, user, _password), hashed in zip(chunk, hashed_passwords):
+        user.password = hashed
+    return _bulk_insert_chunk(chunk, errors)
+
+
+def _scan_roster_usernames(sheet):
+    row_count = 0
+    usernames = set()
+    for _row_number, row in iter_roster_rows(sheet):
+        row_count += 1
+        username = str(row["username"] or "").strip()
+        if username:
+            usernames.add(username)
+    return row_count, usernames
+
+
+def import_roster_from_workbook(
+    workbook,
+    *,
+    school=None,
+    allowed_roles=None,
+    send_welcome_emails=False,
+    progress_callback=None,
+):
+    """
+    Import a roster sheet in bulk. A first streaming pass collects usernames
+    so existing accounts are looked up in one go; the second pass validates
+    rows and writes them in chunks (passwords hashed in a process pool, users
+    inserted with bulk_create), so memory stays bounded by the chunk size.
+    `progress_callback(processed, total)` is called after each chunk.
+    """
+    started_at = time.monotonic()
     sheet = workbook.active
 
     if school:
@@ -166,7 +288,31 @@ def import_roster_from_workbook(workbook, *, school=None, allowed_roles=None, se
     errors = []
     email_stats = {"emails_sent": 0, "emails_skipped": 0}
 
+    total_rows, usernames = _scan_roster_usernames(sheet)
+    existing_usernames = _existing_usernames(usernames)
+    grade_lookup = _load_grade_lookup()
+    activation = _roster_user_activation_fields(school)
+
+    processed_rows = 0
+    pending = []
+
+    def flush_pending():
+        nonlocal uploaded_count
+        inserted = _insert_roster_chunk(pending, errors)
+        uploaded_count += len(inserted)
+        pending.clear()
+        for user, plain_password in inserted:
+            _maybe_send_roster_welcome_email(
+                user,
+                plain_password,
+                send_welcome_emails=send_welcome_emails,
+                email_stats=email_stats,
+            )
+        if progress_callback is not None:
+            progress_callback(processed_rows, total_rows)
+
     for row_number, row in iter_roster_rows(sheet):
+        processed_rows += 1
         try:
             username = str(row["username"] or "").strip()
             if not username:
@@ -181,64 +327,41 @@ def import_roster_from_workbook(workbook, *, school=None, allowed_roles=None, se
                 })
                 continue
 
-            if User.objects.filter(username=username).exists():
+            if username in existing_usernames:
                 skipped_count += 1
                 continue
 
-            grade_instance, grade_error = _resolve_grade(row["grade_name"])
+            grade_instance, grade_error = _resolve_grade(row["grade_name"], grade_lookup)
             if grade_error:
                 errors.append({"row": row_number, "error": grade_error})
                 continue
 
-            if school:
-                school_name = school.name
-                city = school.city
-                province = school.province
-            else:
-                school_name = row["school_name"]
-                city = row["city"]
-                province = row["province"]
-
-            activation = _roster_user_activation_fields(school)
-
-            user = User.objects.create(
-                username=username,
-                full_name=row["full_name"],
-                email=row["email"],
-                role=role,
-                gender=_normalize_gender(row["gender"]),
-                schooling_status=row["schooling_status"],
-                grade=grade_instance,
-                school=school,
-                school_name=school_name,
-                city=city,
-                province=province,
-                subscription_plan=row["subscription_plan"],
-                language_used_at_home=row["language_used_at_home"] or "",
-                account_status=activation["account_status"],
-                is_active=activation["is_active"],
-                subscription_expiry=activation["subscription_expiry"],
-            )
+            user = _roster_user_from_row(row, role, grade_instance, school, activation)
             plain_password = row["password"]
-            user.set_password(plain_password)
-            user.save()
-            uploaded_count += 1
-            _maybe_send_roster_welcome_email(
-                user,
-                plain_password,
-                send_welcome_emails=send_welcome_emails,
-                email_stats=email_stats,
-            )
+            if plain_password is not None:
+                plain_password = str(plain_password)
+            pending.append((row_number, user, plain_password))
+            # Later rows repeating this username are skipped like existing users.
+            existing_usernames.add(username)
         except Exception as exc:
             errors.append({"row": row_number, "error": str(exc)})
 
+        if len(pending) >= ROSTER_INSERT_CHUNK_SIZE:
+            flush_pending()
+
+    flush_pending()
+    errors.sort(key=lambda error: error.get("row", 0))
+
     if school and uploaded_count:
+        invalidate_school_snapshots(school.id)
         refresh_school_onboarding(school)
 
+    elapsed = time.monotonic() - started_at
     result = {
         "uploaded": uploaded_count,
         "skipped": skipped_count,
         "errors": errors,
+        "rows_per_second": round(total_rows / elapsed, 1) if elapsed > 0 else None,
     }
     if send_welcome_emails:
         result["emails_sent"] = email_stats["emails_sent"]
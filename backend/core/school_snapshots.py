@@ -0,0 +1,39 @@
+from core.cache_layer import ANALYTICS, bump_namespace, cached_get_or_build, namespaced_key, school_namespace
+from core.models import User
+from core.school_analytics import build_school_analytics_summary
+from core.school_teacher_analytics import build_school_teacher_analytics
+
+# Snapshots are rebuilt lazily after invalidation; the TTL only bounds how long
+# a snapshot can survive a write that bypassed the signals (queryset.update()).
+SNAPSHOT_TTL_SECONDS = 15 * 60
+
+
+def build_school_roster_counts(school):
+    return {
+        "students": User.objects.filter(school=school, role="student").count(),
+        "teachers": User.objects.filter(school=school, role="teacher").count(),
+    }
+
+
+SNAPSHOT_BUILDERS = {
+    "analytics_summary": build_school_analytics_summary,
+    "teacher_analytics": build_school_teacher_analytics,
+    "roster_counts": build_school_roster_counts,
+}
+
+
+def get_school_snapshot(school, kind):
+    """
+    Return the cached `kind` snapshot for `school`, building it on a miss.
+
+    The key embeds the school namespace's current version token, so a
+    snapshot computed while an invalidation lands is stored under the old
+    token and never served.
+    """
+    builder = SNAPSHOT_BUILDERS[kind]
+    key = namespaced_key(ANALYTICS, school_namespace(school.pk), "snapshot", kind)
+    return cached_get_or_build(ANALYTICS, key, lambda: builder(school), SNAPSHOT_TTL_SECONDS)
+
+
+def invalidate_school_snapshots(*school_ids):
+    bump_namespace(ANALYTICS, *(school_namespace(school_id) for school_id in school_ids if school_id))
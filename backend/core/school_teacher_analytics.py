@@ -1,29 +1,21 @@
 from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 
+from core.latest_attempts import latest_attempts_queryset
 from core.models import StudentQuizAttempt, TeacherTask, TeacherTaskQuiz, User
+from core.task_assignments import percentage_of_total, quiz_total_marks_map, resolve_task_assignments
 from core.teacher_scoping import teacher_students_queryset
 
 
 def _teacher_helpers():
     from core.views import (
-        _attempt_percentage,
-        _latest_attempts_map,
-        _quiz_total_marks,
         _serialize_student_task_progress,
-        _task_assigned_students,
         _task_status_label,
-        _teacher_scoped_students_queryset,
     )
 
     return {
-        "attempt_percentage": _attempt_percentage,
-        "latest_attempts_map": _latest_attempts_map,
-        "quiz_total_marks": _quiz_total_marks,
         "serialize_student_task_progress": _serialize_student_task_progress,
-        "task_assigned_students": _task_assigned_students,
         "task_status_label": _task_status_label,
-        "teacher_scoped_students_queryset": _teacher_scoped_students_queryset,
     }
 
 
@@ -71,26 +63,6 @@ def get_teacher_monitoring_students(teacher, school):
     return teacher_students_queryset(teacher).select_related("grade")
 
 
-def _count_task_items(task, teacher):
-    helpers = _teacher_helpers()
-    assigned = helpers["task_assigned_students"](task, teacher)
-    task_quizzes = [tq for tq in task.task_quizzes.all() if tq.quiz]
-    quiz_ids = [tq.quiz.id for tq in task_quizzes]
-    attempts_map = helpers["latest_attempts_map"]([s.id for s in assigned], quiz_ids)
-
-    completed = 0
-    pending = 0
-    for student in assigned:
-        if student.school_id != teacher.school_id:
-            continue
-        for tq in task_quizzes:
-            if attempts_map.get((student.id, tq.quiz.id)):
-                completed += 1
-            else:
-                pending += 1
-    return completed, pending
-
-
 def _build_attention_students(student_stats):
     attention_candidates = []
     for stats in student_stats.values():
@@ -145,7 +117,6 @@ def build_teacher_monitoring_snapshot(teacher, school):
     if teacher.school_id != school.id:
         return None
 
-    helpers = _teacher_helpers()
     students = list(get_teacher_monitoring_students(teacher, school).order_by("full_name", "username"))
     student_ids = [student.id for student in students]
 
@@ -174,38 +145,27 @@ def build_teacher_monitoring_snapshot(teacher, school):
     pending_task_items_count = 0
     completed_task_items_count = 0
 
-    for task in active_tasks:
-        completed, pending = _count_task_items(task, teacher)
+    resolved = resolve_task_assignments(active_tasks, get_teacher_monitoring_students(teacher, school))
+    for assignment in resolved.assignments:
+        completed, pending = resolved.count_items(assignment)
         completed_task_items_count += completed
         pending_task_items_count += pending
 
-        assigned = helpers["task_assigned_students"](task, teacher)
-        task_quizzes = [tq for tq in task.task_quizzes.all() if tq.quiz]
-        quiz_ids = [tq.quiz.id for tq in task_quizzes]
-        attempts_map = helpers["latest_attempts_map"]([s.id for s in assigned], quiz_ids)
-
-        for student in assigned:
-            if student.school_id != school.id:
-                continue
-            for tq in task_quizzes:
-                if attempts_map.get((student.id, tq.quiz.id)):
-                    continue
-                student_stats[student.id]["pending_task_items"] += 1
-
-    attempts_qs = StudentQuizAttempt.objects.filter(
-        student_id__in=student_ids,
-        completed_at__isnull=False,
-    ).select_related("quiz", "student")
-
-    latest_for_avg = {}
-    for attempt in attempts_qs.order_by("student_id", "quiz_id", "-completed_at"):
-        key = (attempt.student_id, attempt.quiz_id)
-        if key not in latest_for_avg:
-            latest_for_avg[key] = attempt
+        for student in assignment.students:
+            for tq in assignment.task_quizzes:
+                if not resolved.is_completed(student.id, tq.quiz_id):
+                    student_stats[student.id]["pending_task_items"] += 1
+
+    latest_attempts = list(
+        latest_attempts_queryset(student_id__in=student_ids)
+        .select_related("quiz")
+        .order_by("student_id", "quiz_id")
+    )
+    quiz_totals = quiz_total_marks_map(attempt.quiz for attempt in latest_attempts)
 
     all_percentages = []
-    for attempt in latest_for_avg.values():
-        percentage = helpers["attempt_percentage"](attempt, attempt.quiz)
+    for attempt in latest_attempts:
+        percentage = percentage_of_total(attempt.score, quiz_totals.get(attempt.quiz_id))
         all_percentages.append(percentage)
         student_stats[attempt.student_id]["percentages"].append(percentage)
         student_stats[attempt.student_id]["attempt_count"] += 1
@@ -224,11 +184,14 @@ def build_teacher_monitoring_snapshot(teacher, school):
         .select_related("student", "quiz")
         .order_by("-completed_at")[:5]
     )
+    quiz_totals.update(quiz_total_marks_map(
+        attempt.quiz for attempt in recent_attempts if attempt.quiz_id not in quiz_totals
+    ))
     recent_activity = [
         {
             "student_name": attempt.student.full_name or attempt.student.username,
             "quiz_title": attempt.quiz.title,
-            "percentage": helpers["attempt_percentage"](attempt, attempt.quiz),
+            "percentage": percentage_of_total(attempt.score, quiz_totals.get(attempt.quiz_id)),
             "completed_at": attempt.completed_at.strftime("%Y-%m-%d") if attempt.completed_at else None,
         }
         for attempt in recent_attempts
@@ -334,19 +297,15 @@ def build_school_teacher_task_rows(teacher, school):
         .order_by("-created_at")
     )
 
-    task_rows = []
-    for task in tasks:
-        task_quizzes = [tq for tq in task.task_quizzes.all() if tq.quiz]
-        quiz_objs = [tq.quiz for tq in task_quizzes]
-        quiz_totals = {quiz.id: helpers["quiz_total_marks"](quiz) for quiz in quiz_objs}
-
-        assigned_students = helpers["task_assigned_students"](task, teacher)
-        student_ids = [student.id for student in assigned_students]
-        quiz_ids = [quiz.id for quiz in quiz_objs]
-        attempts_map = helpers["latest_attempts_map"](student_ids, quiz_ids)
+    resolved = resolve_task_assignments(tasks, get_teacher_monitoring_students(teacher, school))
 
-        is_grade_wide = bool(task.target_grade_id) and not task.target_students.exists()
-        target_type = "grade_wide" if is_grade_wide else "selected_students"
+    task_rows = []
+    for assignment in resolved.assignments:
+        task = assignment.task
+        task_quizzes = assignment.task_quizzes
+        quiz_objs = assignment.quizzes
+        assigned_students = assignment.students
+        target_type = "grade_wide" if assignment.is_grade_wide else "selected_students"
 
         task_rows.append({
             "task_id": task.id,
@@ -364,8 +323,8 @@ def build_school_teacher_task_rows(teacher, school):
                 helpers["serialize_student_task_progress"](
                     student,
                     task_quizzes,
-                    attempts_map,
-                    quiz_totals,
+                    resolved.attempts_map,
+                    resolved.quiz_totals,
                 )
                 for student in assigned_students
             ],
@@ -407,15 +366,19 @@ def build_school_task_monitoring(school):
         .order_by("-created_at")
     )
 
+    # Every teacher here belongs to `school`, so they all see the same students.
+    resolved = resolve_task_assignments(
+        [task for task in tasks if task.teacher.school_id == school.id],
+        User.objects.filter(school=school, role="student"),
+    )
+
     total_completed = 0
     total_pending = 0
     task_rows = []
 
-    for task in tasks:
-        if task.teacher.school_id != school.id:
-            continue
-
-        completed, pending = _count_task_items(task, task.teacher)
+    for assignment in resolved.assignments:
+        task = assignment.task
+        completed, pending = resolved.count_items(assignment)
         total_completed += completed
         total_pending += pending
         total_items = completed + pending
@@ -7,7 +7,7 @@ from django.db import transaction
 from rest_framework.response import Response
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.exceptions import AuthenticationFailed
-from django.utils import timezone
+from .subscription_expiry import effective_account_status
 
 
 
@@ -131,12 +131,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data = super().validate(attrs)
 
         user = self.user
-        today = timezone.now().date()
-
-        if user.subscription_expiry and user.subscription_expiry < today:
-            if user.account_status != 'expired':
-                user.account_status = 'expired'
-                user.save(update_fields=['account_status'])
+        user.account_status = effective_account_status(user)
 
         # ‚Äö√∫√ñ Pass extra info to frontend
         data['username'] = user.username
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+
+import openpyxl
+
+
+@contextmanager
+def open_readonly_workbook(file_obj):
+    """
+    Open an .xlsx upload in openpyxl's streaming read-only mode. Rows are
+    parsed from the XML as they are iterated instead of building a cell
+    object for the whole sheet up front.
+    """
+    workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        yield workbook
+    finally:
+        workbook.close()
+
+
+def is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def iter_sheet_rows(sheet, columns, *, min_row=2):
+    """
+    Yield (row_number, {column: value}) for each non-blank row, mapping cells
+    to `columns` by position. Short rows are padded with None.
+    """
+    width = len(columns)
+    for row_number, row in enumerate(sheet.iter_rows(min_row=min_row, values_only=True), start=min_row):
+        if not row or all(is_blank(cell) for cell in row):
+            continue
+        values = list(row[:width])
+        values.extend([None] * (width - len(values)))
+        yield row_number, dict(zip(columns, values))
+
+
+def read_header(sheet):
+    for row in sheet.iter_rows(min_row=1, max_row=1, values_only=True):
+        return tuple(str(cell).strip().lower() if cell is not None else "" for cell in row)
+    return ()
+
+
+def iter_sheet_records(sheet):
+    """Like iter_sheet_rows, keyed by the (lower-cased) header row."""
+    header = read_header(sheet)
+    if not header:
+        return
+    for row_number, record in iter_sheet_rows(sheet, header):
+        record.pop("", None)
+        yield row_number, record
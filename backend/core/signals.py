@@ -4,17 +4,24 @@ from django.db import transaction
 
 from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from .answer_keys import invalidate_answer_keys
+from .authentication import invalidate_cached_users
 from .emails import (
     send_welcome_email,
     send_payment_receipt_email,
     send_password_change_email,   # 👈 optional import for view usage
 
 )
+from .latest_attempts import refresh_latest_attempt
+from .models import FIBQuestion, MCQQuestion, School, SCQQuestion, StudentQuizAttempt, TeacherTask
+from .question_registry import QUESTION_MODELS, register_question, unregister_question
+from .school_snapshots import invalidate_school_snapshots
 
 User = get_user_model()
+QUESTION_TYPES_BY_MODEL = {model: question_type for question_type, model in QUESTION_MODELS.items()}
 
 
 # -------------------------------------------------------------------
@@ -94,4 +101,187 @@ def _send_receipt_on_success(sender, instance, created: bool, **kwargs):
 
     except Exception:
         # Never block request flow on mail issues
-        pass
\ No newline at end of file
+        pass
+
+
+# -------------------------------------------------------------------
+# (iii) QUIZ ATTEMPTS → keep the latest-attempt flag in sync
+# -------------------------------------------------------------------
+@receiver(post_save, sender=StudentQuizAttempt)
+def _refresh_latest_attempt_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Re-point the latest flag whenever a completed attempt is written
+    (finalize, admin edits, resubmits). In-progress attempts are skipped,
+    and so are restores, which refresh the restored pairs once at the end.
+    """
+    if raw or (instance.completed_at is None and not instance.is_latest):
+        return
+    latest_id = refresh_latest_attempt(instance.student_id, instance.quiz_id)
+    instance.is_latest = latest_id == instance.pk
+
+
+@receiver(post_delete, sender=StudentQuizAttempt)
+def _refresh_latest_attempt_on_delete(sender, instance, **kwargs):
+    if instance.is_latest:
+        refresh_latest_attempt(instance.student_id, instance.quiz_id)
+
+
+# -------------------------------------------------------------------
+# (iv) SCHOOL SNAPSHOTS → drop cached principal analytics on change
+# -------------------------------------------------------------------
+SNAPSHOT_USER_ROLES = {"student", "teacher"}
+SNAPSHOT_USER_FIELDS = {"school", "school_id", "role", "grade", "grade_id", "full_name", "username"}
+
+
+def _invalidate_school_snapshots(*school_ids):
+    """
+    Invalidate now so the writer's own next read is fresh, and again after
+    commit so a reader that rebuilt from pre-commit rows is not kept.
+    """
+    invalidate_school_snapshots(*school_ids)
+    transaction.on_commit(lambda: invalidate_school_snapshots(*school_ids))
+
+
+def _attempt_school_id(attempt):
+    """
+    The school of the attempt's student. The finalize views and archiving
+    load the student with the attempt; other writers (admin edits, shells)
+    pay one query.
+    """
+    if StudentQuizAttempt.student.is_cached(attempt):
+        return attempt.student.school_id
+    return User.objects.filter(pk=attempt.student_id).values_list("school_id", flat=True).first()
+
+
+@receiver(post_save, sender=StudentQuizAttempt)
+def _invalidate_snapshots_on_attempt_save(sender, instance, raw=False, **kwargs):
+    # Restores clear the analytics cache once at the end.
+    if raw or instance.completed_at is None:
+        return
+    _invalidate_school_snapshots(_attempt_school_id(instance))
+
+
+@receiver(post_delete, sender=StudentQuizAttempt)
+def _invalidate_snapshots_on_attempt_delete(sender, instance, **kwargs):
+    if instance.completed_at is None:
+        return
+    _invalidate_school_snapshots(_attempt_school_id(instance))
+
+
+@receiver(pre_save, sender=User)
+def _stash_old_roster_fields(sender, instance, update_fields=None, raw=False, **kwargs):
+    """
+    Remember the previous school/role so a move between schools invalidates
+    both. Saves that only touch unrelated fields (e.g. last_login) skip the read.
+    """
+    instance._old_roster_fields = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not SNAPSHOT_USER_FIELDS.intersection(update_fields):
+        return
+    instance._old_roster_fields = (
+        sender.objects.filter(pk=instance.pk).values_list("school_id", "role").first()
+    )
+
+
+@receiver(post_save, sender=User)
+def _invalidate_snapshots_on_user_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if not created and update_fields is not None and not SNAPSHOT_USER_FIELDS.intersection(update_fields):
+        return
+
+    school_ids = []
+    if instance.role in SNAPSHOT_USER_ROLES:
+        school_ids.append(instance.school_id)
+    old_fields = getattr(instance, "_old_roster_fields", None)
+    if old_fields and old_fields[1] in SNAPSHOT_USER_ROLES:
+        school_ids.append(old_fields[0])
+    if school_ids:
+        _invalidate_school_snapshots(*school_ids)
+
+
+@receiver(post_delete, sender=User)
+def _invalidate_snapshots_on_user_delete(sender, instance, **kwargs):
+    if instance.role in SNAPSHOT_USER_ROLES:
+        _invalidate_school_snapshots(instance.school_id)
+
+
+@receiver(post_save, sender=School)
+def _invalidate_snapshots_on_school_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Creation too: a recycled primary key must not inherit old snapshots.
+    _invalidate_school_snapshots(instance.pk)
+
+
+@receiver(post_save, sender=TeacherTask)
+@receiver(post_delete, sender=TeacherTask)
+def _invalidate_snapshots_on_task_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _invalidate_school_snapshots(instance.school_id)
+
+
+# -------------------------------------------------------------------
+# (v) AUTH USER CACHE → drop the cached JWT user record on change
+# -------------------------------------------------------------------
+def _invalidate_cached_user(*user_ids):
+    invalidate_cached_users(*user_ids)
+    transaction.on_commit(lambda: invalidate_cached_users(*user_ids))
+
+
+@receiver(post_save, sender=User)
+def _invalidate_cached_user_on_save(sender, instance, raw=False, **kwargs):
+    if raw:  # restores clear the whole cache (core.backups)
+        return
+    _invalidate_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def _invalidate_cached_user_on_delete(sender, instance, **kwargs):
+    _invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=School)
+def _invalidate_cached_users_on_school_save(sender, instance, created, raw=False, **kwargs):
+    # Cached users carry their school row (name, account status, ...).
+    if created or raw:
+        return
+    user_ids = list(User.objects.filter(school=instance).values_list("id", flat=True))
+    if user_ids:
+        _invalidate_cached_user(*user_ids)
+
+
+# -------------------------------------------------------------------
+# (vi) ANSWER KEYS → drop this process's cached key on question change
+# -------------------------------------------------------------------
+@receiver(post_save, sender=SCQQuestion)
+@receiver(post_save, sender=MCQQuestion)
+@receiver(post_save, sender=FIBQuestion)
+@receiver(post_delete, sender=SCQQuestion)
+@receiver(post_delete, sender=MCQQuestion)
+@receiver(post_delete, sender=FIBQuestion)
+def _invalidate_answer_key(sender, instance, raw=False, **kwargs):
+    if raw:  # restores clear the whole cache (core.backups)
+        return
+    invalidate_answer_keys(instance.question_id)
+
+
+# -------------------------------------------------------------------
+# (vii) QUESTION REGISTRY → keep question_id → type/bank/pk in sync
+# -------------------------------------------------------------------
+@receiver(post_save, sender=SCQQuestion)
+@receiver(post_save, sender=MCQQuestion)
+@receiver(post_save, sender=FIBQuestion)
+def _register_question_on_save(sender, instance, raw=False, **kwargs):
+    if raw:  # fixtures/backups carry their own registry rows
+        return
+    register_question(QUESTION_TYPES_BY_MODEL[sender], instance)
+
+
+@receiver(post_delete, sender=SCQQuestion)
+@receiver(post_delete, sender=MCQQuestion)
+@receiver(post_delete, sender=FIBQuestion)
+def _unregister_question_on_delete(sender, instance, **kwargs):
+    unregister_question(instance.question_id)
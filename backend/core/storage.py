@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class PrivateUploadStorage(FileSystemStorage):
+    """
+    Local storage under PRIVATE_MEDIA_ROOT for uploads that hold secrets
+    (roster spreadsheets carry plaintext passwords). It is outside MEDIA_ROOT,
+    so neither the media route nor Cloudinary ever serves it, and files have
+    no URL.
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PRIVATE_MEDIA_ROOT)
+
+    @cached_property
+    def base_url(self):
+        return None
+
+    def url(self, name):
+        raise ValueError("Private uploads have no URL.")
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "PRIVATE_MEDIA_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+
+
+private_upload_storage = PrivateUploadStorage()
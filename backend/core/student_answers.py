@@ -0,0 +1,251 @@
+"""
+Saving StudentAnswer rows.
+
+With settings.ANSWER_WRITE_BEHIND on, answers to an in-progress attempt are
+held in the shared `answers` cache instead of being written one row per
+submit_answer call. The buffer is written to the database in one bulk upsert
+when the attempt is finalized, and flush_answer_buffers writes any buffer
+that changed since its last flush so a crashed or abandoned session loses at
+most a minute of answers.
+
+Each answer is buffered under its own (attempt, question) key, and only the
+student's requests write those keys; the flusher records what it wrote under
+a separate key, so none of them overwrite each other. Buffering needs a
+shared store that never evicts entries (Redis, see ANSWER_BUFFER_BACKENDS);
+without one every answer is upserted directly.
+"""
+import logging
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.cache_layer import ANSWERS, get_cache
+from core.models import StudentAnswer, StudentQuizAttempt
+
+logger = logging.getLogger(__name__)
+
+ANSWER_BUFFER_TTL_SECONDS = 6 * 60 * 60
+FLUSH_BATCH_SIZE = 200
+# Keys per cache read.
+CACHE_READ_BATCH_SIZE = 500
+
+UPSERT_OPTIONS = {
+    "update_conflicts": True,
+    "unique_fields": ["attempt", "question_id"],
+    "update_fields": ["question_type", "answer_data"],
+}
+
+
+def save_student_answer(attempt, question_id, question_type, answer_data):
+    """
+    Insert or replace the attempt's answer to a question with one upsert on
+    the (attempt, question_id) unique constraint.
+    """
+    StudentAnswer.objects.bulk_create(
+        [
+            StudentAnswer(
+                attempt=attempt,
+                question_id=question_id,
+                question_type=question_type,
+                answer_data=answer_data,
+            )
+        ],
+        **UPSERT_OPTIONS,
+    )
+
+
+def fill_unanswered(attempt, answers):
+    """
+    Insert (question_id, question_type, answer_data) rows, leaving any
+    question the student answered meanwhile untouched.
+    """
+    StudentAnswer.objects.bulk_create(
+        [
+            StudentAnswer(attempt=attempt, question_id=question_id, question_type=question_type, answer_data=answer_data)
+            for question_id, question_type, answer_data in answers
+        ],
+        ignore_conflicts=True,
+    )
+
+
+# -------------------------------------------------------------------
+# Write-behind buffer
+# -------------------------------------------------------------------
+# Stores that every worker shares and that do not evict before the TTL when
+# configured for it (Redis with maxmemory-policy noeviction). Database and
+# file caches are left out on purpose: DatabaseCache counts its whole table
+# on every set(), which costs more than the upsert it would replace, and
+# file caches are per host.
+ANSWER_BUFFER_BACKENDS = ("django.core.cache.backends.redis.RedisCache",)
+
+
+def answer_buffer_store_configured():
+    config = settings.CACHES.get(ANSWERS)
+    return bool(config) and config.get("BACKEND") in ANSWER_BUFFER_BACKENDS
+
+
+def answer_buffer_enabled():
+    """
+    True when answers are buffered: ANSWER_WRITE_BEHIND is on and a shared
+    store is configured (ANSWER_BUFFER_REDIS_URL). Without one, answers are
+    upserted directly and a warning is logged.
+    """
+    if not settings.ANSWER_WRITE_BEHIND:
+        return False
+    if not answer_buffer_store_configured():
+        _warn_missing_store()
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def _warn_missing_store():
+    logger.warning(
+        "ANSWER_WRITE_BEHIND is on but no shared answer buffer store is configured "
+        "(set ANSWER_BUFFER_REDIS_URL); saving answers directly."
+    )
+
+
+def _selected_question_ids(attempt_meta):
+    meta = attempt_meta or {}
+    return [str(qid) for qid in meta.get("selected_qids") or meta.get("selected_question_ids") or []]
+
+
+def _buffer_key(attempt_id, question_id):
+    return f"answer-buffer:{attempt_id}:{question_id}"
+
+
+def _flushed_key(attempt_id):
+    return f"answer-buffer-flushed:{attempt_id}"
+
+
+def record_student_answer(attempt, question_id, question_type, answer_data):
+    """
+    Buffer the answer in write-behind mode, otherwise save it right away.
+
+    Each question has its own key and the write is a single set(), so
+    concurrent requests for one attempt never overwrite each other's
+    answers. Questions outside the attempt's selection are saved directly,
+    since the flush only looks for the selected ones.
+    """
+    if not answer_buffer_enabled() or str(question_id) not in _selected_question_ids(attempt.meta):
+        save_student_answer(attempt, question_id, question_type, answer_data)
+        return
+    get_cache(ANSWERS).set(
+        _buffer_key(attempt.id, question_id),
+        [uuid.uuid4().hex, question_type, answer_data],
+        ANSWER_BUFFER_TTL_SECONDS,
+    )
+
+
+def _buffered_answers(attempt_id, question_ids, cached):
+    """{question_id: (token, question_type, answer_data)} for the attempt's buffered answers."""
+    buffered = {}
+    for question_id in question_ids:
+        entry = cached.get(_buffer_key(attempt_id, question_id))
+        if entry:
+            buffered[question_id] = tuple(entry)
+    return buffered
+
+
+def _answer_row(attempt_id, question_id, question_type, answer_data):
+    return StudentAnswer(
+        attempt_id=attempt_id,
+        question_id=uuid.UUID(question_id),
+        question_type=question_type,
+        answer_data=answer_data,
+    )
+
+
+def attempt_answers(attempt):
+    """
+    The attempt's answers as StudentAnswer instances: saved rows overlaid
+    with any newer buffered ones, which are not saved.
+    """
+    answers = {str(answer.question_id): answer for answer in attempt.answers.all()}
+    if answer_buffer_enabled():
+        question_ids = _selected_question_ids(attempt.meta)
+        cached = get_cache(ANSWERS).get_many([_buffer_key(attempt.id, qid) for qid in question_ids])
+        for question_id, (_, question_type, answer_data) in _buffered_answers(attempt.id, question_ids, cached).items():
+            answers[question_id] = _answer_row(attempt.id, question_id, question_type, answer_data)
+    return list(answers.values())
+
+
+def _get_many(cache, keys):
+    cached = {}
+    for start in range(0, len(keys), CACHE_READ_BATCH_SIZE):
+        cached.update(cache.get_many(keys[start:start + CACHE_READ_BATCH_SIZE]))
+    return cached
+
+
+def _flush(attempts, *, force=False):
+    """
+    Upsert the buffered answers of `attempts` ((id, meta) pairs) that changed
+    since their last flush, or all of them with `force`.
+
+    Every buffered answer carries a token that changes on each submission;
+    the flusher remembers the tokens it wrote. A submission that lands
+    mid-flush gets a new token, so the next flush writes it.
+    """
+    cache = get_cache(ANSWERS)
+    question_ids = {attempt_id: _selected_question_ids(meta) for attempt_id, meta in attempts}
+    keys = [_flushed_key(attempt_id) for attempt_id in question_ids]
+    keys += [_buffer_key(attempt_id, qid) for attempt_id, qids in question_ids.items() for qid in qids]
+    cached = _get_many(cache, keys)
+    rows = []
+    flushed = {}
+    for attempt_id, qids in question_ids.items():
+        buffered = _buffered_answers(attempt_id, qids, cached)
+        written = {} if force else cached.get(_flushed_key(attempt_id)) or {}
+        changed = {qid: entry for qid, entry in buffered.items() if written.get(qid) != entry[0]}
+        if not changed:
+            continue
+        rows.extend(
+            _answer_row(attempt_id, qid, question_type, answer_data)
+            for qid, (_, question_type, answer_data) in changed.items()
+        )
+        flushed[_flushed_key(attempt_id)] = {qid: token for qid, (token, _, _) in buffered.items()}
+    if rows:
+        StudentAnswer.objects.bulk_create(rows, **UPSERT_OPTIONS)
+        cache.set_many(flushed, ANSWER_BUFFER_TTL_SECONDS)
+    return {"attempts": len(flushed), "answers": len(rows)}
+
+
+def flush_answer_buffer(attempt):
+    """Write all of the attempt's buffered answers before they are read from the database."""
+    if answer_buffer_enabled():
+        _flush([(attempt.id, attempt.meta)], force=True)
+
+
+def discard_answer_buffer(attempt):
+    """Drop a finished attempt's buffer once its answers are saved."""
+    if answer_buffer_enabled():
+        keys = [_buffer_key(attempt.id, qid) for qid in _selected_question_ids(attempt.meta)]
+        get_cache(ANSWERS).delete_many(keys + [_flushed_key(attempt.id)])
+
+
+def flush_answer_buffers(*, batch_size=FLUSH_BATCH_SIZE):
+    """
+    Flush the buffers of every recent in-progress attempt. Runs whatever
+    ANSWER_WRITE_BEHIND says, so turning it off leaves nothing behind.
+    Returns {"attempts": n, "answers": n}.
+    """
+    if not answer_buffer_store_configured():
+        return {"attempts": 0, "answers": 0}
+    since = timezone.now() - timedelta(seconds=ANSWER_BUFFER_TTL_SECONDS)
+    attempts = StudentQuizAttempt.objects.filter(completed_at__isnull=True, started_at__gte=since).values_list(
+        "id", "meta"
+    )
+    totals = {"attempts": 0, "answers": 0}
+    last_id = 0
+    while True:
+        chunk = list(attempts.filter(id__gt=last_id).order_by("id")[:batch_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        for name, count in _flush(chunk).items():
+            totals[name] += count
+    return totals
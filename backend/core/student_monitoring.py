@@ -1,10 +1,12 @@
 from collections import defaultdict
 
 from django.db import models
-from django.db.models import Max, Sum
+from django.db.models import Sum
 from django.utils.timezone import localtime
 
-from core.models import StudentQuizAttempt, User
+from core.attempt_archive import latest_completed_attempts_for
+from core.latest_attempts import latest_attempts_queryset
+from core.models import User
 
 pk_timezone = None
 
@@ -51,20 +53,13 @@ def calculate_grade_letter(percentage):
     return "F"
 
 
-def latest_completed_attempts_queryset(student):
-    latest_attempt_times = StudentQuizAttempt.objects.filter(
-        student=student,
-        completed_at__isnull=False,
-    ).values("quiz").annotate(latest=Max("completed_at")).values_list("latest", flat=True)
-
-    return StudentQuizAttempt.objects.filter(
-        student=student,
-        completed_at__in=list(latest_attempt_times),
-    ).select_related("quiz", "quiz__grade", "quiz__subject", "quiz__chapter")
+def latest_completed_attempts(student):
+    """Latest completed attempt per quiz, live or archived, newest first."""
+    return latest_completed_attempts_for(student, "quiz", "quiz__grade", "quiz__subject", "quiz__chapter")
 
 
 def build_student_quiz_history(student):
-    attempts = latest_completed_attempts_queryset(student).order_by("-completed_at")
+    attempts = latest_completed_attempts(student)
     results = []
     for attempt in attempts:
         quiz = attempt.quiz
@@ -108,7 +103,7 @@ def build_learning_diagnosis(student, practice_path_template="/student/attempt-q
         _learning_diagnosis_v2_fields,
     )
 
-    attempts = latest_completed_attempts_queryset(student)
+    attempts = latest_completed_attempts(student)
     quiz_rows = []
     for attempt in attempts:
         quiz = attempt.quiz
@@ -281,19 +276,10 @@ def build_student_score_stats(students):
     if not student_ids:
         return student_stats, []
 
-    attempts_qs = StudentQuizAttempt.objects.filter(
-        student_id__in=student_ids,
-        completed_at__isnull=False,
-    ).select_related("quiz", "student")
-
-    latest_for_avg = {}
-    for attempt in attempts_qs.order_by("student_id", "quiz_id", "-completed_at"):
-        key = (attempt.student_id, attempt.quiz_id)
-        if key not in latest_for_avg:
-            latest_for_avg[key] = attempt
+    attempts_qs = latest_attempts_queryset(student_id__in=student_ids).select_related("quiz")
 
     all_percentages = []
-    for attempt in latest_for_avg.values():
+    for attempt in attempts_qs.order_by("student_id", "quiz_id"):
         percentage = attempt_percentage(attempt, attempt.quiz)
         all_percentages.append(percentage)
         student_stats[attempt.student_id]["percentages"].append(percentage)
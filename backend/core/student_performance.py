@@ -1,15 +1,25 @@
 from collections import defaultdict
 
+from django.db.models import Sum
+
+from core.answer_keys import answer_key_for, get_answer_keys_for_answers, grade_answer_exact
+from core.answer_sheets import load_queryset_answers
 from core.models import (
-    FIBQuestion,
-    MCQQuestion,
-    SCQQuestion,
-    StudentAnswer,
+    ArchivedAttemptSummary,
     StudentQuizAttempt,
     Subject,
 )
 
 
+def _completed_answers(attempts):
+    """Answers of completed `attempts`, packed or not, in one flat list."""
+    return load_queryset_answers(attempts.filter(completed_at__isnull=False))
+
+
+def _summary_subject(summary):
+    return summary.subject.name if summary.subject else "Unknown"
+
+
 def _grade_name_for_filter(user):
     grade = getattr(user, "grade", None)
     if grade is None:
@@ -17,66 +27,27 @@ def _grade_name_for_filter(user):
     return getattr(grade, "name", grade)
 
 
-def _build_question_cache(question_ids):
-    ids = [str(question_id) for question_id in question_ids]
-    if not ids:
-        return {"scq": {}, "mcq": {}, "fib": {}}
-    return {
-        "scq": {
-            str(question.question_id): question
-            for question in SCQQuestion.objects.filter(question_id__in=ids)
-        },
-        "mcq": {
-            str(question.question_id): question
-            for question in MCQQuestion.objects.filter(question_id__in=ids)
-        },
-        "fib": {
-            str(question.question_id): question
-            for question in FIBQuestion.objects.filter(question_id__in=ids)
-        },
-    }
+def _is_answer_correct(ans, answer_keys=None):
+    if answer_keys is None:
+        answer_keys = get_answer_keys_for_answers([ans])
+    return grade_answer_exact(
+        answer_key_for(answer_keys, ans.question_id, ans.question_type),
+        ans.answer_data,
+    )
 
 
-def _get_question_for_answer(ans, question_cache=None):
-    question_id = str(ans.question_id)
-    if question_cache:
-        cached = question_cache.get(ans.question_type, {}).get(question_id)
-        if cached is not None:
-            return cached
-    if ans.question_type == "scq":
-        return SCQQuestion.objects.get(question_id=question_id)
-    if ans.question_type == "mcq":
-        return MCQQuestion.objects.get(question_id=question_id)
-    if ans.question_type == "fib":
-        return FIBQuestion.objects.get(question_id=question_id)
-    return None
-
-
-def _is_answer_correct(ans, question_cache=None):
-    try:
-        if ans.question_type == "scq":
-            q = _get_question_for_answer(ans, question_cache)
-            return ans.answer_data.get("selected") == q.correct_answer
-        if ans.question_type == "mcq":
-            q = _get_question_for_answer(ans, question_cache)
-            correct_set = sorted([x.strip() for x in q.correct_answers.split(",")])
-            selected_set = sorted(ans.answer_data.get("selected", []))
-            return selected_set == correct_set
-        if ans.question_type == "fib":
-            q = _get_question_for_answer(ans, question_cache)
-            return ans.answer_data == q.correct_answers
-    except Exception:
-        return False
-    return False
-
-
-def _overall_student_average_from_answers(answers, question_cache=None):
+def _overall_student_average_from_answers(answers, answer_keys=None, summaries=()):
     """
-    Overall Performance student_avg: average of per-subject correct percentages.
+    Overall Performance student_avg: average of per-subject correct percentages,
+    counting archived attempts through their `summaries`.
     Returns None when the student has no completed-attempt answer data.
     """
     subject_data = defaultdict(lambda: {"total": 0, "correct": 0})
 
+    for summary in summaries:
+        subject_data[_summary_subject(summary)]["total"] += summary.answers
+        subject_data[_summary_subject(summary)]["correct"] += summary.correct_answers
+
     for ans in answers:
         try:
             quiz = ans.attempt.quiz
@@ -85,7 +56,7 @@ def _overall_student_average_from_answers(answers, question_cache=None):
             continue
 
         subject_data[subject]["total"] += 1
-        if _is_answer_correct(ans, question_cache):
+        if _is_answer_correct(ans, answer_keys):
             subject_data[subject]["correct"] += 1
 
     subject_avgs = []
@@ -108,22 +79,23 @@ def batch_overall_student_averages(students):
         return {}
 
     student_ids = [student.id for student in student_list]
-    answers = list(
-        StudentAnswer.objects.filter(
-            attempt__student_id__in=student_ids,
-            attempt__completed_at__isnull=False,
-        ).select_related("attempt__quiz__subject")
+    answers = _completed_answers(
+        StudentQuizAttempt.objects.filter(student_id__in=student_ids).select_related("quiz__subject")
     )
-    question_cache = _build_question_cache({answer.question_id for answer in answers})
+    answer_keys = get_answer_keys_for_answers(answers)
 
     answers_by_student = defaultdict(list)
     for answer in answers:
         answers_by_student[answer.attempt.student_id].append(answer)
+    summaries_by_student = defaultdict(list)
+    for summary in ArchivedAttemptSummary.objects.filter(student_id__in=student_ids).select_related("subject"):
+        summaries_by_student[summary.student_id].append(summary)
 
     return {
         student_id: _overall_student_average_from_answers(
             answers_by_student.get(student_id, []),
-            question_cache,
+            answer_keys,
+            summaries_by_student.get(student_id, []),
         )
         for student_id in student_ids
     }
@@ -138,10 +110,10 @@ def build_subject_performance_rows(student_user):
         lambda: {"student_total": 0, "student_correct": 0, "class_total": 0, "class_correct": 0}
     )
 
-    all_answers = StudentAnswer.objects.filter(
-        attempt__student=student_user,
-        attempt__completed_at__isnull=False,
+    all_answers = _completed_answers(
+        StudentQuizAttempt.objects.filter(student=student_user).select_related("quiz__subject")
     )
+    answer_keys = get_answer_keys_for_answers(all_answers)
 
     for ans in all_answers:
         try:
@@ -150,11 +122,15 @@ def build_subject_performance_rows(student_user):
         except Exception:
             continue
 
-        is_correct = _is_answer_correct(ans)
+        is_correct = _is_answer_correct(ans, answer_keys)
         subject_data[subject]["student_total"] += 1
         if is_correct:
             subject_data[subject]["student_correct"] += 1
 
+    for summary in ArchivedAttemptSummary.objects.filter(student=student_user).select_related("subject"):
+        subject_data[_summary_subject(summary)]["student_total"] += summary.answers
+        subject_data[_summary_subject(summary)]["student_correct"] += summary.correct_answers
+
     grade_name = _grade_name_for_filter(student_user)
     for subject in list(subject_data.keys()):
         subject_obj = Subject.objects.filter(name=subject).first()
@@ -168,15 +144,24 @@ def build_subject_performance_rows(student_user):
         if grade_name:
             class_filters["quiz__grade__name"] = grade_name
 
-        class_attempts = StudentQuizAttempt.objects.filter(**class_filters)
-        class_answers = StudentAnswer.objects.filter(attempt__in=class_attempts)
+        class_answers = _completed_answers(StudentQuizAttempt.objects.filter(**class_filters))
+        class_answer_keys = get_answer_keys_for_answers(class_answers)
 
         for ans in class_answers:
-            is_correct = _is_answer_correct(ans)
+            is_correct = _is_answer_correct(ans, class_answer_keys)
             subject_data[subject]["class_total"] += 1
             if is_correct:
                 subject_data[subject]["class_correct"] += 1
 
+        archived_filters = {"subject": subject_obj}
+        if grade_name:
+            archived_filters["grade__name"] = grade_name
+        archived = ArchivedAttemptSummary.objects.filter(**archived_filters).aggregate(
+            answers=Sum("answers"), correct=Sum("correct_answers")
+        )
+        subject_data[subject]["class_total"] += archived["answers"] or 0
+        subject_data[subject]["class_correct"] += archived["correct"] or 0
+
     rows = []
     total_student_avg = 0
     total_class_avg = 0
@@ -0,0 +1,36 @@
+from django.utils import timezone
+
+from core.authentication import invalidate_cached_users
+from core.models import School, User
+
+
+def effective_account_status(user, today=None):
+    """
+    The account status a user should be shown, with a lapsed subscription
+    reported as expired even before expire_lapsed_subscriptions has stored it.
+    """
+    today = today or timezone.now().date()
+    if user.subscription_expiry and user.subscription_expiry < today:
+        return "expired"
+    return user.account_status
+
+
+def expire_lapsed_subscriptions(today=None):
+    """
+    Persist 'expired' for users and active schools whose subscription date has
+    passed, one UPDATE per table. Requests only derive the status, so this
+    scheduled job is the single writer. The updates skip the model signals,
+    so the affected users' cached auth records are dropped here.
+    """
+    today = today or timezone.now().date()
+    lapsed_users = User.objects.filter(subscription_expiry__lt=today).exclude(account_status="expired")
+    lapsed_schools = School.objects.filter(account_status="active", subscription_expiry__lt=today)
+    user_ids = set(lapsed_users.values_list("id", flat=True))
+    school_ids = list(lapsed_schools.values_list("id", flat=True))
+    # Cached users carry their school, including its account status.
+    user_ids.update(User.objects.filter(school_id__in=school_ids).values_list("id", flat=True))
+
+    users = lapsed_users.update(account_status="expired")
+    schools = lapsed_schools.update(account_status="expired")
+    invalidate_cached_users(*user_ids)
+    return {"users": users, "schools": schools}
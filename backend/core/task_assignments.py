@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db.models import Sum
+
+from core.latest_attempts import latest_attempts_map
+from core.models import QuizQuestionAssignment
+
+
+@dataclass
+class TaskAssignment:
+    task: object
+    task_quizzes: list
+    students: list
+    is_grade_wide: bool
+
+    @property
+    def quizzes(self):
+        return [tq.quiz for tq in self.task_quizzes]
+
+
+@dataclass
+class TaskAssignmentSet:
+    assignments: list
+    attempts_map: dict
+    quiz_totals: dict
+
+    def is_completed(self, student_id, quiz_id):
+        return (student_id, quiz_id) in self.attempts_map
+
+    def count_items(self, assignment):
+        """Return (completed, pending) quiz items for one task."""
+        completed = 0
+        pending = 0
+        for student in assignment.students:
+            for tq in assignment.task_quizzes:
+                if self.is_completed(student.id, tq.quiz_id):
+                    completed += 1
+                else:
+                    pending += 1
+        return completed, pending
+
+
+def quiz_total_marks_map(quizzes):
+    """Map quiz_id -> total marks for `quizzes` in a single query."""
+    quizzes_by_id = {quiz.id: quiz for quiz in quizzes}
+    if not quizzes_by_id:
+        return {}
+
+    question_counts = dict(
+        QuizQuestionAssignment.objects.filter(quiz_id__in=quizzes_by_id)
+        .values("quiz_id")
+        .annotate(total=Sum("num_questions"))
+        .values_list("quiz_id", "total")
+    )
+    return {
+        quiz_id: (question_counts.get(quiz_id) or 0) * quiz.marks_per_question
+        for quiz_id, quiz in quizzes_by_id.items()
+    }
+
+
+def percentage_of_total(score, total_marks):
+    if not total_marks:
+        return 0.0
+    return round((score / total_marks) * 100, 2)
+
+
+def resolve_task_assignments(tasks, scoped_students):
+    """
+    Resolve the assigned students and completion state of every task at once.
+
+    `tasks` must prefetch `task_quizzes` (with `quiz`) and `target_students`;
+    `scoped_students` is the queryset of students the task owner may see.
+    Beyond those prefetches this runs three queries however many tasks there
+    are: scoped students, latest attempts, and quiz totals.
+    """
+    tasks = list(tasks)
+    students = list(scoped_students.select_related("grade").order_by("full_name", "username"))
+    students_by_grade = defaultdict(list)
+    for student in students:
+        students_by_grade[student.grade_id].append(student)
+
+    assignments = []
+    quizzes = {}
+    for task in tasks:
+        task_quizzes = [tq for tq in task.task_quizzes.all() if tq.quiz]
+        for tq in task_quizzes:
+            quizzes[tq.quiz_id] = tq.quiz
+
+        target_ids = {student.id for student in task.target_students.all()}
+        if target_ids:
+            assigned = [student for student in students if student.id in target_ids]
+        elif task.target_grade_id:
+            assigned = list(students_by_grade.get(task.target_grade_id, []))
+        else:
+            assigned = []
+
+        assignments.append(
+            TaskAssignment(
+                task=task,
+                task_quizzes=task_quizzes,
+                students=assigned,
+                is_grade_wide=bool(task.target_grade_id) and not target_ids,
+            )
+        )
+
+    assigned_ids = {student.id for assignment in assignments for student in assignment.students}
+    attempts_map = latest_attempts_map(assigned_ids, quizzes) if assigned_ids and quizzes else {}
+
+    return TaskAssignmentSet(
+        assignments=assignments,
+        attempts_map=attempts_map,
+        quiz_totals=quiz_total_marks_map(quizzes.values()),
+    )
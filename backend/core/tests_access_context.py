@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Grade, School
+from core.permissions import get_access_context
+
+User = get_user_model()
+
+
+class AccessContextTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(
+            name="Context School",
+            city="Lahore",
+            province="Punjab",
+            contact_email="context@school.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.grade = Grade.objects.create(name="Grade 6")
+        self.student = User.objects.create_user(
+            username="context_student",
+            password="testpass123",
+            role="student",
+            school=self.school,
+            grade=self.grade,
+        )
+
+    def test_context_is_computed_once_per_request(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.student.pk)
+
+        with self.assertNumQueries(1):
+            context = get_access_context(request)
+        with self.assertNumQueries(0):
+            self.assertIs(get_access_context(request), context)
+
+        self.assertTrue(context.subscription_active)
+        self.assertTrue(context.is_student)
+        self.assertFalse(context.is_staff_user)
+        self.assertEqual(context.school, self.school)
+
+    def test_context_is_rebuilt_when_the_user_changes(self):
+        request = RequestFactory().get("/")
+        request.user = self.student
+        self.assertTrue(get_access_context(request).subscription_active)
+
+        School.objects.filter(pk=self.school.pk).update(account_status="expired")
+        request.user = User.objects.select_related("school").get(pk=self.student.pk)
+        self.assertFalse(get_access_context(request).subscription_active)
+
+    def test_jwt_request_loads_school_with_the_user(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.student)}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/student/results/")
+
+        self.assertEqual(response.status_code, 200)
+        school_table = School._meta.db_table
+        self.assertFalse(
+            [q["sql"] for q in queries if q["sql"].startswith("SELECT") and f'FROM "{school_table}"' in q["sql"]]
+        )
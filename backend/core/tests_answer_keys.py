@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.answer_keys import answer_key_namespace, clear_answer_keys, get_answer_keys
+from core.cache_layer import ANSWER_KEYS, CATALOG, bump_namespace, cache_stats, reset_cache_stats
+from core.models import (
+    FIBQuestion,
+    Grade,
+    MCQQuestion,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    SCQQuestion,
+    StudentQuizAttempt,
+    Subject,
+)
+
+User = get_user_model()
+
+QUESTION_TABLES = [model._meta.db_table for model in (SCQQuestion, MCQQuestion, FIBQuestion)]
+
+
+class AnswerKeyCacheTests(TestCase):
+    def setUp(self):
+        clear_answer_keys()
+        reset_cache_stats()
+        grade = Grade.objects.create(name="Grade 5")
+        subject = Subject.objects.create(name="Math", grade=grade)
+        self.quiz = Quiz.objects.create(title="Keys quiz", grade=grade, subject=subject, marks_per_question=2)
+        banks = {
+            qtype: QuestionBank.objects.create(title=f"{qtype} bank", type=qtype)
+            for qtype in ("SCQ", "MCQ", "FIB")
+        }
+        for bank in banks.values():
+            QuizQuestionAssignment.objects.create(quiz=self.quiz, question_bank=bank, num_questions=1)
+        self.scq = SCQQuestion.objects.create(
+            question_bank=banks["SCQ"], question_text="<p>2 + 2?</p>",
+            option_a="3", option_b="4", option_c="5", option_d="6", correct_answer="B",
+        )
+        self.mcq = MCQQuestion.objects.create(
+            question_bank=banks["MCQ"], question_text="<p>Even numbers?</p>",
+            option_a="2", option_b="3", option_c="4", option_d="5", correct_answers="A,C",
+        )
+        self.fib = FIBQuestion.objects.create(
+            question_bank=banks["FIB"], question_text="<p>10 x 100 = [a]</p>", correct_answers={"a": "1,000"},
+        )
+        self.student = User.objects.create_user(
+            username="keys_student",
+            password="testpass123",
+            role="student",
+            grade=grade,
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.attempt = StudentQuizAttempt.objects.create(
+            student=self.student,
+            quiz=self.quiz,
+            meta={"selected_qids": [str(q.question_id) for q in (self.scq, self.mcq, self.fib)]},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def _submit(self, question, qtype, answer_data):
+        return self.client.post(
+            "/student/submit-answer/",
+            {
+                "attempt_id": self.attempt.id,
+                "question_id": str(question.question_id),
+                "question_type": qtype,
+                "answer_data": answer_data,
+            },
+            format="json",
+        )
+
+    def test_repeat_submissions_grade_without_question_queries(self):
+        self.assertTrue(self._submit(self.scq, "scq", {"selected": "4"}).data["is_correct"])
+
+        with CaptureQueriesContext(connection) as queries:
+            mcq = self._submit(self.mcq, "mcq", {"selected": ["4", "2"]})
+            fib = self._submit(self.fib, "fib", {"a": "1000"})
+
+        self.assertTrue(mcq.data["is_correct"])
+        self.assertTrue(fib.data["is_correct"])
+        self.assertEqual(fib.data["current_correct"], 3)
+        question_selects = [
+            q["sql"] for q in queries
+            if q["sql"].startswith("SELECT") and any(f'FROM "{table}"' in q["sql"] for table in QUESTION_TABLES)
+        ]
+        # One miss per newly answered question; every other lookup is a hit.
+        self.assertEqual(len(question_selects), 2)
+        self.assertGreater(cache_stats([ANSWER_KEYS])[ANSWER_KEYS]["hits"], 0)
+
+    def test_finalize_fills_unanswered_and_reports_cached_keys(self):
+        self._submit(self.scq, "scq", {"selected": "3"})
+
+        response = self.client.post("/student/quiz/finalize/", {"attempt_id": self.attempt.id}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_questions"], 3)
+        self.assertEqual(response.data["correct_answers"], 0)
+        feedback = {item["question_type"]: item for item in response.data["question_feedback"]}
+        self.assertEqual(feedback["scq"]["correct_answer"], "4")
+        self.assertEqual(feedback["mcq"]["correct_answer"], ["2", "4"])
+        self.assertEqual(feedback["fib"]["correct_answer"], {"a": "1,000"})
+
+    def test_saving_a_question_drops_its_cached_key(self):
+        self.assertEqual(get_answer_keys([self.scq.question_id])[str(self.scq.question_id)].correct_answer, "4")
+
+        self.scq.correct_answer = "C"
+        self.scq.save()
+
+        self.assertEqual(get_answer_keys([self.scq.question_id])[str(self.scq.question_id)].correct_answer, "5")
+
+        self.scq.delete()
+        self.assertEqual(get_answer_keys([self.scq.question_id]), {})
+
+    def test_a_save_in_another_process_drops_this_processs_key(self):
+        question_id = str(self.scq.question_id)
+        self.assertEqual(get_answer_keys([question_id])[question_id].correct_answer, "4")
+
+        # Another worker saves the question: the row changes and the shared
+        # version is bumped, but this process's local entry is untouched.
+        SCQQuestion.objects.filter(pk=self.scq.pk).update(correct_answer="C")
+        self.assertEqual(get_answer_keys([question_id])[question_id].correct_answer, "4")
+        bump_namespace(CATALOG, answer_key_namespace(question_id))
+
+        self.assertEqual(get_answer_keys([question_id])[question_id].correct_answer, "5")
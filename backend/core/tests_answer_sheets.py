@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.answer_keys import clear_answer_keys
+from core.answer_sheets import attempt_sheet_answers, load_queryset_answers
+from core.models import (
+    FIBQuestion,
+    Grade,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    SCQQuestion,
+    StudentAnswer,
+    StudentQuizAttempt,
+    Subject,
+)
+from core.student_performance import build_subject_performance_rows
+
+User = get_user_model()
+
+
+class AnswerSheetTests(TestCase):
+    def setUp(self):
+        clear_answer_keys()
+        grade = Grade.objects.create(name="Grade 6")
+        subject = Subject.objects.create(name="Science", grade=grade)
+        quiz = Quiz.objects.create(title="Sheet quiz", grade=grade, subject=subject, marks_per_question=1)
+        scq_bank = QuestionBank.objects.create(title="Sheet SCQ", type="SCQ")
+        fib_bank = QuestionBank.objects.create(title="Sheet FIB", type="FIB")
+        QuizQuestionAssignment.objects.create(quiz=quiz, question_bank=scq_bank, num_questions=1)
+        QuizQuestionAssignment.objects.create(quiz=quiz, question_bank=fib_bank, num_questions=1)
+        self.scq = SCQQuestion.objects.create(
+            question_bank=scq_bank, question_text="Water boils at?",
+            option_a="50", option_b="100", option_c="150", option_d="200", correct_answer="B",
+        )
+        self.fib = FIBQuestion.objects.create(
+            question_bank=fib_bank, question_text="H2O is [a]", correct_answers={"a": "water"},
+        )
+        self.student = User.objects.create_user(
+            username="sheet_student",
+            password="testpass123",
+            role="student",
+            grade=grade,
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.attempt = StudentQuizAttempt.objects.create(
+            student=self.student,
+            quiz=quiz,
+            meta={"selected_qids": [str(self.scq.question_id), str(self.fib.question_id)]},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+        self.client.post(
+            "/student/submit-answer/",
+            {
+                "attempt_id": self.attempt.id,
+                "question_id": str(self.scq.question_id),
+                "question_type": "scq",
+                "answer_data": {"selected": "100"},
+            },
+            format="json",
+        )
+        self.client.post("/student/quiz/finalize/", {"attempt_id": self.attempt.id}, format="json")
+        StudentQuizAttempt.objects.filter(pk=self.attempt.pk).update(completed_at=timezone.now() - timedelta(days=40))
+
+    def _reads(self):
+        return (
+            self.client.get(f"/student/quiz-result/{self.attempt.id}/").data,
+            self.client.get("/student/results/").data,
+            build_subject_performance_rows(self.student),
+        )
+
+    def test_packing_replaces_rows_and_keeps_every_read_the_same(self):
+        before = self._reads()
+        self.assertEqual(StudentAnswer.objects.filter(attempt=self.attempt).count(), 2)
+
+        out = StringIO()
+        call_command("pack_answer_sheets", stdout=out)
+
+        self.assertIn("Packed 1 attempt(s); deleted 2 answer row(s).", out.getvalue())
+        self.assertFalse(StudentAnswer.objects.filter(attempt=self.attempt).exists())
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.answer_sheet["types"], "sf")
+        self.assertEqual(self.attempt.answer_sheet["correct"], "10")
+        self.assertIsNotNone(self.attempt.answers_packed_at)
+        self.assertEqual(
+            [(answer.question_id, answer.is_correct) for answer in attempt_sheet_answers(self.attempt)],
+            [(self.scq.question_id, True), (self.fib.question_id, False)],
+        )
+        self.assertEqual(self._reads(), before)
+
+    def test_recent_attempts_are_left_unpacked(self):
+        out = StringIO()
+        call_command("pack_answer_sheets", "--days", "60", stdout=out)
+
+        self.assertIn("Packed 0 attempt(s)", out.getvalue())
+        self.attempt.refresh_from_db()
+        self.assertIsNone(self.attempt.answer_sheet)
+        self.assertEqual(StudentAnswer.objects.filter(attempt=self.attempt).count(), 2)
+
+    def test_report_reads_unpacked_rows_through_a_subquery(self):
+        call_command("pack_answer_sheets", stdout=StringIO())
+        for _ in range(3):
+            attempt = StudentQuizAttempt.objects.create(
+                student=self.student, quiz=self.attempt.quiz, completed_at=timezone.now()
+            )
+            StudentAnswer.objects.create(
+                attempt=attempt, question_id=self.scq.question_id, question_type="scq", answer_data={"selected": "50"},
+            )
+
+        attempts = StudentQuizAttempt.objects.filter(quiz=self.attempt.quiz).select_related("quiz__subject")
+        with CaptureQueriesContext(connection) as queries:
+            answers = load_queryset_answers(attempts)
+            subjects = {answer.attempt.quiz.subject.name for answer in answers}
+
+        self.assertEqual(len(queries), 2)
+        self.assertIn("IN (SELECT", queries[1]["sql"])
+        self.assertEqual(len(answers), 5)
+        self.assertEqual(subjects, {"Science"})
@@ -0,0 +1,192 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from core.answer_keys import clear_answer_keys
+from core.models import (
+    ArchivedAttemptSummary,
+    ArchivedQuizAttempt,
+    Grade,
+    QuestionBank,
+    QuestionReport,
+    Quiz,
+    QuizQuestionAssignment,
+    SCQQuestion,
+    StudentAnswer,
+    StudentQuizAttempt,
+    Subject,
+    TeacherTask,
+    TeacherTaskQuiz,
+)
+from core.student_performance import batch_overall_student_averages, build_subject_performance_rows
+from core.views import admin_student_quiz_history, list_quiz_results, submit_quiz
+
+User = get_user_model()
+
+
+class AttemptArchiveTests(TestCase):
+    def setUp(self):
+        clear_answer_keys()
+        grade = Grade.objects.create(name="Grade 7")
+        subject = Subject.objects.create(name="History", grade=grade)
+        self.quiz = Quiz.objects.create(title="Archive quiz", grade=grade, subject=subject, marks_per_question=1)
+        bank = QuestionBank.objects.create(title="Archive SCQ", type="SCQ")
+        QuizQuestionAssignment.objects.create(quiz=self.quiz, question_bank=bank, num_questions=2)
+        self.questions = [
+            SCQQuestion.objects.create(
+                question_bank=bank, question_text=f"Q{n}?",
+                option_a="yes", option_b="no", option_c="maybe", option_d="never", correct_answer="A",
+            )
+            for n in range(2)
+        ]
+        self.student = self._student("archive_student")
+        self.classmate = self._student("archive_classmate")
+        self.client = APIClient()
+        # Reports grade SCQ answers verbatim against the option label.
+        self.old = self._take_quiz(self.student, ["A", "no"], days_ago=400)
+        self.recent = self._take_quiz(self.student, ["A", "A"], days_ago=10)
+        self.classmate_old = self._take_quiz(self.classmate, ["no", "no"], days_ago=500)
+
+    def _student(self, username):
+        return User.objects.create_user(
+            username=username,
+            password="testpass123",
+            role="student",
+            grade=self.quiz.grade,
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+
+    def _take_quiz(self, student, selections, days_ago):
+        attempt = StudentQuizAttempt.objects.create(
+            student=student,
+            quiz=self.quiz,
+            meta={"selected_qids": [str(q.question_id) for q in self.questions]},
+        )
+        self.client.force_authenticate(user=student)
+        for question, selected in zip(self.questions, selections):
+            self.client.post(
+                "/student/submit-answer/",
+                {
+                    "attempt_id": attempt.id,
+                    "question_id": str(question.question_id),
+                    "question_type": "scq",
+                    "answer_data": {"selected": selected},
+                },
+                format="json",
+            )
+        self.client.post("/student/quiz/finalize/", {"attempt_id": attempt.id}, format="json")
+        StudentQuizAttempt.objects.filter(pk=attempt.pk).update(completed_at=timezone.now() - timedelta(days=days_ago))
+        return attempt
+
+    def _history(self):
+        self.client.force_authenticate(user=self.student)
+        return (
+            self.client.get(f"/student/quiz-result/{self.old.id}/").data,
+            self.client.get("/student/results/").data,
+            build_subject_performance_rows(self.student),
+            batch_overall_student_averages([self.student, self.classmate]),
+        )
+
+    def test_archiving_moves_old_attempts_and_history_reads_both_tables(self):
+        before = self._history()
+
+        out = StringIO()
+        call_command("archive_attempts", stdout=out)
+
+        self.assertIn("Archived 2 attempt(s) with 4 answer(s).", out.getvalue())
+        self.assertEqual(
+            set(ArchivedQuizAttempt.objects.values_list("id", flat=True)), {self.old.id, self.classmate_old.id}
+        )
+        self.assertEqual(list(StudentQuizAttempt.objects.values_list("id", flat=True)), [self.recent.id])
+        self.assertEqual(StudentAnswer.objects.count(), 2)
+        summary = ArchivedAttemptSummary.objects.get(student=self.student)
+        self.assertEqual(
+            (summary.subject, summary.grade, summary.attempts, summary.answers, summary.correct_answers),
+            (self.quiz.subject, self.quiz.grade, 1, 2, 1),
+        )
+        self.assertEqual(self._history(), before)
+
+    def test_rerun_adds_to_summaries_and_skips_reported_attempts(self):
+        call_command("archive_attempts", "--days", "450", stdout=StringIO())
+        self._take_quiz(self.classmate, ["A", "B"], days_ago=300)
+        QuestionReport.objects.create(
+            reported_by=self.student, question_id=self.questions[0].question_id, question_type="scq", attempt=self.old,
+        )
+
+        call_command("archive_attempts", "--days", "5", stdout=StringIO())
+
+        self.assertTrue(StudentQuizAttempt.objects.filter(pk=self.old.pk).exists())
+        summary = ArchivedAttemptSummary.objects.get(student=self.student)
+        self.assertEqual((summary.attempts, summary.answers, summary.correct_answers), (1, 2, 2))
+        summary = ArchivedAttemptSummary.objects.get(student=self.classmate)
+        self.assertEqual((summary.attempts, summary.answers, summary.correct_answers), (2, 4, 1))
+
+    def _classmate_history(self):
+        """Every quiz-history reader for the classmate, whose only attempt is old."""
+        self.client.force_authenticate(user=self.classmate)
+        request = APIRequestFactory().get("/quiz-results/")
+        force_authenticate(request, user=self.classmate)
+        admin_request = RequestFactory().get("/")
+        admin_request.user = self.admin
+        with patch("core.views.render", side_effect=lambda request, template, context: context["quiz_history"]):
+            admin_history = admin_student_quiz_history(admin_request, self.classmate.id)
+        self.client.force_authenticate(user=self.teacher)
+        teacher_history = self.client.get(f"/api/teacher/student/{self.classmate.username}/quiz-history/").data
+        self.client.force_authenticate(user=self.classmate)
+        return (
+            self.client.get("/student/quiz-history/").data,
+            teacher_history,
+            admin_history,
+            list_quiz_results(request).data,
+            self.client.get("/api/student/tasks/").data["summary"],
+        )
+
+    def test_quiz_history_endpoints_read_archived_attempts(self):
+        User.objects.filter(pk=self.classmate.pk).update(city="Lahore", school_name="City School")
+        self.teacher = User.objects.create_user(
+            username="archive_teacher", password="testpass123", role="teacher", city="Lahore",
+            school_name="City School", account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.admin = User.objects.create_user(username="archive_admin", password="testpass123", role="admin")
+        task = TeacherTask.objects.create(teacher=self.teacher, message="Revise", due_date=timezone.now().date())
+        task.target_students.add(self.classmate)
+        TeacherTaskQuiz.objects.create(task=task, quiz=self.quiz)
+        before = self._classmate_history()
+        self.assertEqual(len(before[0]["results"]), 1)
+        self.assertEqual(before[1]["results"], before[0]["results"])
+        self.assertEqual(len(before[2]), 1)
+        self.assertEqual(before[4]["pending_quiz_count"], 0)
+
+        call_command("archive_attempts", stdout=StringIO())
+
+        self.assertFalse(StudentQuizAttempt.objects.filter(student=self.classmate).exists())
+        self.assertEqual(self._classmate_history(), before)
+
+    def test_submitting_a_better_score_keeps_the_archived_best(self):
+        call_command("archive_attempts", stdout=StringIO())
+        attempt = StudentQuizAttempt.objects.create(student=self.classmate, quiz=self.quiz)
+        request = RequestFactory().post(
+            f"/student/submit-quiz/{attempt.id}/",
+            data=json.dumps({"answers": [
+                {"question_id": str(question.question_id), "question_type": "scq", "answer": "A"}
+                for question in self.questions
+            ]}),
+            content_type="application/json",
+        )
+        request.user = self.classmate
+
+        response = submit_quiz(request, attempt.id)
+
+        self.assertEqual(json.loads(response.content)["result"]["marks_obtained"], 2)
+        attempt.refresh_from_db()
+        self.assertIsNotNone(attempt.completed_at)
+        self.assertTrue(ArchivedQuizAttempt.objects.filter(pk=self.classmate_old.pk).exists())
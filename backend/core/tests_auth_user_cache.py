@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import SchoolAwareJWTAuthentication
+from core.models import Grade, School
+from core.subscription_expiry import expire_lapsed_subscriptions
+
+User = get_user_model()
+
+
+class AuthUserCacheTests(TestCase):
+    def setUp(self):
+        caches["users"].clear()
+        self.student = User.objects.create_user(
+            username="cached_student",
+            password="testpass123",
+            role="student",
+            full_name="Cached Student",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.student)}")
+
+    def _user_selects(self, queries):
+        return [
+            q["sql"] for q in queries
+            if q["sql"].startswith("SELECT") and f'FROM "{User._meta.db_table}"' in q["sql"]
+        ]
+
+    def test_second_request_skips_the_user_lookup(self):
+        self.assertEqual(self.client.get("/student/results/").status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/student/results/")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self._user_selects(queries), [])
+
+    def test_cached_user_reads_its_fields_school_and_grade_without_queries(self):
+        self.student.school = School.objects.create(name="Cache School", city="Lahore", province="Punjab")
+        self.student.grade = Grade.objects.create(name="Grade 5")
+        self.student.email = "cached@school.test"
+        self.student.save()
+        token = AccessToken.for_user(self.student)
+        SchoolAwareJWTAuthentication().get_user(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            user = SchoolAwareJWTAuthentication().get_user(token)
+            read = (user.full_name, user.email, user.school.name, user.grade.name, user.date_joined)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(read[:4], ("Cached Student", "cached@school.test", "Cache School", "Grade 5"))
+        response = self.client.get("/api/user/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["full_name"], "Cached Student")
+
+    def test_bulk_subscription_expiry_drops_the_cached_record(self):
+        self.client.get("/student/results/")
+        User.objects.filter(pk=self.student.pk).update(subscription_expiry=timezone.now().date() - timedelta(days=1))
+
+        expire_lapsed_subscriptions()
+
+        user = SchoolAwareJWTAuthentication().get_user(AccessToken.for_user(self.student))
+        self.assertEqual(user.account_status, "expired")
+
+    def test_saving_the_user_drops_the_cached_record(self):
+        self.client.get("/student/results/")
+
+        self.student.is_active = False
+        self.student.save()
+
+        self.assertEqual(self.client.get("/student/results/").status_code, 401)
@@ -0,0 +1,169 @@
+import gzip
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.attempt_archive import archive_attempts
+from core.backups import create_backup, restore_streaming_backup
+from core.models import (
+    ArchivedAttemptSummary,
+    ArchivedQuizAttempt,
+    BackupRecord,
+    Grade,
+    Quiz,
+    StudentAnswer,
+    StudentQuizAttempt,
+    Subject,
+)
+
+User = get_user_model()
+
+
+def read_backup(record):
+    from core.backups import backup_dir
+
+    with gzip.open(f"{backup_dir()}/{record.filename}", "rt", encoding="utf-8") as backup:
+        return [json.loads(line) for line in backup]
+
+
+class StreamingBackupTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+
+        grade = Grade.objects.create(name="Grade 8")
+        subject = Subject.objects.create(name="History", grade=grade)
+        self.quiz = Quiz.objects.create(title="Backup quiz", grade=grade, subject=subject, marks_per_question=1)
+        self.student = User.objects.create_user(username="backup_student", password="testpass123", role="student")
+        self.attempt = StudentQuizAttempt.objects.create(student=self.student, quiz=self.quiz)
+        for _ in range(3):
+            self._answer(self.attempt)
+
+    def _answer(self, attempt, question_type="SCQ"):
+        return StudentAnswer.objects.create(
+            attempt=attempt,
+            question_id=uuid.uuid4(),
+            question_type=question_type,
+            answer_data={"selected": "A"},
+        )
+
+    def _path(self, record):
+        return f"{self.media_root}/backups/{record.filename}"
+
+    def test_full_backup_round_trips_through_streaming_restore(self):
+        record = create_backup(chunk_size=2)
+
+        header, *lines = read_backup(record)
+        self.assertEqual(header["kind"], "full")
+        answer_lines = [line for line in lines if line["model"] == "core.studentanswer"]
+        self.assertEqual(len(answer_lines), 3)
+        attempt_line = next(line for line in lines if line["model"] == "core.studentquizattempt")
+        self.assertEqual(attempt_line["fields"]["student"], ["backup_student"])
+        self.assertEqual(record.row_count, len(lines))
+
+        StudentQuizAttempt.objects.all().delete()
+        self.assertEqual(StudentAnswer.objects.count(), 0)
+
+        loaded = restore_streaming_backup(f"{self.media_root}/backups/{record.filename}", batch_size=4)
+
+        self.assertEqual(loaded, len(lines))
+        self.assertEqual(StudentAnswer.objects.filter(attempt__student=self.student).count(), 3)
+        self.assertTrue(StudentQuizAttempt.objects.filter(pk=self.attempt.pk, quiz=self.quiz).exists())
+
+    def test_incremental_backup_only_carries_changed_append_heavy_rows(self):
+        with self.assertRaises(CommandError):
+            call_command("backupdata", "--incremental")
+
+        create_backup()
+        new_answer = self._answer(self.attempt)
+        StudentQuizAttempt.objects.filter(pk=self.attempt.pk).update(completed_at=timezone.now())
+
+        record = create_backup(incremental=True)
+
+        lines = read_backup(record)[1:]
+        self.assertEqual(record.kind, BackupRecord.KIND_INCREMENTAL)
+        self.assertEqual(
+            sorted((line["model"], line["pk"]) for line in lines if line["model"] == "core.studentquizattempt"),
+            [("core.studentquizattempt", self.attempt.pk)],
+        )
+        answer_pks = {line["pk"] for line in lines if line["model"] == "core.studentanswer"}
+        # The completed attempt brings all its answers along.
+        self.assertIn(new_answer.pk, answer_pks)
+        self.assertEqual(len(answer_pks), 4)
+        self.assertFalse({line["model"] for line in lines} - {"core.studentquizattempt", "core.studentanswer"})
+
+        later = create_backup(incremental=True)
+        self.assertEqual(later.row_count, 0)
+
+    def test_restoring_full_then_incremental_does_not_revive_archived_attempts(self):
+        old = StudentQuizAttempt.objects.create(student=self.student, quiz=self.quiz)
+        for _ in range(2):
+            self._answer(old, question_type="scq")
+        StudentQuizAttempt.objects.filter(pk=old.pk).update(completed_at=timezone.now() - timedelta(days=800))
+        full = create_backup()
+        archive_attempts()
+        incremental = create_backup(incremental=True)
+
+        StudentQuizAttempt.objects.all().delete()
+        ArchivedQuizAttempt.objects.all().delete()
+        ArchivedAttemptSummary.objects.all().delete()
+        restore_streaming_backup(self._path(full))
+        self.assertTrue(StudentQuizAttempt.objects.filter(pk=old.pk).exists())
+        restore_streaming_backup(self._path(incremental))
+
+        self.assertFalse(StudentQuizAttempt.objects.filter(pk=old.pk).exists())
+        self.assertFalse(StudentAnswer.objects.filter(attempt_id=old.pk).exists())
+        self.assertTrue(ArchivedQuizAttempt.objects.filter(pk=old.pk).exists())
+        self.assertEqual(ArchivedAttemptSummary.objects.get(student=self.student).attempts, 1)
+        self.assertEqual(list(StudentQuizAttempt.objects.values_list("pk", flat=True)), [self.attempt.pk])
+
+    def test_incremental_restores_attempts_of_students_and_quizzes_created_after_the_full_backup(self):
+        full = create_backup()
+        student = User.objects.create_user(username="late_student", password="testpass123", role="student")
+        quiz = Quiz.objects.create(title="Late quiz", grade=self.quiz.grade, subject=self.quiz.subject, marks_per_question=1)
+        attempt = StudentQuizAttempt.objects.create(student=student, quiz=quiz, completed_at=timezone.now())
+        self._answer(attempt)
+        incremental = create_backup(incremental=True)
+
+        StudentQuizAttempt.objects.all().delete()
+        student.delete()
+        quiz.delete()
+        restore_streaming_backup(self._path(full))
+        restore_streaming_backup(self._path(incremental))
+
+        restored = StudentQuizAttempt.objects.get(pk=attempt.pk)
+        self.assertEqual((restored.student.username, restored.quiz.title), ("late_student", "Late quiz"))
+        self.assertEqual(StudentAnswer.objects.filter(attempt=restored).count(), 1)
+
+    def test_restore_flags_only_the_newest_attempt_of_each_pair(self):
+        self.attempt.completed_at = timezone.now() - timedelta(days=1)
+        self.attempt.save()
+        full = create_backup()
+        retake = StudentQuizAttempt.objects.create(student=self.student, quiz=self.quiz, completed_at=timezone.now())
+        incremental = create_backup(incremental=True)
+
+        StudentQuizAttempt.objects.all().delete()
+        restore_streaming_backup(self._path(full))
+        self.assertEqual(list(StudentQuizAttempt.objects.filter(is_latest=True).values_list("pk", flat=True)), [self.attempt.pk])
+        restore_streaming_backup(self._path(incremental))
+
+        self.assertEqual(list(StudentQuizAttempt.objects.filter(is_latest=True).values_list("pk", flat=True)), [retake.pk])
+
+    def test_restore_command_rejects_foreign_files(self):
+        path = f"{self.media_root}/not_a_backup.jsonl.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as handle:
+            handle.write(json.dumps({"hello": "world"}) + "\n")
+
+        with self.assertRaises(CommandError):
+            call_command("restorebackup", path)
@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from learnify import settings as project_settings
+
+from core.cache_layer import (
+    ANALYTICS,
+    CATALOG,
+    bump_namespace,
+    cache_stats,
+    cached_get,
+    cached_get_or_build,
+    namespaced_key,
+    reset_cache_stats,
+    school_namespace,
+)
+
+
+class CacheLayerTests(SimpleTestCase):
+    def setUp(self):
+        for name in settings.CACHE_NAMES:
+            caches[name].clear()
+        reset_cache_stats()
+
+    def test_named_caches_share_a_cross_process_backend(self):
+        for name in ("default", CATALOG, ANALYTICS, "users"):
+            self.assertNotIn("locmem", project_settings.CACHES[name]["BACKEND"])
+
+    def test_hot_caches_are_shared_across_hosts(self):
+        for name in (CATALOG, ANALYTICS, "users"):
+            self.assertEqual(
+                project_settings.CACHES[name]["BACKEND"], "django.core.cache.backends.db.DatabaseCache"
+            )
+
+    def test_tests_never_touch_the_hosts_caches(self):
+        for name in settings.CACHES:
+            self.assertEqual(settings.CACHES[name]["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+
+    def test_bumping_a_school_namespace_drops_only_that_school(self):
+        builds = []
+
+        def build(label):
+            builds.append(label)
+            return label
+
+        for school_id in (1, 2):
+            key = namespaced_key(ANALYTICS, school_namespace(school_id), "summary")
+            cached_get_or_build(ANALYTICS, key, lambda: build(school_id))
+        bump_namespace(ANALYTICS, school_namespace(1))
+        for school_id in (1, 2):
+            key = namespaced_key(ANALYTICS, school_namespace(school_id), "summary")
+            cached_get_or_build(ANALYTICS, key, lambda: build(school_id))
+
+        self.assertEqual(builds, [1, 2, 1])
+
+    def test_hits_and_misses_are_counted_per_cache(self):
+        cached_get_or_build(CATALOG, "grades", lambda: ["Grade 1"])
+        cached_get_or_build(CATALOG, "grades", lambda: ["Grade 1"])
+        cached_get_or_build(CATALOG, "grades", lambda: ["Grade 1"])
+        self.assertIsNone(cached_get(ANALYTICS, "absent"))
+
+        stats = cache_stats()
+        self.assertEqual(stats[CATALOG], {"hits": 2, "misses": 1, "hit_rate": 0.6667})
+        self.assertEqual(stats[ANALYTICS], {"hits": 0, "misses": 1, "hit_rate": 0.0})
+
+        out = StringIO()
+        call_command("cache_stats", "--reset", stdout=out)
+        self.assertIn("catalog: 2 hits, 1 misses, hit rate 66.7%", out.getvalue())
+        self.assertEqual(cache_stats()[CATALOG]["hits"], 0)
@@ -0,0 +1,87 @@
+import math
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import FIBQuestion, MCQQuestion, QuestionBank, SCQQuestion
+
+User = get_user_model()
+
+
+class DuplicateQuestionBankTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username="copy_staff",
+            password="testpass123",
+            role="admin",
+            is_staff=True,
+        )
+        self.client.force_login(self.staff)
+
+    def _duplicate(self, bank):
+        return self.client.post(f"/admin/question-bank/duplicate/{bank.id}/")
+
+    def test_large_bank_is_cloned_with_bulk_inserts(self):
+        bank = QuestionBank.objects.create(title="Big bank", type="SCQ")
+        SCQQuestion.objects.bulk_create(
+            SCQQuestion(
+                question_bank=bank,
+                question_text=f"Question {number}",
+                option_a="a",
+                option_b="b",
+                option_c="c",
+                option_d="d",
+                correct_answer="A",
+            )
+            for number in range(10_000)
+        )
+        fields = [field for field in SCQQuestion._meta.concrete_fields if field.attname != "id"]
+        batch_size = connection.ops.bulk_batch_size(fields, range(10_000)) or 10_000
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._duplicate(bank)
+
+        self.assertEqual(response.status_code, 302)
+        copy = QuestionBank.objects.get(title="Big bank (Copy)")
+        statements = [query["sql"] for query in queries.captured_queries]
+        question_inserts = [sql for sql in statements if sql.startswith('INSERT INTO "core_scqquestion"')]
+        question_selects = [sql for sql in statements if sql.startswith("SELECT") and "core_scqquestion" in sql]
+        self.assertEqual(len(question_inserts), math.ceil(10_000 / batch_size))
+        self.assertEqual(len(question_selects), 1)
+
+        copied = SCQQuestion.objects.filter(question_bank=copy)
+        self.assertEqual(copied.count(), 10_000)
+        self.assertFalse(
+            copied.filter(question_id__in=SCQQuestion.objects.filter(question_bank=bank).values("question_id")).exists()
+        )
+
+    def test_copy_title_skips_taken_numbers(self):
+        bank = QuestionBank.objects.create(title="Algebra", type="MCQ")
+        QuestionBank.objects.create(title="Algebra (Copy)", type="MCQ")
+        QuestionBank.objects.create(title="Algebra (Copy 2)", type="MCQ")
+        MCQQuestion.objects.create(
+            question_bank=bank,
+            question_text="Pick evens",
+            option_a="1",
+            option_b="2",
+            option_c="3",
+            option_d="4",
+            correct_answers="B,D",
+        )
+
+        self._duplicate(bank)
+
+        copy = QuestionBank.objects.get(title="Algebra (Copy 3)")
+        self.assertEqual(copy.type, "MCQ")
+        self.assertEqual(MCQQuestion.objects.get(question_bank=copy).correct_answers, "B,D")
+
+    def test_fib_answers_are_copied(self):
+        bank = QuestionBank.objects.create(title="Blanks", type="FIB")
+        FIBQuestion.objects.create(question_bank=bank, question_text="[a] is blue", correct_answers={"a": "Sky"})
+
+        self._duplicate(bank)
+
+        copy = QuestionBank.objects.get(title="Blanks (Copy)")
+        self.assertEqual(FIBQuestion.objects.get(question_bank=copy).correct_answers, {"a": "Sky"})
@@ -0,0 +1,125 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from core.admin import OutboundEmailAdmin
+from core.email_outbox import OUTBOX_MAX_ATTEMPTS, claim_due_emails, queue_email, send_outbox_batch
+from core.emails import send_welcome_email
+from core.models import OutboundEmail
+from core.utils import send_account_notification_email
+
+User = get_user_model()
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="outbox_student",
+            password="testpass123",
+            role="student",
+            email="outbox@student.test",
+            full_name="Outbox Student",
+        )
+        OutboundEmail.objects.all().delete()
+
+    def test_emails_are_queued_not_sent_in_request(self):
+        send_welcome_email(self.user, password="pass1234")
+        send_account_notification_email(self.user, action="extended")
+
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.order_by("id")
+        self.assertEqual(queued.count(), 2)
+        self.assertEqual(queued[0].recipients, ["outbox@student.test"])
+        self.assertIn("pass1234", queued[0].body)
+        self.assertEqual(queued[1].status, OutboundEmail.STATUS_PENDING)
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for number in range(3):
+            queue_email(f"Notice {number}", "Body", [f"user{number}@school.test"])
+
+        with patch.object(EmailBackend, "open", autospec=True, return_value=True) as mock_open:
+            call_command("send_outbox_emails", "--once", stdout=io.StringIO())
+
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual([message.subject for message in mail.outbox], ["Notice 0", "Notice 1", "Notice 2"])
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.STATUS_SENT, sent_at__isnull=False, body="").count(),
+            3,
+        )
+
+    def test_failed_send_is_retried_with_backoff_then_marked_failed(self):
+        email = queue_email("Flaky", "Body", ["flaky@school.test"])
+
+        with patch.object(EmailBackend, "send_messages", side_effect=OSError("smtp down")):
+            stats = send_outbox_batch()
+
+        self.assertEqual(stats, {"sent": 0, "retried": 1, "failed": 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=30))
+        self.assertEqual(claim_due_emails(), [])
+
+        OutboundEmail.objects.filter(id=email.id).update(
+            attempts=OUTBOX_MAX_ATTEMPTS - 1,
+            next_attempt_at=timezone.now(),
+        )
+        with patch.object(EmailBackend, "send_messages", side_effect=OSError("smtp down")):
+            stats = send_outbox_batch()
+
+        self.assertEqual(stats["failed"], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_FAILED)
+        self.assertIn("smtp down", email.last_error)
+        self.assertEqual(email.body, "")
+
+    def test_unreachable_mail_server_does_not_use_up_attempts(self):
+        emails = [queue_email(f"Outage {n}", "Body", [f"outage{n}@school.test"]) for n in range(2)]
+        OutboundEmail.objects.filter(id=emails[0].id).update(attempts=OUTBOX_MAX_ATTEMPTS - 1)
+
+        with patch.object(EmailBackend, "open", side_effect=OSError("connection refused")):
+            stats = send_outbox_batch()
+
+        self.assertEqual(stats, {"sent": 0, "retried": 2, "failed": 0})
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertEqual(email.body, "Body")
+        self.assertEqual([email.attempts for email in emails], [OUTBOX_MAX_ATTEMPTS - 1, 0])
+
+    def test_admin_hides_bodies_and_retry_skips_rows_being_sent(self):
+        send_welcome_email(self.user, password="pass1234")
+        welcome = OutboundEmail.objects.get()
+        sending = queue_email("In flight", "Body", ["flight@school.test"])
+        OutboundEmail.objects.filter(id=sending.id).update(status=OutboundEmail.STATUS_SENDING, claimed_at=timezone.now())
+        request = RequestFactory().post("/")
+        request.user = User.objects.create_superuser("outbox_admin", "admin@school.test", "testpass123")
+        model_admin = OutboundEmailAdmin(OutboundEmail, admin.site)
+
+        self.assertNotIn("body", model_admin.get_fields(request, welcome))
+        with patch.object(model_admin, "message_user"):
+            model_admin.retry_now(request, OutboundEmail.objects.all())
+        sending.refresh_from_db()
+        self.assertEqual(sending.status, OutboundEmail.STATUS_SENDING)
+
+    def test_stale_claims_are_picked_up_again(self):
+        email = queue_email("Orphaned", "Body", ["orphan@school.test"])
+        OutboundEmail.objects.filter(id=email.id).update(
+            status=OutboundEmail.STATUS_SENDING,
+            claimed_at=timezone.now() - timedelta(hours=1),
+        )
+
+        send_outbox_batch()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,93 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.expiry_reminders import queue_expiry_reminders
+from core.models import ExpiryReminder, OutboundEmail, School
+
+User = get_user_model()
+
+
+class ExpiryReminderTests(TestCase):
+    def setUp(self):
+        self.target = timezone.now().date() + timedelta(days=5)
+        self.school = School.objects.create(
+            name="Reminder School",
+            city="Multan",
+            province="Punjab",
+            contact_email="office@reminder.test",
+            account_status="active",
+            subscription_expiry=self.target,
+        )
+        User.objects.create_user(
+            username="expiring_independent",
+            password="testpass123",
+            role="student",
+            email="independent@learner.test",
+            full_name="Independent Learner",
+            subscription_expiry=self.target,
+        )
+        User.objects.create_user(
+            username="expiring_school_student",
+            password="testpass123",
+            role="student",
+            email="pupil@reminder.test",
+            school=self.school,
+            subscription_expiry=self.target,
+        )
+        User.objects.create_user(
+            username="expiring_no_email",
+            password="testpass123",
+            role="student",
+            subscription_expiry=self.target,
+        )
+        User.objects.create_user(
+            username="expiring_later",
+            password="testpass123",
+            role="student",
+            email="later@learner.test",
+            subscription_expiry=self.target + timedelta(days=1),
+        )
+        OutboundEmail.objects.all().delete()
+
+    def test_command_reminds_users_and_schools_once(self):
+        call_command("send_expiry_reminders", stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["independent@learner.test", "office@reminder.test"],
+        )
+        self.assertIn("Independent Learner", next(m.body for m in mail.outbox if m.to == ["independent@learner.test"]))
+        self.assertEqual(ExpiryReminder.objects.filter(expiry_date=self.target).count(), 2)
+
+        call_command("send_expiry_reminders", stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_queue_uses_a_fixed_number_of_queries(self):
+        for number in range(30):
+            User.objects.create_user(
+                username=f"bulk_expiring_{number}",
+                password="testpass123",
+                role="student",
+                email=f"bulk{number}@learner.test",
+                subscription_expiry=self.target,
+            )
+
+        # user SELECT, school SELECT, then one savepoint + two INSERTs + release per chunk
+        with self.assertNumQueries(10):
+            queued = queue_expiry_reminders(self.target)
+
+        self.assertEqual(queued, {"users": 31, "schools": 1})
+
+    def test_queue_only_leaves_delivery_to_the_outbox_worker(self):
+        call_command("send_expiry_reminders", "--queue-only", stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_PENDING).count(), 2)
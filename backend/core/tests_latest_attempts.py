@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.latest_attempts import latest_attempts_map
+from core.models import (
+    Grade,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    StudentQuizAttempt,
+    Subject,
+)
+from core.student_monitoring import build_student_quiz_history
+
+User = get_user_model()
+
+
+class LatestAttemptFlagTests(TestCase):
+    def setUp(self):
+        self.grade = Grade.objects.create(name="Grade 3")
+        self.subject = Subject.objects.create(name="Math", grade=self.grade)
+        bank = QuestionBank.objects.create(title="Bank", type="SCQ")
+        self.quiz_a = Quiz.objects.create(
+            title="Quiz A", grade=self.grade, subject=self.subject, marks_per_question=1
+        )
+        self.quiz_b = Quiz.objects.create(
+            title="Quiz B", grade=self.grade, subject=self.subject, marks_per_question=1
+        )
+        for quiz in (self.quiz_a, self.quiz_b):
+            QuizQuestionAssignment.objects.create(quiz=quiz, question_bank=bank, num_questions=10)
+
+        self.student = User.objects.create_user(
+            username="latest_student",
+            password="testpass123",
+            role="student",
+            grade=self.grade,
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.now = timezone.now()
+
+    def _attempt(self, quiz, score, completed_at):
+        return StudentQuizAttempt.objects.create(
+            student=self.student,
+            quiz=quiz,
+            score=score,
+            completed_at=completed_at,
+        )
+
+    def _flagged_ids(self):
+        return set(
+            StudentQuizAttempt.objects.filter(is_latest=True).values_list("id", flat=True)
+        )
+
+    def test_flag_moves_to_newest_completed_attempt(self):
+        older = self._attempt(self.quiz_a, 3, self.now - timedelta(days=1))
+        self.assertEqual(self._flagged_ids(), {older.id})
+
+        newer = self._attempt(self.quiz_a, 8, self.now)
+        self.assertEqual(self._flagged_ids(), {newer.id})
+
+    def test_in_progress_attempt_is_not_flagged(self):
+        finished = self._attempt(self.quiz_a, 5, self.now)
+        StudentQuizAttempt.objects.create(student=self.student, quiz=self.quiz_a)
+
+        self.assertEqual(self._flagged_ids(), {finished.id})
+
+    def test_deleting_latest_restores_previous_attempt(self):
+        older = self._attempt(self.quiz_a, 3, self.now - timedelta(days=1))
+        newer = self._attempt(self.quiz_a, 8, self.now)
+
+        newer.delete()
+
+        self.assertEqual(self._flagged_ids(), {older.id})
+
+    def test_history_ignores_other_quiz_attempts_with_same_timestamp(self):
+        shared_time = self.now - timedelta(days=2)
+        self._attempt(self.quiz_a, 6, shared_time)
+        self._attempt(self.quiz_b, 2, shared_time)
+        latest_b = self._attempt(self.quiz_b, 9, self.now)
+
+        history = build_student_quiz_history(self.student)
+
+        self.assertEqual(len(history["results"]), 2)
+        by_quiz = {row["quiz_id"]: row for row in history["results"]}
+        self.assertEqual(by_quiz[self.quiz_b.id]["attempt_id"], str(latest_b.id))
+        self.assertEqual(by_quiz[self.quiz_a.id]["marks_obtained"], 6)
+
+    def test_latest_attempts_map_is_one_query(self):
+        self._attempt(self.quiz_a, 3, self.now - timedelta(days=1))
+        latest_a = self._attempt(self.quiz_a, 7, self.now)
+        latest_b = self._attempt(self.quiz_b, 4, self.now)
+
+        with self.assertNumQueries(1):
+            attempts = latest_attempts_map([self.student.id], [self.quiz_a.id, self.quiz_b.id])
+
+        self.assertEqual(attempts[(self.student.id, self.quiz_a.id)].id, latest_a.id)
+        self.assertEqual(attempts[(self.student.id, self.quiz_b.id)].id, latest_b.id)
+
+    def test_student_quiz_history_endpoint_returns_latest_per_quiz(self):
+        self._attempt(self.quiz_a, 3, self.now - timedelta(days=1))
+        latest = self._attempt(self.quiz_a, 9, self.now)
+
+        client = APIClient()
+        client.force_authenticate(user=self.student)
+        response = client.get("/student/quiz-history/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["attempt_id"] for row in response.data["results"]],
+            [str(latest.id)],
+        )
@@ -0,0 +1,66 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import PeriodicJobRun, PeriodicJobState
+from core.periodic_jobs import PeriodicJob, claim_job, run_due_jobs
+
+CHECK_JOB = PeriodicJob("check", "check", timedelta(hours=1), jitter=timedelta(minutes=10))
+BROKEN_JOB = PeriodicJob("broken", "no_such_command", timedelta(hours=1))
+
+
+class PeriodicJobTests(TestCase):
+    def test_due_job_runs_once_and_is_rescheduled_with_jitter(self):
+        runs = run_due_jobs(jobs=[CHECK_JOB], node="node-a")
+
+        self.assertEqual([run.status for run in runs], [PeriodicJobRun.STATUS_SUCCEEDED])
+        self.assertIsNotNone(runs[0].duration_ms)
+        self.assertIn("System check", runs[0].output)
+
+        state = PeriodicJobState.objects.get(name="check")
+        self.assertEqual(state.locked_by, "")
+        self.assertEqual(state.last_status, PeriodicJobRun.STATUS_SUCCEEDED)
+        earliest = state.last_finished_at + CHECK_JOB.interval
+        self.assertGreaterEqual(state.next_run_at, earliest)
+        self.assertLessEqual(state.next_run_at, earliest + CHECK_JOB.jitter)
+
+        self.assertEqual(run_due_jobs(jobs=[CHECK_JOB], node="node-b"), [])
+
+    def test_locked_job_is_skipped_by_other_nodes_until_lease_expires(self):
+        PeriodicJobState.objects.create(name="check")
+
+        self.assertTrue(claim_job(CHECK_JOB, node="node-a"))
+        self.assertFalse(claim_job(CHECK_JOB, node="node-b"))
+        self.assertFalse(claim_job(CHECK_JOB, node="node-b", force=True))
+
+        PeriodicJobState.objects.filter(name="check").update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(claim_job(CHECK_JOB, node="node-b"))
+
+    def test_failures_are_recorded_and_do_not_stop_other_jobs(self):
+        runs = run_due_jobs(jobs=[BROKEN_JOB, CHECK_JOB], node="node-a")
+
+        self.assertEqual(
+            [(run.name, run.status) for run in runs],
+            [("broken", PeriodicJobRun.STATUS_FAILED), ("check", PeriodicJobRun.STATUS_SUCCEEDED)],
+        )
+        self.assertIn("no_such_command", runs[0].error_message)
+        self.assertEqual(PeriodicJobState.objects.get(name="broken").last_status, PeriodicJobRun.STATUS_FAILED)
+
+    def test_command_forces_a_single_job_and_rejects_unknown_names(self):
+        with patch("core.periodic_jobs.PERIODIC_JOBS", (CHECK_JOB,)), patch(
+            "core.management.commands.run_periodic_jobs.PERIODIC_JOBS", (CHECK_JOB,)
+        ):
+            PeriodicJobState.objects.create(name="check", next_run_at=timezone.now() + timedelta(days=1))
+            out = io.StringIO()
+            call_command("run_periodic_jobs", "--job", "check", stdout=out)
+            self.assertIn("check: succeeded", out.getvalue())
+
+            with self.assertRaises(CommandError):
+                call_command("run_periodic_jobs", "--job", "nope", stdout=io.StringIO())
+
+        self.assertEqual(PeriodicJobRun.objects.filter(name="check").count(), 1)
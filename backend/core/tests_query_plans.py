@@ -0,0 +1,176 @@
+import re
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.admin_stats_views import stats_dashboard_view
+from core.attempt_archive import best_completed_attempt
+from core.latest_attempts import latest_attempts_map
+from core.models import (
+    Grade,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    School,
+    SCQQuestion,
+    StudentAnswer,
+    StudentQuizAttempt,
+    Subject,
+    TeacherTask,
+    TeacherTaskQuiz,
+)
+from core.school_snapshots import build_school_roster_counts
+
+User = get_user_model()
+
+
+def explain(sql):
+    """The database's plan for `sql`, one line per step."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Make the planner prefer any usable index, so a Seq Scan in the
+            # plan means no index covers the filter.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def full_scan_tables(sql):
+    """
+    Return the tables the database would read with a full scan to answer
+    `sql`. Only SQLite and PostgreSQL plans are understood.
+    """
+    plan = explain(sql)
+    if connection.vendor == "postgresql":
+        return set(re.findall(r"Seq Scan on (\w+)", plan))
+    tables = set()
+    for line in plan.splitlines():
+        match = re.search(r"\bSCAN (\w+)(.*)$", line)
+        if match and "USING" not in match.group(2):
+            tables.add(match.group(1))
+    return tables
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    Guards the indexes behind the busiest endpoints: the queries the real
+    helpers and views send must be answered without scanning their table.
+    """
+
+    def setUp(self):
+        self.grade = Grade.objects.create(name="Grade 6")
+        subject = Subject.objects.create(name="Math", grade=self.grade)
+        self.quiz = Quiz.objects.create(title="Plans quiz", grade=self.grade, subject=subject, marks_per_question=1)
+        bank = QuestionBank.objects.create(title="Plans bank", type="SCQ")
+        QuizQuestionAssignment.objects.create(quiz=self.quiz, question_bank=bank, num_questions=1)
+        self.question = SCQQuestion.objects.create(
+            question_bank=bank, question_text="<p>1 + 1?</p>",
+            option_a="1", option_b="2", option_c="3", option_d="4", correct_answer="B",
+        )
+        self.school = School.objects.create(
+            name="Plans School",
+            city="Lahore",
+            province="Punjab",
+            contact_email="plans@school.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.teacher = User.objects.create_user(
+            username="plans_teacher", password="testpass123", role="teacher", school=self.school,
+        )
+        self.student = User.objects.create_user(
+            username="plans_student",
+            password="testpass123",
+            role="student",
+            school=self.school,
+            grade=self.grade,
+            province="Punjab",
+            city="Lahore",
+        )
+        task = TeacherTask.objects.create(
+            teacher=self.teacher, school=self.school, target_grade=self.grade,
+            message="Practice", due_date=timezone.now().date(),
+        )
+        TeacherTaskQuiz.objects.create(task=task, quiz=self.quiz)
+        StudentQuizAttempt.objects.create(student=self.student, quiz=self.quiz, score=1, completed_at=timezone.now())
+        self.client = APIClient()
+
+    def captured(self, call):
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        return [query["sql"] for query in queries if query["sql"].startswith("SELECT")]
+
+    def assertIndexed(self, model, queries, containing=""):
+        """Every captured query reading `model`'s table (and `containing`) uses an index."""
+        table = model._meta.db_table
+        reads = [sql for sql in queries if f'FROM "{table}"' in sql and containing in sql]
+        self.assertTrue(reads, f"no query read {table}")
+        for sql in reads:
+            self.assertNotIn(table, full_scan_tables(sql), f"{sql}\n{explain(sql)}")
+
+    def test_detector_reports_unindexed_filter(self):
+        [sql] = self.captured(lambda: list(User.objects.filter(first_name="Ali")))
+        self.assertIn(User._meta.db_table, full_scan_tables(sql))
+
+    def test_latest_attempts_for_students(self):
+        queries = self.captured(lambda: latest_attempts_map([self.student.id], [self.quiz.id]))
+        self.assertIndexed(StudentQuizAttempt, queries)
+
+    def test_best_completed_attempt_for_student_and_quiz(self):
+        queries = self.captured(lambda: best_completed_attempt(self.student, self.quiz))
+        self.assertIndexed(StudentQuizAttempt, queries)
+
+    def test_submit_answer_reads_answers_by_attempt(self):
+        attempt = StudentQuizAttempt.objects.create(
+            student=self.student, quiz=self.quiz, meta={"selected_qids": [str(self.question.question_id)]},
+        )
+        StudentAnswer.objects.create(
+            attempt=attempt, question_id=uuid.uuid4(), question_type="scq", answer_data={"selected": "1"},
+        )
+        self.client.force_authenticate(user=self.student)
+
+        queries = self.captured(lambda: self.client.post(
+            "/student/submit-answer/",
+            {
+                "attempt_id": attempt.id,
+                "question_id": str(self.question.question_id),
+                "question_type": "scq",
+                "answer_data": {"selected": "2"},
+            },
+            format="json",
+        ))
+
+        self.assertIndexed(StudentAnswer, queries)
+
+    def test_school_roster_counts(self):
+        queries = self.captured(lambda: build_school_roster_counts(self.school))
+        self.assertIndexed(User, queries, containing='"school_id" =')
+
+    def test_stats_dashboard_students_by_province_and_city(self):
+        request = RequestFactory().get("/admin/stats/")
+        request.user = User.objects.create_superuser(username="plans_admin", password="testpass123")
+
+        with mock.patch("core.admin_stats_views.render", return_value=HttpResponse()):
+            queries = self.captured(lambda: stats_dashboard_view(request))
+
+        self.assertIndexed(User, queries, containing='"province" =')
+        self.assertIndexed(User, queries, containing='"city" =')
+
+    def test_task_lists_for_teacher_and_school(self):
+        self.client.force_authenticate(user=self.teacher)
+        queries = self.captured(lambda: self.client.get("/api/teacher/tasks/"))
+        self.assertIndexed(TeacherTask, queries)
+
+        self.client.force_authenticate(user=self.student)
+        queries = self.captured(lambda: self.client.get("/api/student/tasks/"))
+        self.assertIndexed(TeacherTask, queries)
@@ -0,0 +1,129 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import FIBQuestion, MCQQuestion, QuestionBank, QuestionRegistry, SCQQuestion
+from core.question_import import import_question_records
+from core.tests_sheet_reader import xlsx_upload
+
+User = get_user_model()
+
+SCQ_HEADER = ["question", "option_a", "option_b", "option_c", "option_d", "correct_answer"]
+MCQ_HEADER = ["question", "option_a", "option_b", "option_c", "option_d", "correct_answers"]
+
+
+def scq_record(question, correct_answer="A"):
+    return {
+        "question": question,
+        "option_a": "one",
+        "option_b": "two",
+        "option_c": "three",
+        "option_d": "four",
+        "correct_answer": correct_answer,
+    }
+
+
+class QuestionImportEngineTests(TestCase):
+    def test_valid_rows_are_inserted_and_rejects_reported_by_row(self):
+        bank = QuestionBank.objects.create(title="Engine SCQ", type="SCQ")
+        records = [
+            (2, scq_record("Good one", "b")),
+            (3, scq_record("Bad label", "E")),
+            (4, dict(scq_record("No option"), option_c=None)),
+            (5, scq_record("Good two", "D")),
+        ]
+
+        result = import_question_records(bank, records)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([reject["row"] for reject in result.rejected], [3, 4])
+        self.assertIn("correct_answer", result.rejected[0]["error"])
+        self.assertIn("option_c", result.rejected[1]["error"])
+        self.assertEqual(
+            list(SCQQuestion.objects.filter(question_bank=bank).order_by("id").values_list("correct_answer", flat=True)),
+            ["B", "D"],
+        )
+
+    def test_mcq_labels_are_validated_and_normalized(self):
+        bank = QuestionBank.objects.create(title="Engine MCQ", type="MCQ")
+        good = dict(scq_record("Pick two"), correct_answers="c, a ,A")
+        bad = dict(scq_record("Pick none"), correct_answers="A,Z")
+        good.pop("correct_answer")
+        bad.pop("correct_answer")
+
+        result = import_question_records(bank, [(2, good), (3, bad)])
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.rejected[0]["row"], 3)
+        self.assertEqual(MCQQuestion.objects.get(question_bank=bank).correct_answers, "A,C")
+
+    def test_fib_answers_must_be_a_json_object(self):
+        bank = QuestionBank.objects.create(title="Engine FIB", type="FIB")
+        records = [
+            (2, {"question": "[a] is blue.", "correct_answers": json.dumps({"a": "Sky"})}),
+            (3, {"question": "[a] is green.", "correct_answers": json.dumps(["Grass"])}),
+            (4, {"question": "[a] is red.", "correct_answers": "{a: apple"}),
+        ]
+
+        result = import_question_records(bank, records)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([reject["row"] for reject in result.rejected], [3, 4])
+        self.assertEqual(FIBQuestion.objects.get(question_bank=bank).correct_answers, {"a": "Sky"})
+
+    def test_large_import_uses_batched_inserts(self):
+        bank = QuestionBank.objects.create(title="Engine bulk", type="SCQ")
+        records = [(row, scq_record(f"Question {row}")) for row in range(2, 1202)]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = import_question_records(bank, records)
+
+        def inserts_into(model):
+            prefix = f'INSERT INTO "{model._meta.db_table}"'
+            return [query for query in queries.captured_queries if query["sql"].startswith(prefix)]
+
+        # Batches of 500 (1000 for the registry), further split by SQLite's
+        # bound-parameter limit.
+        self.assertLessEqual(len(inserts_into(SCQQuestion)), 12)
+        self.assertLessEqual(len(inserts_into(QuestionRegistry)), 6)
+        self.assertEqual(result.created, 1200)
+        self.assertEqual(SCQQuestion.objects.filter(question_bank=bank).count(), 1200)
+
+
+class QuestionUploadReportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username="report_staff",
+            password="testpass123",
+            role="admin",
+            is_staff=True,
+        )
+        self.client.force_login(self.staff)
+
+    def test_upload_reports_rejected_rows(self):
+        bank = QuestionBank.objects.create(title="Report bank", type="MCQ")
+        upload = xlsx_upload([
+            MCQ_HEADER,
+            ["Good", "1", "2", "3", "4", "A,B"],
+            ["Bad", "1", "2", "3", "4", "X"],
+        ])
+
+        response = self.client.post(f"/upload/mcq/{bank.id}/", {"file": upload})
+
+        texts = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn("1 MCQ question(s) uploaded. 1 row(s) rejected.", texts)
+        self.assertTrue(any(text.startswith("Row 3:") for text in texts))
+
+    def test_missing_column_rejects_whole_file(self):
+        bank = QuestionBank.objects.create(title="Header bank", type="SCQ")
+        upload = xlsx_upload([SCQ_HEADER[:-1], ["Q", "1", "2", "3", "4"]])
+
+        response = self.client.post(f"/upload/scq/{bank.id}/", {"file": upload})
+
+        texts = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertEqual(texts, ["SCQ upload failed: Missing column(s): correct_answer."])
+        self.assertFalse(SCQQuestion.objects.filter(question_bank=bank).exists())
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.admin_views import clone_bank_questions
+from core.models import FIBQuestion, MCQQuestion, QuestionBank, QuestionRegistry, SCQQuestion
+from core.question_import import import_question_records
+from core.question_registry import resolve_question_types, resolve_questions
+
+
+def make_scq(bank, text="2 + 2?"):
+    return SCQQuestion.objects.create(
+        question_bank=bank, question_text=text,
+        option_a="3", option_b="4", option_c="5", option_d="6", correct_answer="B",
+    )
+
+
+class QuestionRegistryTests(TestCase):
+    def setUp(self):
+        self.scq_bank = QuestionBank.objects.create(title="Registry SCQ", type="SCQ")
+        self.mcq_bank = QuestionBank.objects.create(title="Registry MCQ", type="MCQ")
+        self.fib_bank = QuestionBank.objects.create(title="Registry FIB", type="FIB")
+
+    def test_signals_register_bump_and_remove_questions(self):
+        question = make_scq(self.scq_bank)
+        entry = QuestionRegistry.objects.get(question_id=question.question_id)
+        self.assertEqual((entry.question_type, entry.question_bank_id, entry.object_id), ("scq", self.scq_bank.id, question.pk))
+        self.assertEqual(entry.content_version, 1)
+
+        question.correct_answer = "C"
+        question.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.content_version, 2)
+
+        question.delete()
+        self.assertFalse(QuestionRegistry.objects.filter(question_id=question.question_id).exists())
+
+    def test_mixed_ids_resolve_with_one_registry_query_per_type_present(self):
+        scq = make_scq(self.scq_bank)
+        mcq = MCQQuestion.objects.create(question_bank=self.mcq_bank, question_text="Evens?", correct_answers="A,C")
+        fib = FIBQuestion.objects.create(question_bank=self.fib_bank, question_text="[a]", correct_answers={"a": "1"})
+        ids = [scq.question_id, mcq.question_id, fib.question_id]
+
+        with self.assertNumQueries(1):
+            types = resolve_question_types(ids)
+        self.assertEqual(sorted(types.values()), ["fib", "mcq", "scq"])
+
+        with self.assertNumQueries(3):
+            questions = resolve_questions([scq.question_id, mcq.question_id])
+        self.assertIsInstance(questions[str(scq.question_id)], SCQQuestion)
+        self.assertIsInstance(questions[str(mcq.question_id)], MCQQuestion)
+
+    def test_bulk_import_and_clone_register_their_questions(self):
+        record = {"question": "Q", "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4", "correct_answer": "A"}
+        import_question_records(self.scq_bank, [(2, record), (3, dict(record, question="Q2"))])
+        copy = QuestionBank.objects.create(title="Registry SCQ (Copy)", type="SCQ")
+        clone_bank_questions(self.scq_bank, copy)
+
+        for bank in (self.scq_bank, copy):
+            self.assertEqual(
+                set(QuestionRegistry.objects.filter(question_bank=bank).values_list("question_id", flat=True)),
+                set(SCQQuestion.objects.filter(question_bank=bank).values_list("question_id", flat=True)),
+            )
+        self.assertEqual(QuestionRegistry.objects.filter(question_bank=copy).count(), 2)
+
+    def test_backfill_command_repairs_drift(self):
+        kept = make_scq(self.scq_bank)
+        lost = make_scq(self.scq_bank, "Lost")
+        QuestionRegistry.objects.filter(question_id=lost.question_id).delete()
+        SCQQuestion.objects.filter(pk=kept.pk)._raw_delete("default")
+
+        out = StringIO()
+        call_command("backfill_question_registry", stdout=out)
+
+        self.assertIn("Registered 1 question(s); removed 1", out.getvalue())
+        self.assertEqual(
+            list(QuestionRegistry.objects.values_list("question_id", flat=True)),
+            [lost.question_id],
+        )
@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.db import DataError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Grade
+from core.password_hashing import hash_passwords
+from core.roster_upload import ROSTER_COLUMNS, import_roster_from_workbook
+
+User = get_user_model()
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def roster_row(username, password="pass1234", grade="Grade 2"):
+    return [
+        username,
+        f"{username} Name",
+        "Urdu",
+        f"{username}@example.test",
+        password,
+        "student",
+        "female",
+        "Private school",
+        grade,
+        "Retail School",
+        "Karachi",
+        "Sindh",
+        "monthly",
+    ]
+
+
+def build_workbook(rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(list(ROSTER_COLUMNS))
+    for row in rows:
+        sheet.append(row)
+    return workbook
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BulkRosterImportTests(TestCase):
+    def setUp(self):
+        Grade.objects.create(name="Grade 2")
+        User.objects.create_user(username="already_here", password="x", role="student")
+
+    def test_validates_rows_and_keeps_per_row_error_format(self):
+        workbook = build_workbook([
+            roster_row("bulk_one"),
+            roster_row("already_here"),
+            roster_row("bulk_one"),
+            roster_row("bulk_two", grade="grade 2"),
+            roster_row("bulk_three", grade="Grade 99"),
+            roster_row("", grade="Grade 2"),
+            roster_row("bulk_numeric", password=123456),
+        ])
+
+        result = import_roster_from_workbook(workbook)
+
+        self.assertEqual(result["uploaded"], 3)
+        self.assertEqual(result["skipped"], 2)
+        self.assertEqual(result["errors"], [
+            {"row": 6, "error": "Grade 'Grade 99' does not exist in database."},
+            {"row": 7, "error": "Username is required."},
+        ])
+        self.assertGreater(result["rows_per_second"], 0)
+        self.assertEqual(User.objects.get(username="bulk_two").grade.name, "Grade 2")
+        self.assertTrue(check_password("pass1234", User.objects.get(username="bulk_one").password))
+        self.assertTrue(check_password("123456", User.objects.get(username="bulk_numeric").password))
+
+    def test_data_error_in_a_chunk_is_reported_per_row(self):
+        # Postgres rejects an over-long value with DataError, not IntegrityError.
+        save = User.save
+
+        def save_or_reject(user, *args, **kwargs):
+            if user.username == "bulk_long":
+                raise DataError("value too long for type character varying(255)")
+            return save(user, *args, **kwargs)
+
+        workbook = build_workbook([roster_row("bulk_ok"), roster_row("bulk_long")])
+        with patch.object(User.objects, "bulk_create", side_effect=DataError("value too long")), \
+                patch.object(User, "save", autospec=True, side_effect=save_or_reject):
+            result = import_roster_from_workbook(workbook)
+
+        self.assertEqual(result["uploaded"], 1)
+        self.assertEqual(result["errors"], [{"row": 3, "error": "value too long for type character varying(255)"}])
+        self.assertTrue(User.objects.filter(username="bulk_ok").exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def import_queries(prefix, count):
+            workbook = build_workbook([roster_row(f"{prefix}_{index}") for index in range(count)])
+            with CaptureQueriesContext(connection) as ctx:
+                result = import_roster_from_workbook(workbook)
+            self.assertEqual(result["uploaded"], count)
+            # bulk_create may split a chunk to respect the backend's
+            # parameter limit; every other query must be per-import.
+            return len([
+                query for query in ctx.captured_queries
+                if not query["sql"].startswith("INSERT")
+            ])
+
+        self.assertEqual(import_queries("small", 3), import_queries("large", 40))
+
+    def test_process_pool_hashes_match_inline_hashing(self):
+        passwords = [f"secret-{index}" for index in range(40)]
+
+        hashed = hash_passwords(passwords, workers=2)
+
+        self.assertEqual(len(hashed), len(passwords))
+        for password, encoded in zip(passwords, hashed):
+            self.assertTrue(check_password(password, encoded))
@@ -0,0 +1,190 @@
+import io
+import os
+from datetime import timedelta
+from unittest import mock
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Grade, RosterImportJob, School
+from core.roster_import_jobs import (
+    ROSTER_IMPORT_TIMEOUT,
+    claim_next_roster_import_job,
+    fail_stale_roster_import_jobs,
+    run_roster_import_job,
+)
+from core.roster_upload import ROSTER_COLUMNS
+
+User = get_user_model()
+
+
+def roster_upload(usernames, role="student"):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(list(ROSTER_COLUMNS))
+    for username in usernames:
+        sheet.append([
+            username, f"{username} Name", "Urdu", "", "pass1234", role, "male",
+            "Private school", "Grade 2", "", "", "", "monthly",
+        ])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile(
+        "roster.xlsx",
+        buffer.getvalue(),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+@override_settings(
+    STORAGES={
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    },
+    MEDIA_ROOT="/tmp/learnify-test-media",
+    PRIVATE_MEDIA_ROOT="/tmp/learnify-test-private-media",
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class RosterImportJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Grade.objects.create(name="Grade 2")
+        self.school = School.objects.create(
+            name="Queued School",
+            city="Quetta",
+            province="Balochistan",
+            contact_email="queued@school.test",
+            max_students=3,
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+            onboarding_status="paid",
+        )
+        self.school_admin = User.objects.create_user(
+            username="queued_principal",
+            password="testpass123",
+            role="school_admin",
+            school=self.school,
+        )
+        self.client.force_authenticate(user=self.school_admin)
+
+    def _enqueue(self, usernames):
+        response = self.client.post(
+            "/api/school/upload-roster/",
+            {"file": roster_upload(usernames), "background": "true"},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 202)
+        return response.data["job"]["id"]
+
+    def _status(self, job_id):
+        return self.client.get(f"/api/school/roster-imports/{job_id}/")
+
+    def test_background_upload_is_processed_by_worker(self):
+        job_id = self._enqueue(["queued_one", "queued_two"])
+
+        self.assertEqual(self._status(job_id).data["status"], "queued")
+        self.assertFalse(User.objects.filter(username="queued_one").exists())
+
+        call_command("process_roster_imports", "--once", stdout=io.StringIO())
+
+        response = self._status(job_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "completed")
+        self.assertEqual(response.data["uploaded"], 2)
+        self.assertEqual(response.data["processed_rows"], 2)
+        self.assertEqual(response.data["total_rows"], 2)
+        self.assertTrue(response.data["onboarding"]["roster_uploaded"])
+        self.assertEqual(User.objects.get(username="queued_two").school, self.school)
+
+    def test_upload_is_private_and_deleted_when_the_job_finishes(self):
+        job_id = self._enqueue(["private_file_one"])
+        job = RosterImportJob.objects.get(id=job_id)
+        path = job.file.path
+
+        self.assertTrue(path.startswith("/tmp/learnify-test-private-media/"))
+        self.assertTrue(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            job.file.url
+
+        call_command("process_roster_imports", "--once", stdout=io.StringIO())
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(RosterImportJob.objects.get(id=job_id).file.name, "")
+
+    def test_job_abandoned_by_a_dead_worker_is_failed(self):
+        job_id = self._enqueue(["stale_one"])
+        path = RosterImportJob.objects.get(id=job_id).file.path
+        RosterImportJob.objects.filter(id=job_id).update(
+            status=RosterImportJob.STATUS_RUNNING,
+            started_at=timezone.now() - ROSTER_IMPORT_TIMEOUT - timedelta(minutes=1),
+        )
+
+        self.assertIsNone(claim_next_roster_import_job())
+
+        response = self._status(job_id)
+        self.assertEqual(response.data["status"], "failed")
+        self.assertIn("did not finish", response.data["error"])
+        self.assertFalse(os.path.exists(path))
+
+    def test_worker_finishing_after_its_job_was_failed_keeps_the_failure(self):
+        job_id = self._enqueue(["late_one"])
+        job = claim_next_roster_import_job()
+        path = job.file.path
+
+        def import_outlived_by_the_reaper(*args, **kwargs):
+            RosterImportJob.objects.filter(id=job_id).update(
+                started_at=timezone.now() - ROSTER_IMPORT_TIMEOUT - timedelta(minutes=1),
+            )
+            self.assertEqual(fail_stale_roster_import_jobs(), 1)
+            return {"uploaded": 1, "skipped": 0, "errors": []}
+
+        with mock.patch("core.roster_import_jobs.import_roster_from_file", side_effect=import_outlived_by_the_reaper):
+            job = run_roster_import_job(job)
+
+        self.assertEqual(job.status, RosterImportJob.STATUS_FAILED)
+        self.assertIn("did not finish", job.error_message)
+        self.assertEqual(job.uploaded, 0)
+        self.assertIsNone(job.result)
+        self.assertFalse(os.path.exists(path))
+        # A second pass finds nothing left to fail.
+        self.assertEqual(fail_stale_roster_import_jobs(), 0)
+
+    def test_seat_limit_rejection_marks_job_failed(self):
+        job_id = self._enqueue(["seat_1", "seat_2", "seat_3", "seat_4"])
+
+        call_command("process_roster_imports", "--once", stdout=io.StringIO())
+
+        response = self._status(job_id)
+        self.assertEqual(response.data["status"], "failed")
+        self.assertIn("Student limit exceeded", response.data["error"])
+        self.assertEqual(User.objects.filter(role="student").count(), 0)
+
+    def test_other_school_cannot_poll_job(self):
+        job_id = self._enqueue(["private_one"])
+        other_school = School.objects.create(
+            name="Nosy School",
+            city="Lahore",
+            province="Punjab",
+            contact_email="nosy@school.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        nosy_admin = User.objects.create_user(
+            username="nosy_principal",
+            password="testpass123",
+            role="school_admin",
+            school=other_school,
+        )
+        self.client.force_authenticate(user=nosy_admin)
+
+        self.assertEqual(self._status(job_id).status_code, 404)
+        self.assertEqual(RosterImportJob.objects.get(id=job_id).status, "queued")
@@ -0,0 +1,170 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.attempt_archive import archive_attempts
+from core.models import (
+    Grade,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    School,
+    StudentQuizAttempt,
+    Subject,
+)
+from core.school_snapshots import get_school_snapshot, invalidate_school_snapshots
+
+User = get_user_model()
+
+
+class SchoolSnapshotCacheTests(TestCase):
+    def setUp(self):
+        caches["analytics"].clear()
+        self.client = APIClient()
+        self.grade = Grade.objects.create(name="Grade 4")
+        self.subject = Subject.objects.create(name="Science", grade=self.grade)
+        bank = QuestionBank.objects.create(title="Bank", type="SCQ")
+        self.quiz = Quiz.objects.create(
+            title="Quiz", grade=self.grade, subject=self.subject, marks_per_question=1
+        )
+        QuizQuestionAssignment.objects.create(quiz=self.quiz, question_bank=bank, num_questions=10)
+
+        self.school = School.objects.create(
+            name="Snapshot School",
+            city="Multan",
+            province="Punjab",
+            contact_email="principal@snapshot.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.other_school = School.objects.create(
+            name="Other Snapshot School",
+            city="Multan",
+            province="Punjab",
+            contact_email="other@snapshot.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.school_admin = User.objects.create_user(
+            username="snapshot_principal",
+            password="testpass123",
+            role="school_admin",
+            school=self.school,
+        )
+        self.student = User.objects.create_user(
+            username="snapshot_student",
+            password="testpass123",
+            role="student",
+            school=self.school,
+            grade=self.grade,
+        )
+        self.client.force_authenticate(user=self.school_admin)
+
+    def _complete_attempt(self, student, score):
+        return StudentQuizAttempt.objects.create(
+            student=student,
+            quiz=self.quiz,
+            score=score,
+            completed_at=timezone.now(),
+        )
+
+    def _analytics_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            snapshot = get_school_snapshot(self.school, "analytics_summary")
+        return snapshot, len(ctx.captured_queries)
+
+    def test_second_read_is_served_from_cache(self):
+        _, first_queries = self._analytics_queries()
+        snapshot, second_queries = self._analytics_queries()
+
+        self.assertGreater(first_queries, 0)
+        self.assertEqual(second_queries, 0)
+        self.assertEqual(snapshot["overview"]["students"], 1)
+
+    def test_completed_attempt_invalidates_school_snapshot(self):
+        response = self.client.get("/api/school/analytics-summary/")
+        self.assertIsNone(response.data["overview"]["average_score"])
+
+        self._complete_attempt(self.student, 8)
+
+        response = self.client.get("/api/school/analytics-summary/")
+        self.assertEqual(response.data["overview"]["average_score"], 80.0)
+
+    def test_archiving_attempts_reads_no_student_rows(self):
+        for score in (4, 6, 8):
+            self._complete_attempt(self.student, score)
+        self._analytics_queries()
+
+        with CaptureQueriesContext(connection) as ctx:
+            archive_attempts(before=timezone.now() + timedelta(days=1))
+
+        user_table = f'FROM "{User._meta.db_table}"'
+        self.assertEqual([q["sql"] for q in ctx.captured_queries if user_table in q["sql"]], [])
+        self.assertGreater(self._analytics_queries()[1], 0)
+
+    def test_restored_rows_leave_snapshots_to_the_restore(self):
+        attempt = self._complete_attempt(self.student, 8)
+        payload = serializers.serialize("python", [self.school, self.student, attempt])
+        self._analytics_queries()
+
+        with CaptureQueriesContext(connection) as ctx:
+            for obj in serializers.deserialize("python", payload):
+                obj.save()
+
+        user_table = f'FROM "{User._meta.db_table}"'
+        user_reads = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and user_table in q["sql"]]
+        self.assertEqual(user_reads, [])
+        self.assertEqual(self._analytics_queries()[1], 0)
+
+    def test_other_school_activity_keeps_snapshot(self):
+        self._analytics_queries()
+        outsider = User.objects.create_user(
+            username="snapshot_outsider",
+            password="testpass123",
+            role="student",
+            school=self.other_school,
+        )
+        self._complete_attempt(outsider, 5)
+
+        _, queries = self._analytics_queries()
+        self.assertEqual(queries, 0)
+
+    def test_roster_changes_refresh_dashboard_counts(self):
+        response = self.client.get("/api/school/dashboard-summary/")
+        self.assertEqual(response.data["counts"]["students"], 1)
+
+        User.objects.create_user(
+            username="snapshot_new_student",
+            password="testpass123",
+            role="student",
+            school=self.school,
+        )
+        response = self.client.get("/api/school/dashboard-summary/")
+        self.assertEqual(response.data["counts"]["students"], 2)
+
+        self.student.school = self.other_school
+        self.student.save()
+        response = self.client.get("/api/school/dashboard-summary/")
+        self.assertEqual(response.data["counts"]["students"], 1)
+
+    def test_last_login_updates_do_not_invalidate(self):
+        self._analytics_queries()
+        self.student.last_login = timezone.now()
+        self.student.save(update_fields=["last_login"])
+
+        _, queries = self._analytics_queries()
+        self.assertEqual(queries, 0)
+
+    def test_explicit_invalidation_rebuilds(self):
+        self._analytics_queries()
+        invalidate_school_snapshots(self.school.id)
+
+        _, queries = self._analytics_queries()
+        self.assertGreater(queries, 0)
@@ -0,0 +1,109 @@
+import io
+import json
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from core.models import FIBQuestion, MCQQuestion, QuestionBank, SCQQuestion
+from core.sheet_reader import iter_sheet_records, iter_sheet_rows, open_readonly_workbook
+
+User = get_user_model()
+
+
+def workbook_bytes(rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def xlsx_upload(rows):
+    return SimpleUploadedFile(
+        "questions.xlsx",
+        workbook_bytes(rows),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+class SheetReaderTests(TestCase):
+    def test_rows_skip_blanks_and_pad_short_rows(self):
+        data = workbook_bytes([
+            ["a", "b", "c"],
+            ["1", "2", "3"],
+            [None, "  ", None],
+            ["4"],
+        ])
+
+        with open_readonly_workbook(io.BytesIO(data)) as workbook:
+            rows = list(iter_sheet_rows(workbook.active, ("a", "b", "c")))
+
+        self.assertEqual(rows, [
+            (2, {"a": "1", "b": "2", "c": "3"}),
+            (4, {"a": "4", "b": None, "c": None}),
+        ])
+
+    def test_records_are_keyed_by_normalized_header(self):
+        data = workbook_bytes([
+            [" Question ", "Correct_Answer", None],
+            ["2 + 2?", "B", None],
+        ])
+
+        with open_readonly_workbook(io.BytesIO(data)) as workbook:
+            records = list(iter_sheet_records(workbook.active))
+
+        self.assertEqual(records, [(2, {"question": "2 + 2?", "correct_answer": "B"})])
+
+
+class QuestionUploadViewTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username="sheet_staff",
+            password="testpass123",
+            role="admin",
+            is_staff=True,
+        )
+        self.client.force_login(self.staff)
+
+    def test_scq_upload_creates_complete_rows_and_skips_incomplete(self):
+        bank = QuestionBank.objects.create(title="SCQ bank", type="SCQ")
+        upload = xlsx_upload([
+            ["question", "option_a", "option_b", "option_c", "option_d", "correct_answer"],
+            ["Capital of Pakistan?", "Lahore", "Islamabad", "Karachi", "Quetta", "B"],
+            ["Missing option", "A", "", "C", "D", "A"],
+        ])
+
+        response = self.client.post(f"/upload/scq/{bank.id}/", {"file": upload})
+
+        self.assertEqual(response.status_code, 302)
+        question = SCQQuestion.objects.get(question_bank=bank)
+        self.assertEqual(question.option_b, "Islamabad")
+        self.assertEqual(question.correct_answer, "B")
+
+    def test_mcq_upload_reads_correct_answers_column(self):
+        bank = QuestionBank.objects.create(title="MCQ bank", type="MCQ")
+        upload = xlsx_upload([
+            ["question", "option_a", "option_b", "option_c", "option_d", "correct_answers"],
+            ["Even numbers?", "1", "2", "3", "4", "B,D"],
+        ])
+
+        self.client.post(f"/upload/mcq/{bank.id}/", {"file": upload})
+
+        self.assertEqual(MCQQuestion.objects.get(question_bank=bank).correct_answers, "B,D")
+
+    def test_fib_upload_skips_invalid_json(self):
+        bank = QuestionBank.objects.create(title="FIB bank", type="FIB")
+        upload = xlsx_upload([
+            ["question", "correct_answers"],
+            ["The sky is [blank1].", json.dumps({"blank1": ["blue"]})],
+            ["Broken row [blank1].", "not json"],
+        ])
+
+        self.client.post(f"/upload/fib/{bank.id}/", {"file": upload})
+
+        question = FIBQuestion.objects.get(question_bank=bank)
+        self.assertEqual(question.correct_answers, {"blank1": ["blue"]})
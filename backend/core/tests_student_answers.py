@@ -0,0 +1,213 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.answer_keys import clear_answer_keys
+from core.cache_layer import ANSWERS, get_cache
+from core.models import (
+    Grade,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    SCQQuestion,
+    StudentAnswer,
+    StudentQuizAttempt,
+    Subject,
+)
+from core.student_answers import flush_answer_buffers, record_student_answer
+
+User = get_user_model()
+
+LOCMEM_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+
+
+class StudentAnswerTestCase(TestCase):
+    def setUp(self):
+        clear_answer_keys()
+        grade = Grade.objects.create(name="Grade 4")
+        subject = Subject.objects.create(name="Math", grade=grade)
+        quiz = Quiz.objects.create(title="Upsert quiz", grade=grade, subject=subject, marks_per_question=1)
+        bank = QuestionBank.objects.create(title="Upsert bank", type="SCQ")
+        QuizQuestionAssignment.objects.create(quiz=quiz, question_bank=bank, num_questions=2)
+        self.first = SCQQuestion.objects.create(
+            question_bank=bank, question_text="2 + 2?",
+            option_a="3", option_b="4", option_c="5", option_d="6", correct_answer="B",
+        )
+        self.second = SCQQuestion.objects.create(
+            question_bank=bank, question_text="3 + 3?",
+            option_a="6", option_b="7", option_c="8", option_d="9", correct_answer="A",
+        )
+        student = User.objects.create_user(
+            username="upsert_student",
+            password="testpass123",
+            role="student",
+            grade=grade,
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.attempt = StudentQuizAttempt.objects.create(
+            student=student,
+            quiz=quiz,
+            meta={"selected_qids": [str(self.first.question_id), str(self.second.question_id)]},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=student)
+
+    def _submit(self, selected, question=None):
+        return self.client.post(
+            "/student/submit-answer/",
+            {
+                "attempt_id": self.attempt.id,
+                "question_id": str((question or self.first).question_id),
+                "question_type": "scq",
+                "answer_data": {"selected": selected},
+            },
+            format="json",
+        )
+
+    def _writes(self, queries):
+        return [q["sql"] for q in queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+
+
+class StudentAnswerUpsertTests(StudentAnswerTestCase):
+    def test_resubmitting_replaces_the_answer_with_one_write(self):
+        self.assertFalse(self._submit("3").data["is_correct"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._submit("4")
+
+        self.assertTrue(response.data["is_correct"])
+        self.assertEqual(response.data["current_correct"], 1)
+        writes = self._writes(queries)
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith("INSERT"))
+        answer = StudentAnswer.objects.get(attempt=self.attempt)
+        self.assertEqual(answer.answer_data, {"selected": "4"})
+
+    def test_constraint_rejects_duplicate_answers(self):
+        self._submit("4")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StudentAnswer.objects.create(
+                attempt=self.attempt, question_id=self.first.question_id, question_type="scq", answer_data={},
+            )
+
+    def test_finalize_fills_only_unanswered_questions(self):
+        self._submit("4")
+
+        response = self.client.post("/student/quiz/finalize/", {"attempt_id": self.attempt.id}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["correct_answers"], 1)
+        answers = dict(StudentAnswer.objects.filter(attempt=self.attempt).values_list("question_id", "answer_data"))
+        self.assertEqual(answers, {self.first.question_id: {"selected": "4"}, self.second.question_id: {"selected": None}})
+
+
+@override_settings(ANSWER_WRITE_BEHIND=True)
+class AnswerWriteBehindTests(StudentAnswerTestCase):
+    def setUp(self):
+        # An in-process cache stands in for the Redis buffer store.
+        store = override_settings(CACHES={**settings.CACHES, ANSWERS: {"BACKEND": LOCMEM_CACHE}})
+        store.enable()
+        self.addCleanup(store.disable)
+        backends = patch("core.student_answers.ANSWER_BUFFER_BACKENDS", (LOCMEM_CACHE,))
+        backends.start()
+        self.addCleanup(backends.stop)
+        get_cache(ANSWERS).clear()
+        self.addCleanup(get_cache(ANSWERS).clear)
+        super().setUp()
+
+    def test_submissions_are_buffered_and_written_once_on_finalize(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._submit("3")
+            response = self._submit("7", self.second)
+            self._submit("4")
+
+        self.assertEqual(self._writes(queries), [])
+        self.assertFalse(response.data["is_correct"])
+        self.assertFalse(StudentAnswer.objects.exists())
+
+        response = self.client.post("/student/quiz/finalize/", {"attempt_id": self.attempt.id}, format="json")
+
+        self.assertEqual(response.data["correct_answers"], 1)
+        answers = dict(StudentAnswer.objects.filter(attempt=self.attempt).values_list("question_id", "answer_data"))
+        self.assertEqual(answers, {self.first.question_id: {"selected": "4"}, self.second.question_id: {"selected": "7"}})
+        self.assertIsNone(get_cache(ANSWERS).get(f"answer-buffer:{self.attempt.id}:{self.first.question_id}"))
+
+    def test_periodic_flush_writes_only_changed_buffers(self):
+        self._submit("4")
+
+        call_command("flush_answer_buffers", stdout=StringIO())
+        self.assertEqual(StudentAnswer.objects.get(attempt=self.attempt).answer_data, {"selected": "4"})
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("flush_answer_buffers", stdout=StringIO())
+        self.assertEqual(self._writes(queries), [])
+
+        self._submit("5")
+        out = StringIO()
+        call_command("flush_answer_buffers", stdout=out)
+        self.assertIn("Flushed 1 answers from 1 attempts.", out.getvalue())
+        self.assertEqual(StudentAnswer.objects.get(attempt=self.attempt).answer_data, {"selected": "5"})
+
+    def test_concurrent_submissions_keep_every_answer(self):
+        cache = get_cache(ANSWERS)
+        store = cache.set
+
+        def submit_second_first(*args, **kwargs):
+            # Another request for the same attempt lands between this one's
+            # start and its write.
+            if not getattr(submit_second_first, "done", False):
+                submit_second_first.done = True
+                record_student_answer(self.attempt, self.second.question_id, "scq", {"selected": "A"})
+            return store(*args, **kwargs)
+
+        with patch.object(cache, "set", side_effect=submit_second_first):
+            record_student_answer(self.attempt, self.first.question_id, "scq", {"selected": "B"})
+
+        self.client.post("/student/quiz/finalize/", {"attempt_id": self.attempt.id}, format="json")
+        answers = dict(StudentAnswer.objects.filter(attempt=self.attempt).values_list("question_id", "answer_data"))
+        self.assertEqual(answers, {self.first.question_id: {"selected": "B"}, self.second.question_id: {"selected": "A"}})
+
+    def test_answer_submitted_during_a_flush_is_written_by_the_next_one(self):
+        self._submit("3")
+        bulk_create = StudentAnswer.objects.bulk_create
+
+        def submit_during_flush(*args, **kwargs):
+            result = bulk_create(*args, **kwargs)
+            record_student_answer(self.attempt, self.first.question_id, "scq", {"selected": "4"})
+            return result
+
+        with patch.object(StudentAnswer.objects, "bulk_create", side_effect=submit_during_flush):
+            flush_answer_buffers()
+        self.assertEqual(StudentAnswer.objects.get(attempt=self.attempt).answer_data, {"selected": "3"})
+
+        self.assertEqual(flush_answer_buffers(), {"attempts": 1, "answers": 1})
+        self.assertEqual(StudentAnswer.objects.get(attempt=self.attempt).answer_data, {"selected": "4"})
+
+
+
+@override_settings(ANSWER_WRITE_BEHIND=True)
+class AnswerWriteBehindFallbackTests(StudentAnswerTestCase):
+    def test_saves_directly_without_a_shared_buffer_store(self):
+        caches_without_store = {name: config for name, config in settings.CACHES.items() if name != ANSWERS}
+        stores = [
+            None,
+            {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp/learnify-test-answers"},
+            {"BACKEND": LOCMEM_CACHE},
+            {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "learnify_cache_answers"},
+        ]
+        for selected, store in zip("3456", stores):
+            caches = caches_without_store if store is None else {**caches_without_store, ANSWERS: store}
+            with self.subTest(store=store), override_settings(CACHES=caches):
+                record_student_answer(self.attempt, self.first.question_id, "scq", {"selected": selected})
+                self.assertEqual(StudentAnswer.objects.get(attempt=self.attempt).answer_data, {"selected": selected})
+                self.assertEqual(flush_answer_buffers(), {"attempts": 0, "answers": 0})
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import School
+
+User = get_user_model()
+
+
+class SubscriptionExpiryTests(TestCase):
+    def setUp(self):
+        today = timezone.now().date()
+        self.lapsed = User.objects.create_user(
+            username="lapsed_student",
+            password="testpass123",
+            role="student",
+            account_status="active",
+            subscription_expiry=today - timedelta(days=1),
+        )
+        self.current = User.objects.create_user(
+            username="current_student",
+            password="testpass123",
+            role="student",
+            account_status="active",
+            subscription_expiry=today + timedelta(days=10),
+        )
+        school_fields = {"city": "Lahore", "province": "Punjab", "contact_email": "s@school.test"}
+        self.lapsed_school = School.objects.create(
+            name="Lapsed School", account_status="active", subscription_expiry=today - timedelta(days=1), **school_fields
+        )
+        self.suspended_school = School.objects.create(
+            name="Suspended School", account_status="suspended", subscription_expiry=today - timedelta(days=1), **school_fields
+        )
+
+    def _updates(self, queries):
+        return [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+
+    def test_api_get_reports_expired_without_writing(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.lapsed)}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/user/me/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["account_status"], "expired")
+        self.assertEqual(self._updates(queries), [])
+        self.lapsed.refresh_from_db()
+        self.assertEqual(self.lapsed.account_status, "active")
+
+    def test_middleware_does_not_write_on_session_requests(self):
+        self.client.force_login(self.lapsed)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/user/me/")
+
+        self.assertEqual(self._updates(queries), [])
+
+    def test_scheduled_job_persists_expiry_in_bulk(self):
+        out = StringIO()
+        call_command("expire_subscriptions", stdout=out)
+
+        self.assertIn("Expired 1 users and 1 schools.", out.getvalue())
+        self.lapsed.refresh_from_db()
+        self.current.refresh_from_db()
+        self.lapsed_school.refresh_from_db()
+        self.suspended_school.refresh_from_db()
+        self.assertEqual(self.lapsed.account_status, "expired")
+        self.assertEqual(self.current.account_status, "active")
+        self.assertEqual(self.lapsed_school.account_status, "expired")
+        self.assertEqual(self.suspended_school.account_status, "suspended")
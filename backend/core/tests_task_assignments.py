@@ -0,0 +1,257 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import (
+    Grade,
+    QuestionBank,
+    Quiz,
+    QuizQuestionAssignment,
+    School,
+    StudentQuizAttempt,
+    Subject,
+    TeacherTask,
+    TeacherTaskQuiz,
+)
+from core.task_assignments import resolve_task_assignments
+from core.teacher_scoping import teacher_students_queryset
+
+User = get_user_model()
+
+
+class TaskAssignmentResolverTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.grade = Grade.objects.create(name="Grade 5")
+        self.other_grade = Grade.objects.create(name="Grade 6")
+        self.subject = Subject.objects.create(name="Math", grade=self.grade)
+        self.bank = QuestionBank.objects.create(title="Bank", type="SCQ")
+        self.school = School.objects.create(
+            name="Resolver School",
+            city="Lahore",
+            province="Punjab",
+            contact_email="resolver@school.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.other_school = School.objects.create(
+            name="Elsewhere School",
+            city="Karachi",
+            province="Sindh",
+            contact_email="elsewhere@school.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.teacher = User.objects.create_user(
+            username="resolver_teacher",
+            password="testpass123",
+            role="teacher",
+            school=self.school,
+        )
+        self.students = [
+            User.objects.create_user(
+                username=f"resolver_student_{index}",
+                password="testpass123",
+                role="student",
+                school=self.school,
+                grade=self.grade,
+                full_name=f"Student {index}",
+            )
+            for index in range(3)
+        ]
+        self.outsider = User.objects.create_user(
+            username="resolver_outsider",
+            password="testpass123",
+            role="student",
+            school=self.other_school,
+            grade=self.grade,
+        )
+        self.client.force_authenticate(user=self.teacher)
+
+    def _quiz(self, title, num_questions=5):
+        quiz = Quiz.objects.create(
+            title=title, grade=self.grade, subject=self.subject, marks_per_question=2
+        )
+        QuizQuestionAssignment.objects.create(
+            quiz=quiz, question_bank=self.bank, num_questions=num_questions
+        )
+        return quiz
+
+    def _task(self, quizzes, target_grade=None, target_students=()):
+        task = TeacherTask.objects.create(
+            teacher=self.teacher,
+            school=self.school,
+            target_grade=target_grade,
+            message="Practice",
+            due_date=timezone.now().date() + timedelta(days=7),
+        )
+        task.target_students.set(target_students)
+        TeacherTaskQuiz.objects.bulk_create([TeacherTaskQuiz(task=task, quiz=quiz) for quiz in quizzes])
+        return task
+
+    def _complete(self, student, quiz, score):
+        StudentQuizAttempt.objects.create(
+            student=student, quiz=quiz, score=score, completed_at=timezone.now()
+        )
+
+    def _tasks_queryset(self):
+        return TeacherTask.objects.filter(teacher=self.teacher).prefetch_related(
+            "task_quizzes__quiz", "target_students"
+        ).order_by("id")
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_resolves_grade_wide_and_targeted_tasks(self):
+        quiz = self._quiz("Fractions")
+        grade_task = self._task([quiz], target_grade=self.grade)
+        targeted_task = self._task([quiz], target_students=[self.students[1], self.outsider])
+        self._task([quiz], target_grade=self.other_grade)
+        self._complete(self.students[1], quiz, 6)
+
+        resolved = resolve_task_assignments(self._tasks_queryset(), teacher_students_queryset(self.teacher))
+        by_task = {assignment.task.id: assignment for assignment in resolved.assignments}
+
+        grade_assignment = by_task[grade_task.id]
+        self.assertTrue(grade_assignment.is_grade_wide)
+        self.assertEqual([s.id for s in grade_assignment.students], [s.id for s in self.students])
+        self.assertEqual(resolved.count_items(grade_assignment), (1, 2))
+
+        targeted_assignment = by_task[targeted_task.id]
+        self.assertFalse(targeted_assignment.is_grade_wide)
+        self.assertEqual([s.id for s in targeted_assignment.students], [self.students[1].id])
+        self.assertEqual(resolved.count_items(targeted_assignment), (1, 0))
+
+        self.assertEqual(resolved.quiz_totals, {quiz.id: 10})
+
+    def test_teacher_endpoints_query_count_does_not_grow_with_tasks(self):
+        first_quiz = self._quiz("Quiz 0")
+        self._task([first_quiz], target_grade=self.grade)
+        self._complete(self.students[0], first_quiz, 4)
+        urls = ["/api/teacher/tasks/", "/api/teacher/dashboard-summary/", "/api/school/task-monitoring/"]
+        principal = User.objects.create_user(
+            username="resolver_principal",
+            password="testpass123",
+            role="school_admin",
+            school=self.school,
+        )
+
+        def counts():
+            self.client.force_authenticate(user=self.teacher)
+            result = [self._query_count(url) for url in urls[:2]]
+            self.client.force_authenticate(user=principal)
+            result.append(self._query_count(urls[2]))
+            return result
+
+        baseline = counts()
+
+        for index in range(1, 6):
+            quiz = self._quiz(f"Quiz {index}")
+            self._task([quiz], target_students=self.students[:index % 3 + 1])
+            self._complete(self.students[0], quiz, 4)
+
+        self.assertEqual(counts(), baseline)
+
+
+class StudentTasksListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.grade = Grade.objects.create(name="Grade 7")
+        self.subject = Subject.objects.create(name="English", grade=self.grade)
+        self.bank = QuestionBank.objects.create(title="Bank", type="SCQ")
+        self.school = School.objects.create(
+            name="Student Tasks School",
+            city="Peshawar",
+            province="Khyber-Pakhtunkhwa",
+            contact_email="tasks@school.test",
+            account_status="active",
+            subscription_expiry=timezone.now().date() + timedelta(days=30),
+        )
+        self.teacher = User.objects.create_user(
+            username="tasks_teacher",
+            password="testpass123",
+            role="teacher",
+            school=self.school,
+        )
+        self.student = User.objects.create_user(
+            username="tasks_student",
+            password="testpass123",
+            role="student",
+            school=self.school,
+            grade=self.grade,
+        )
+        self.client.force_authenticate(user=self.student)
+
+    def _task_with_quizzes(self, count):
+        task = TeacherTask.objects.create(
+            teacher=self.teacher,
+            school=self.school,
+            target_grade=self.grade,
+            message="Read",
+            due_date=timezone.now().date() + timedelta(days=7),
+        )
+        quizzes = [
+            Quiz.objects.create(
+                title=f"Task {task.id} quiz {index}",
+                grade=self.grade,
+                subject=self.subject,
+                marks_per_question=1,
+            )
+            for index in range(count)
+        ]
+        TeacherTaskQuiz.objects.bulk_create([TeacherTaskQuiz(task=task, quiz=quiz) for quiz in quizzes])
+        return task, quizzes
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_quizzes(self):
+        _, quizzes = self._task_with_quizzes(1)
+        StudentQuizAttempt.objects.create(
+            student=self.student, quiz=quizzes[0], score=1, completed_at=timezone.now()
+        )
+        _, baseline = self._get("/api/student/tasks/")
+
+        for _ in range(4):
+            self._task_with_quizzes(3)
+        response, queries = self._get("/api/student/tasks/")
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(response.data["summary"], {
+            "tasks_count": 5,
+            "pending_quiz_count": 12,
+            "pending_tasks_count": 4,
+        })
+        attempted = {
+            quiz["quiz_id"]: quiz["attempted"]
+            for task in response.data["tasks"]
+            for quiz in task["quizzes"]
+        }
+        self.assertTrue(attempted[quizzes[0].id])
+        self.assertEqual(sum(attempted.values()), 1)
+
+    def test_pagination_keeps_summary_for_all_tasks(self):
+        tasks = [self._task_with_quizzes(1)[0] for _ in range(3)]
+
+        response, _ = self._get("/api/student/tasks/?page=2&page_size=2")
+
+        self.assertEqual([task["task_id"] for task in response.data["tasks"]], [tasks[0].id])
+        self.assertEqual(response.data["summary"]["tasks_count"], 3)
+        self.assertEqual(response.data["pagination"], {
+            "page": 2,
+            "page_size": 2,
+            "total_pages": 2,
+            "has_next": False,
+        })
+        self.assertNotIn("pagination", self.client.get("/api/student/tasks/").data)
@@ -0,0 +1,138 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import models
+from django.db.models import ProtectedError
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import (
+    Grade,
+    Quiz,
+    School,
+    StudentAnswer,
+    StudentQuizAttempt,
+    Subject,
+    TeacherTask,
+)
+from core.school_snapshots import get_school_snapshot
+from core.user_cleanup import delete_users_chunk
+from payments.models import Payment
+
+User = get_user_model()
+
+
+class DeleteExpiredUsersChunkedTests(TestCase):
+    def setUp(self):
+        grade = Grade.objects.create(name="Grade 7")
+        subject = Subject.objects.create(name="Science", grade=grade)
+        self.quiz = Quiz.objects.create(title="Cleanup quiz", grade=grade, subject=subject, marks_per_question=1)
+        self.group = Group.objects.create(name="Cleanup group")
+        old_date = timezone.now().date() - timedelta(days=90)
+
+        self.expired = [
+            User.objects.create_user(
+                username=f"expired_{index}",
+                password="testpass123",
+                role="student",
+                subscription_expiry=old_date,
+            )
+            for index in range(3)
+        ]
+        self.keeper = User.objects.create_user(
+            username="still_active",
+            password="testpass123",
+            role="student",
+            subscription_expiry=timezone.now().date() + timedelta(days=10),
+        )
+        self.teacher = User.objects.create_user(
+            username="cleanup_teacher",
+            password="testpass123",
+            role="teacher",
+            subscription_expiry=timezone.now().date() + timedelta(days=10),
+        )
+
+        for student in self.expired + [self.keeper]:
+            attempt = StudentQuizAttempt.objects.create(
+                student=student,
+                quiz=self.quiz,
+                completed_at=timezone.now(),
+            )
+            StudentAnswer.objects.create(
+                attempt=attempt,
+                question_id=uuid.uuid4(),
+                question_type="SCQ",
+                answer_data={"selected": "A"},
+            )
+            Payment.objects.create(user=student, amount=500)
+            student.groups.add(self.group)
+
+        self.task = TeacherTask.objects.create(
+            teacher=self.teacher,
+            message="Revise",
+            due_date=timezone.now().date(),
+        )
+        self.task.target_students.add(self.expired[0], self.keeper)
+
+    def test_chunks_delete_users_and_dependent_rows(self):
+        out = StringIO()
+        call_command("delete_expired_users", "--batch-size", "2", "--sleep", "0", stdout=out)
+
+        self.assertFalse(User.objects.filter(username__startswith="expired_").exists())
+        self.assertEqual(StudentQuizAttempt.objects.count(), 1)
+        self.assertEqual(StudentAnswer.objects.count(), 1)
+        self.assertEqual(list(Payment.objects.values_list("user_id", flat=True)), [self.keeper.id])
+        self.assertEqual(list(self.task.target_students.all()), [self.keeper])
+        self.assertEqual(list(self.group.user_set.all()), [self.keeper])
+        self.assertIn("Deleted 2/3 users", out.getvalue())
+        self.assertIn("Deleted 3 expired users.", out.getvalue())
+        self.assertIn("core.StudentAnswer: 3", out.getvalue())
+
+    def test_dry_run_only_counts(self):
+        out = StringIO()
+        call_command("delete_expired_users", "--dry-run", "--sleep", "0", stdout=out)
+
+        self.assertEqual(User.objects.filter(username__startswith="expired_").count(), 3)
+        self.assertEqual(StudentAnswer.objects.count(), 4)
+        self.assertIn("Would delete 3 expired users.", out.getvalue())
+        self.assertIn("payments.Payment: 3", out.getvalue())
+
+    def test_bulk_delete_drops_the_schools_snapshots(self):
+        school = School.objects.create(name="Cleanup School", city="Multan", province="Punjab", contact_email="cleanup@school.test")
+        User.objects.filter(id__in=[user.id for user in self.expired]).update(school=school)
+        self.assertEqual(get_school_snapshot(school, "roster_counts")["students"], 3)
+
+        delete_users_chunk([user.id for user in self.expired[:2]])
+
+        self.assertEqual(get_school_snapshot(school, "roster_counts")["students"], 1)
+
+    def test_relations_the_bulk_path_cannot_reproduce_use_the_regular_delete(self):
+        payment_user = Payment._meta.get_field("user").remote_field
+        expired_ids = [user.id for user in self.expired]
+
+        with mock.patch.object(payment_user, "on_delete", models.SET(self.keeper.id)):
+            counts = delete_users_chunk(expired_ids, dry_run=True)
+            self.assertEqual(counts["core.StudentAnswer"], 3)
+            self.assertEqual(User.objects.filter(id__in=expired_ids).count(), 3)
+
+            counts = delete_users_chunk(expired_ids)
+
+        self.assertEqual(counts["core.User"], 3)
+        self.assertFalse(User.objects.filter(id__in=expired_ids).exists())
+        self.assertEqual(Payment.objects.filter(user=self.keeper).count(), 4)
+
+    def test_protected_relations_stop_the_chunk(self):
+        payment_user = Payment._meta.get_field("user").remote_field
+        expired_ids = [user.id for user in self.expired]
+
+        with mock.patch.object(payment_user, "on_delete", models.PROTECT):
+            with self.assertRaises(ProtectedError):
+                delete_users_chunk(expired_ids)
+
+        self.assertEqual(User.objects.filter(id__in=expired_ids).count(), 3)
+        self.assertEqual(StudentAnswer.objects.count(), 4)
@@ -76,6 +76,7 @@ from core.views import (
     school_users,
     school_roster_template,
     school_upload_roster,
+    school_roster_import_status,
     school_signup,
     school_settings,
     school_settings_logo,
@@ -211,6 +212,7 @@ urlpatterns = [
     path('api/school/users/', school_users, name='school-users'),
     path('api/school/template/', school_roster_template, name='school-roster-template'),
     path('api/school/upload-roster/', school_upload_roster, name='school-upload-roster'),
+    path('api/school/roster-imports/<int:job_id>/', school_roster_import_status, name='school-roster-import-status'),
     path('api/teacher/dashboard-summary/', teacher_dashboard_summary, name='teacher-dashboard-summary'),
     path('api/teacher/quizzes/', teacher_quizzes_by_grade, name='teacher-quizzes-by-grade'),
     path('api/teacher/tasks/create/', teacher_create_task, name='teacher-create-task'),
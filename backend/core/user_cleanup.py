@@ -0,0 +1,125 @@
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models.deletion import Collector
+
+from core.answer_keys import invalidate_answer_keys
+from core.authentication import invalidate_cached_users
+from core.models import QuestionRegistry, TeacherTask, User
+from core.question_registry import QUESTION_MODELS
+from core.school_snapshots import invalidate_school_snapshots
+
+# on_delete behaviours _clear_dependents reproduces with bulk statements.
+BULK_ON_DELETE = (models.CASCADE, models.SET_NULL, models.DO_NOTHING)
+
+
+def _m2m_through_rows(field, lookup, ids, *, reverse):
+    name = field.m2m_reverse_field_name() if reverse else field.m2m_field_name()
+    return field.remote_field.through._base_manager.filter(**{f"{name}__{lookup}": ids})
+
+
+def _bulk_deletable(model, seen=None):
+    """
+    Whether every relation below `model` uses an on_delete in BULK_ON_DELETE.
+    PROTECT, RESTRICT, SET_DEFAULT and SET() need the regular collector.
+    """
+    seen = seen if seen is not None else set()
+    seen.add(model)
+    for rel in model._meta.related_objects:
+        if rel.many_to_many:
+            continue
+        if rel.on_delete not in BULK_ON_DELETE:
+            return False
+        if rel.on_delete is models.CASCADE and rel.related_model not in seen:
+            if not _bulk_deletable(rel.related_model, seen):
+                return False
+    return True
+
+
+def _forget_questions(question_model, rows):
+    """Drop the registry rows and answer keys the bypassed question signals would."""
+    if question_model not in QUESTION_MODELS.values():
+        return
+    question_ids = list(rows.values_list("question_id", flat=True))
+    QuestionRegistry.objects.filter(question_id__in=question_ids).delete()
+    transaction.on_commit(lambda: invalidate_answer_keys(*question_ids))
+
+
+def _clear_dependents(model, lookup, ids, counts, *, dry_run):
+    """
+    Remove everything that depends on the `model` rows matched by
+    `{lookup: ids}`, children first, with one bulk statement per relation.
+    Rows are never loaded into memory and no delete signals fire. Callers
+    check _bulk_deletable first.
+    """
+    for field in model._meta.local_many_to_many:
+        through_rows = _m2m_through_rows(field, lookup, ids, reverse=False)
+        counts[through_rows.model._meta.label] += through_rows.count() if dry_run else through_rows._raw_delete(through_rows.db)
+
+    for rel in model._meta.related_objects:
+        if rel.many_to_many:
+            through_rows = _m2m_through_rows(rel.field, lookup, ids, reverse=True)
+            counts[through_rows.model._meta.label] += through_rows.count() if dry_run else through_rows._raw_delete(through_rows.db)
+            continue
+
+        related_lookup = f"{rel.field.name}__{lookup}"
+        related_rows = rel.related_model._base_manager.filter(**{related_lookup: ids})
+        if rel.on_delete is models.CASCADE:
+            _clear_dependents(rel.related_model, related_lookup, ids, counts, dry_run=dry_run)
+            if dry_run:
+                counts[rel.related_model._meta.label] += related_rows.count()
+            else:
+                _forget_questions(rel.related_model, related_rows)
+                counts[rel.related_model._meta.label] += related_rows._raw_delete(related_rows.db)
+        elif rel.on_delete is models.SET_NULL:
+            if not dry_run:
+                related_rows.update(**{rel.field.name: None})
+
+
+def _collect_users(users, counts, *, dry_run):
+    """Delete (or count) `users` through Django's collector, signals and all."""
+    if not dry_run:
+        _, deleted = users.delete()
+        counts.update(deleted)
+        return
+    collector = Collector(using=users.db)
+    collector.collect(users)
+    for model, instances in collector.data.items():
+        counts[model._meta.label] += len(instances)
+    for queryset in collector.fast_deletes:
+        counts[queryset.model._meta.label] += queryset.count()
+
+
+def delete_users_chunk(user_ids, *, dry_run=False):
+    """
+    Delete one chunk of users and their dependent rows (attempts, answers,
+    payments, progress, tasks, ...) in a single transaction. Returns a
+    Counter of rows per model label; with dry_run it only counts.
+
+    The bulk path skips delete signals, so the caches they would have
+    invalidated (cached users, school snapshots) are invalidated here.
+    When a relation needs more than CASCADE or SET_NULL, the chunk goes
+    through the regular collector instead.
+    """
+    counts = Counter()
+    users = User._base_manager.filter(id__in=user_ids)
+    if not _bulk_deletable(User):
+        with transaction.atomic():
+            _collect_users(users, counts, dry_run=dry_run)
+        return counts
+
+    school_ids = set()
+    with transaction.atomic():
+        if not dry_run:
+            school_ids.update(users.exclude(school=None).values_list("school_id", flat=True))
+            school_ids.update(
+                TeacherTask.objects.filter(teacher_id__in=user_ids)
+                .exclude(school=None)
+                .values_list("school_id", flat=True)
+            )
+        _clear_dependents(User, "id__in", user_ids, counts, dry_run=dry_run)
+        counts[User._meta.label] += users.count() if dry_run else users._raw_delete(users.db)
+    if not dry_run:
+        invalidate_cached_users(*user_ids)
+        invalidate_school_snapshots(*school_ids)
+    return counts
@@ -1,7 +1,5 @@
 # core/utils.py
 from __future__ import annotations
-from django.core.mail import send_mail
-from django.conf import settings
 
 import os
 import re
@@ -114,13 +112,9 @@ def send_account_notification_email(user, action, plain_password=None):
         )
 
     if subject and message:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        from core.email_outbox import queue_email  # utils stays importable before apps load
+
+        queue_email(subject, message, [user.email])
 
 
 # -----------------------------------------------------------------------------
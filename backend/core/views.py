@@ -1,4 +1,3 @@
-import pandas as pd
 import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
@@ -15,10 +14,34 @@ from core.models import StudentAnswer
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from .permissions import has_active_subscription, HasPaidSubscription
+from .permissions import HasPaidSubscription, request_has_active_subscription
+from .answer_keys import (
+    answer_key_for,
+    get_answer_keys,
+    get_answer_keys_for_answers,
+    grade_answer,
+    grade_answer_exact,
+)
+from .subscription_expiry import effective_account_status
+from .answer_sheets import attempt_sheet_answers, load_attempt_answers
+from .attempt_archive import (
+    best_completed_attempt,
+    completed_attempts_for,
+    completed_quiz_ids_for,
+    get_completed_attempt,
+)
+from .student_answers import (
+    attempt_answers,
+    discard_answer_buffer,
+    fill_unanswered,
+    flush_answer_buffer,
+    record_student_answer,
+    save_student_answer,
+)
 from django.utils.timezone import localtime
 from django.db import models
 from django.db.models import Prefetch
+from django.core.paginator import Paginator
 from django.db.utils import ProgrammingError, OperationalError
 from .serializers import (
     QuizListSerializer,
@@ -57,13 +80,14 @@ from .models import Grade, Topic, Week, TopicQuiz, WeekQuiz
 from django.utils.timezone import localtime
 import pytz
 from core.utils import normalize_text, normalize_numeric_commas
+from core.question_import import import_questions_from_file
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET
 from core.emails import send_password_change_email, send_welcome_email
 from django.db.models import Q
 from django.utils.dateparse import parse_date
 from django.http import FileResponse, Http404
-from core.models import TeacherTask, TeacherTaskQuiz
+from core.models import RosterImportJob, TeacherTask, TeacherTaskQuiz
 from core.teacher_scoping import teacher_can_access_student, teacher_students_queryset
 from core.roster_upload import (
     get_roster_template_path,
@@ -71,19 +95,25 @@ from core.roster_upload import (
     school_has_roster,
 )
 from core.school_analytics import (
-    build_school_analytics_summary,
     build_school_student_summary,
     get_school_student,
 )
 from core.school_teacher_analytics import (
     build_school_task_monitoring,
-    build_school_teacher_analytics,
     build_school_teacher_detail,
     build_school_teacher_summary,
     get_school_teacher,
     get_school_teacher_by_id,
 )
-from core.student_monitoring import build_learning_diagnosis, build_student_quiz_history
+from core.roster_import_jobs import enqueue_roster_import, serialize_roster_import_job
+from core.school_snapshots import get_school_snapshot
+from core.student_monitoring import (
+    build_learning_diagnosis,
+    build_student_quiz_history,
+    latest_completed_attempts,
+)
+from core.latest_attempts import latest_attempts_queryset
+from core.task_assignments import percentage_of_total, quiz_total_marks_map, resolve_task_assignments
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 
@@ -305,32 +335,31 @@ def _learning_diagnosis_v2_fields(student, overall_avg, chapter_mastery, quiz_ro
     }
 
 
+QUESTION_UPLOAD_REJECTS_SHOWN = 20
+
+
+def _report_question_import(request, result, label):
+    if result.error:
+        messages.error(request, f"{label} upload failed: {result.error}")
+        return
+    messages.success(
+        request,
+        f"{result.created} {label} question(s) uploaded. {result.rejected_count} row(s) rejected.",
+    )
+    for reject in result.rejected[:QUESTION_UPLOAD_REJECTS_SHOWN]:
+        messages.warning(request, f"Row {reject['row']}: {reject['error']}")
+    if result.rejected_count > QUESTION_UPLOAD_REJECTS_SHOWN:
+        messages.warning(request, f"...and {result.rejected_count - QUESTION_UPLOAD_REJECTS_SHOWN} more rejected row(s).")
+
+
 @staff_member_required
 def bulk_upload_scq(request, bank_id):
     from core.forms import UploadSCQForm
     bank = get_object_or_404(QuestionBank, id=bank_id, type='SCQ')
 
     if request.method == 'POST' and request.FILES.get('file'):
-        file = request.FILES['file']
-        df = pd.read_excel(file)
-
-        uploaded, skipped = 0, 0
-        for _, row in df.iterrows():
-            if all(pd.notna(row.get(col)) for col in ['question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer']):
-                SCQQuestion.objects.create(
-                    question_bank=bank,
-                    question_text=row['question'],
-                    option_a=row['option_a'],
-                    option_b=row['option_b'],
-                    option_c=row['option_c'],
-                    option_d=row['option_d'],
-                    correct_answer=row['correct_answer']
-                )
-                uploaded += 1
-            else:
-                skipped += 1
-
-        messages.success(request, f" {uploaded} SCQ questions uploaded successfully.  {skipped} rows skipped.")
+        result = import_questions_from_file(bank, request.FILES['file'])
+        _report_question_import(request, result, 'SCQ')
         return redirect(f'/preview-questions/{bank.id}/')
 
     # FIX: define form in GET branch
@@ -343,26 +372,8 @@ def bulk_upload_mcq(request, bank_id):
     bank = get_object_or_404(QuestionBank, id=bank_id, type='MCQ')
 
     if request.method == 'POST' and request.FILES.get('file'):
-        file = request.FILES['file']
-        df = pd.read_excel(file)
-
-        uploaded, skipped = 0, 0
-        for _, row in df.iterrows():
-            if all(pd.notna(row.get(col)) for col in ['question', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answers']):
-                MCQQuestion.objects.create(
-                    question_bank=bank,
-                    question_text=row['question'],
-                    option_a=row['option_a'],
-                    option_b=row['option_b'],
-                    option_c=row['option_c'],
-                    option_d=row['option_d'],
-                    correct_answers=row['correct_answers']  # comma-separated
-                )
-                uploaded += 1
-            else:
-                skipped += 1
-
-        messages.success(request, f"‚ {uploaded} MCQ questions uploaded. {skipped} rows skipped.")
+        result = import_questions_from_file(bank, request.FILES['file'])
+        _report_question_import(request, result, 'MCQ')
         return redirect(f'/preview-questions/{bank.id}/')
 
     form = UploadMCQForm(initial={'question_bank_id': bank_id})
@@ -373,32 +384,8 @@ def bulk_upload_fib(request, bank_id):
     bank = get_object_or_404(QuestionBank, id=bank_id, type='FIB')
 
     if request.method == 'POST' and request.FILES.get('file'):
-        file = request.FILES['file']
-        df = pd.read_excel(file)
-
-        created_count = 0
-        for _, row in df.iterrows():
-            question_text = row.get('question')
-            correct_answers_raw = row.get('correct_answers')
-
-            if pd.isna(question_text) or pd.isna(correct_answers_raw):
-                continue
-
-            try:
-                correct_answers = json.loads(correct_answers_raw)
-                if not isinstance(correct_answers, dict):
-                    raise ValueError
-            except Exception:
-                continue  # Skip if JSON is invalid or not a dict
-
-            FIBQuestion.objects.create(
-                question_bank=bank,
-                question_text=question_text,
-                correct_answers=correct_answers
-            )
-            created_count += 1
-
-        messages.success(request, f"FIB upload complete: {created_count} question(s) added.")
+        result = import_questions_from_file(bank, request.FILES['file'])
+        _report_question_import(request, result, 'FIB')
         return redirect(f'/preview-questions/{bank.id}/')
 
     return render(request, 'admin/core/fib_upload_form.html', {'bank': bank})
@@ -420,7 +407,7 @@ def start_quiz(request, quiz_id):
 
     # Always fetch quiz first before role logic
     try:
-        quiz = Quiz.objects.get(id=quiz_id)
+        quiz = Quiz.objects.select_related('grade').get(id=quiz_id)
     except Quiz.DoesNotExist:
         return JsonResponse({'error': 'Quiz not found.'}, status=404)
 
@@ -440,7 +427,7 @@ def start_quiz(request, quiz_id):
 
             if not user_grade_str or not quiz_grade_str or user_grade_str != quiz_grade_str:
                 preview_mode = True
-            elif not has_active_subscription(user):
+            elif not request_has_active_subscription(request):
                 preview_mode = True
 
     questions_output = []
@@ -529,11 +516,11 @@ def submit_quiz(request, attempt_id):
     if not user.is_authenticated or user.role != 'student':
         return JsonResponse({'error': 'Only authenticated students can submit quizzes.'}, status=403)
 
-    if not has_active_subscription(user):
+    if not request_has_active_subscription(request):
         return JsonResponse({'detail': 'Subscription required'}, status=403)
 
     try:
-        attempt = StudentQuizAttempt.objects.get(id=attempt_id, student=user)
+        attempt = StudentQuizAttempt.objects.select_related('student').get(id=attempt_id, student=user)
     except StudentQuizAttempt.DoesNotExist:
         return JsonResponse({'error': 'Invalid quiz attempt ID.'}, status=404)
 
@@ -551,6 +538,9 @@ def submit_quiz(request, attempt_id):
     assigned_qs = quiz.assignments.aggregate(total=models.Sum('num_questions'))['total'] or 0
     total_questions = assigned_qs
 
+    # Answers sent here replace any buffered by submit_answer.
+    flush_answer_buffer(attempt)
+
     for ans in answers:
         qid = ans['question_id']
         qtype = ans['question_type'].lower()
@@ -586,12 +576,7 @@ def submit_quiz(request, attempt_id):
                     is_correct = False
 
             # Save answer
-            StudentAnswer.objects.create(
-                attempt=attempt,
-                question_id=str(qid),
-                question_type=qtype,
-                answer_data=given
-            )
+            save_student_answer(attempt, str(qid), qtype, given)
 
             if is_correct:
                 correct_count += 1
@@ -618,10 +603,8 @@ def submit_quiz(request, attempt_id):
 
     grade = get_grade(percentage)
 
-    # Compare with best previous attempt
-    previous_best = StudentQuizAttempt.objects.filter(
-        student=user, quiz=quiz, completed_at__isnull=False
-    ).exclude(id=attempt.id).order_by('-score').first()
+    # Compare with best previous attempt, archived ones included
+    previous_best = best_completed_attempt(user, quiz, exclude_id=attempt.id)
 
     if previous_best and previous_best.score >= total_marks:
         attempt.delete()
@@ -637,8 +620,10 @@ def submit_quiz(request, attempt_id):
     attempt.score = total_marks
     attempt.completed_at = timezone.now()
     attempt.save()
+    discard_answer_buffer(attempt)
 
-    if previous_best:
+    # An archived attempt stays: it is already counted in the archive summaries.
+    if isinstance(previous_best, StudentQuizAttempt):
         previous_best.delete()
 
     return JsonResponse({
@@ -659,10 +644,8 @@ def list_student_quiz_results(request):
     if user.role != 'student':
         return Response({'error': 'Only students can view their quiz results.'}, status=403)
 
-    attempts = StudentQuizAttempt.objects.filter(
-        student=user,
-        completed_at__isnull=False
-    ).order_by('-completed_at')
+    attempts = completed_attempts_for(user)
+    answers_by_attempt = load_attempt_answers(attempts)
 
     results = []
     for attempt in attempts:
@@ -670,32 +653,12 @@ def list_student_quiz_results(request):
         total_questions = quiz.assignments.aggregate(total=models.Sum('num_questions'))['total'] or 0
         total_marks = total_questions * quiz.marks_per_question
 
-        correct_answers = 0
-        for answer in attempt.answers.all():
-            qid = answer.question_id
-            if answer.question_type == 'scq':
-                try:
-                    q = SCQQuestion.objects.get(question_id=str(qid))
-                    if answer.answer_data.get('selected') == q.correct_answer:
-                        correct_answers += 1
-                except SCQQuestion.DoesNotExist:
-                    continue
-            elif answer.question_type == 'mcq':
-                try:
-                    q = MCQQuestion.objects.get(question_id=str(qid))
-                    correct_options = sorted([x.strip() for x in q.correct_answers.split(',')])
-                    selected_options = sorted(answer.answer_data.get('selected', []))
-                    if selected_options == correct_options:
-                        correct_answers += 1
-                except MCQQuestion.DoesNotExist:
-                    continue
-            elif answer.question_type == 'fib':
-                try:
-                    q = FIBQuestion.objects.get(question_id=str(qid))
-                    if q.correct_answers == answer.answer_data:
-                        correct_answers += 1
-                except FIBQuestion.DoesNotExist:
-                    continue
+        answers = answers_by_attempt[attempt.id]
+        answer_keys = get_answer_keys_for_answers(answers)
+        correct_answers = sum(
+            1 for answer in answers
+            if grade_answer_exact(answer_key_for(answer_keys, answer.question_id, answer.question_type), answer.answer_data)
+        )
 
         marks_obtained = correct_answers * quiz.marks_per_question
         percentage = round((marks_obtained / total_marks) * 100, 2) if total_marks else 0
@@ -724,9 +687,8 @@ def list_student_quiz_results(request):
 def get_quiz_result(request, attempt_id):
     user = request.user
 
-    try:
-        attempt = StudentQuizAttempt.objects.get(id=attempt_id, completed_at__isnull=False)
-    except StudentQuizAttempt.DoesNotExist:
+    attempt = get_completed_attempt(attempt_id)
+    if attempt is None:
         return Response({'error': 'Quiz attempt not found or incomplete.'}, status=404)
 
     # ‚Äö√Ñ√∂‚àö√ë‚àö‚àÇ‚Äö√†√∂‚Äö√†¬¥‚Äö√†√∂‚àö¬± Check authorization
@@ -737,85 +699,35 @@ def get_quiz_result(request, attempt_id):
     if not result:
         return Response({'error': 'Result not available for this attempt.'}, status=404)
 
-    answers = attempt.answers.all()
+    answers = attempt_sheet_answers(attempt)
+    answer_keys = get_answer_keys_for_answers(answers)
     questions_data = []
-    evaluated_qids = set()
 
     for answer in answers:
         qid = answer.question_id
         qtype = answer.question_type
-        student_answer = None
-        correct_answer = None
-        is_correct = False
-        question_text = ""
-
-        try:
-            if qtype == 'scq':
-                q = SCQQuestion.objects.get(question_id=str(qid))
-                question_text = html.unescape(strip_tags(q.question_text)).strip()
-                correct_label = (q.correct_answer or "").strip().upper()
-                option_map = {'A': q.option_a, 'B': q.option_b, 'C': q.option_c, 'D': q.option_d}
-                correct_answer = option_map.get(correct_label)
-                student_answer = answer.answer_data.get('selected', '')
-                is_correct = (
-                    normalize_text(student_answer) == normalize_text(correct_answer)
-                    if student_answer and correct_answer else False
-                )
-
-            elif qtype == 'mcq':
-                q = MCQQuestion.objects.get(question_id=str(qid))
-                question_text = html.unescape(strip_tags(q.question_text)).strip()
-                correct_labels = [x.strip().lower() for x in q.correct_answers.split(',')]
-                options_map = {
-                    'a': q.option_a,
-                    'b': q.option_b,
-                    'c': q.option_c,
-                    'd': q.option_d
-                }
-                correct_answer = sorted([
-                    normalize_text(options_map[label]) for label in correct_labels if label in options_map
-                ])
-
-                student_answer = answer.answer_data.get('selected', [])
-                if isinstance(student_answer, str):
-                    student_answer = [student_answer]
-
-                student_answer = sorted([normalize_text(x) for x in student_answer])
-                is_correct = student_answer == correct_answer
-
-            elif qtype == 'fib':
-                q = FIBQuestion.objects.get(question_id=str(qid))
-                question_text = html.unescape(strip_tags(q.question_text)).strip()
-                correct_answer = q.correct_answers
-                student_answer = answer.answer_data
-
-                if isinstance(student_answer, dict) and isinstance(correct_answer, dict):
-                    normalized_student = {
-                        str(k).strip().lower(): normalize_numeric_commas(v)
-                        for k, v in student_answer.items()
-                        if v and str(v).strip()
-                    }
-                    normalized_correct = {
-                        str(k).strip().lower(): normalize_numeric_commas(v)
-                        for k, v in correct_answer.items()
-                        if v and str(v).strip()
-                    }
-                    is_correct = normalized_student == normalized_correct
-                else:
-                    is_correct = False
+        key = answer_key_for(answer_keys, qid, qtype)
+        if key is None:
+            print(f"Failed to find question with ID: {qid} for type: {qtype}")
+            continue
 
-            questions_data.append({
-                'question_type': qtype,
-                'question_text': question_text,
-                'correct_answer': correct_answer,
-                'student_answer': student_answer,
-                'is_correct': is_correct
-            })
-            evaluated_qids.add(qid)
+        if qtype == 'scq':
+            student_answer = answer.answer_data.get('selected', '')
+        elif qtype == 'mcq':
+            student_answer = answer.answer_data.get('selected', [])
+            if isinstance(student_answer, str):
+                student_answer = [student_answer]
+            student_answer = sorted([normalize_text(x) for x in student_answer])
+        else:
+            student_answer = answer.answer_data
 
-        except (SCQQuestion.DoesNotExist, MCQQuestion.DoesNotExist, FIBQuestion.DoesNotExist):
-            print(f"‚Äö√Ñ√∂‚àö√ë‚àö‚àÇ‚Äö√†√∂‚Äö√†√á‚Äö√Ñ√∂‚àö√ë‚Äö√Ñ‚Ä†‚Äö√†√∂‚àö√Ü‚Äö√Ñ√∂‚àö‚Ä†‚àö¬Æ‚Äö√†√∂¬¨√Ü Failed to find question with ID: {qid} for type: {qtype}")
-            continue
+        questions_data.append({
+            'question_type': qtype,
+            'question_text': key.question_text,
+            'correct_answer': key.correct_answer,
+            'student_answer': student_answer,
+            'is_correct': answer.is_correct if answer.is_correct is not None else grade_answer(key, answer.answer_data),
+        })
 
     intended_questions = attempt.quiz.assignments.aggregate(total=models.Sum('num_questions'))['total'] or 0
     total_marks = intended_questions * attempt.quiz.marks_per_question
@@ -857,7 +769,7 @@ def list_quiz_results(request):
     if user.role not in ['student', 'teacher', 'admin', 'manager']:
         return Response({"error": "Access denied."}, status=403)
 
-    attempts = StudentQuizAttempt.objects.filter(student=user, completed_at__isnull=False).order_by('-completed_at')
+    attempts = completed_attempts_for(user)
 
     results = []
     for attempt in attempts:
@@ -963,14 +875,7 @@ def submit_answer(request):
 
     # Save or replace answer
     try:
-        StudentAnswer.objects.filter(attempt=attempt, question_id=question_uuid).delete()
-
-        saved_answer = StudentAnswer.objects.create(
-            attempt=attempt,
-            question_type=question_type,
-            question_id=question_uuid,
-            answer_data=answer_data
-        )
+        record_student_answer(attempt, question_uuid, question_type, answer_data)
 
         print("Answer saved successfully")
 
@@ -978,126 +883,17 @@ def submit_answer(request):
         # ✅ LIVE EVALUATION
         # ================
         # 1) Check if THIS answer is correct (no correct options revealed)
-        is_correct = False
-        student_answer = saved_answer.answer_data
-
-        try:
-            if question_type == 'scq':
-                q = SCQQuestion.objects.get(question_id=question_uuid)
-                correct_label = (q.correct_answer or "").strip().upper()
-                option_map = {'A': q.option_a, 'B': q.option_b, 'C': q.option_c, 'D': q.option_d}
-                correct_answer_text = option_map.get(correct_label)
-                selected = student_answer.get('selected') if isinstance(student_answer, dict) else student_answer
-                is_correct = (
-                    normalize_text(selected) == normalize_text(correct_answer_text)
-                    if selected and correct_answer_text else False
-                )
-
-            elif question_type == 'mcq':
-                q = MCQQuestion.objects.get(question_id=question_uuid)
-                correct_labels = [x.strip().lower() for x in q.correct_answers.split(',')]
-                options_map = {
-                    'a': q.option_a,
-                    'b': q.option_b,
-                    'c': q.option_c,
-                    'd': q.option_d
-                }
-                correct_answers_text = sorted([
-                    normalize_text(options_map[label]) for label in correct_labels if label in options_map
-                ])
-
-                selected = student_answer.get('selected', []) if isinstance(student_answer, dict) else student_answer
-                if isinstance(selected, str):
-                    selected = [selected]
-                selected = sorted([normalize_text(x) for x in selected])
-                is_correct = selected == correct_answers_text
-
-            elif question_type == 'fib':
-                q = FIBQuestion.objects.get(question_id=question_uuid)
-                correct_answer_obj = q.correct_answers
-                if isinstance(student_answer, dict) and isinstance(correct_answer_obj, dict):
-                    normalized_student = {
-                        str(k).strip().lower(): normalize_numeric_commas(v)
-                        for k, v in student_answer.items()
-                        if v and str(v).strip()
-                    }
-                    normalized_correct = {
-                        str(k).strip().lower(): normalize_numeric_commas(v)
-                        for k, v in correct_answer_obj.items()
-                        if v and str(v).strip()
-                    }
-                    is_correct = normalized_student == normalized_correct
-                else:
-                    is_correct = False
-
-        except (SCQQuestion.DoesNotExist, MCQQuestion.DoesNotExist, FIBQuestion.DoesNotExist):
-            is_correct = False
-
         # 2) Recompute current score from ALL answers of this attempt
-        all_answers = StudentAnswer.objects.filter(attempt=attempt)
-        correct_count = 0
-
-        for ans in all_answers:
-            qid = ans.question_id
-            qtype = ans.question_type
-            ans_data = ans.answer_data
-
-            try:
-                if qtype == 'scq':
-                    q = SCQQuestion.objects.get(question_id=qid)
-                    correct_label = (q.correct_answer or "").strip().upper()
-                    option_map = {'A': q.option_a, 'B': q.option_b, 'C': q.option_c, 'D': q.option_d}
-                    correct_text = option_map.get(correct_label)
-                    selected = ans_data.get('selected') if isinstance(ans_data, dict) else ans_data
-                    ok = (
-                        normalize_text(selected) == normalize_text(correct_text)
-                        if selected and correct_text else False
-                    )
-
-                elif qtype == 'mcq':
-                    q = MCQQuestion.objects.get(question_id=qid)
-                    correct_labels = [x.strip().lower() for x in q.correct_answers.split(',')]
-                    options_map = {
-                        'a': q.option_a,
-                        'b': q.option_b,
-                        'c': q.option_c,
-                        'd': q.option_d
-                    }
-                    correct_texts = sorted([
-                        normalize_text(options_map[label]) for label in correct_labels if label in options_map
-                    ])
-
-                    selected = ans_data.get('selected', []) if isinstance(ans_data, dict) else ans_data
-                    if isinstance(selected, str):
-                        selected = [selected]
-                    selected = sorted([normalize_text(x) for x in selected])
-                    ok = selected == correct_texts
-
-                elif qtype == 'fib':
-                    q = FIBQuestion.objects.get(question_id=qid)
-                    correct_obj = q.correct_answers
-                    if isinstance(ans_data, dict) and isinstance(correct_obj, dict):
-                        norm_student = {
-                            str(k).strip().lower(): normalize_numeric_commas(v)
-                            for k, v in ans_data.items()
-                            if v and str(v).strip()
-                        }
-                        norm_correct = {
-                            str(k).strip().lower(): normalize_numeric_commas(v)
-                            for k, v in correct_obj.items()
-                            if v and str(v).strip()
-                        }
-                        ok = norm_student == norm_correct
-                    else:
-                        ok = False
-                else:
-                    ok = False
-
-                if ok:
-                    correct_count += 1
+        all_answers = attempt_answers(attempt)
+        answer_keys = get_answer_keys_for_answers(all_answers)
 
-            except (SCQQuestion.DoesNotExist, MCQQuestion.DoesNotExist, FIBQuestion.DoesNotExist):
-                continue
+        is_correct = grade_answer(
+            answer_key_for(answer_keys, question_uuid, question_type), answer_data
+        )
+        correct_count = sum(
+            1 for ans in all_answers
+            if grade_answer(answer_key_for(answer_keys, ans.question_id, ans.question_type), ans.answer_data)
+        )
 
         # Total questions intended for this quiz
         total_questions = quiz.assignments.aggregate(
@@ -1187,11 +983,14 @@ def finalize_quiz(request):
         return Response({'detail': 'Missing attempt ID.'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        attempt = StudentQuizAttempt.objects.get(id=attempt_id, student=user, completed_at__isnull=True)
+        attempt = StudentQuizAttempt.objects.select_related('student').get(
+            id=attempt_id, student=user, completed_at__isnull=True
+        )
     except StudentQuizAttempt.DoesNotExist:
         return Response({'detail': 'Attempt not found or already finalized.'}, status=status.HTTP_404_NOT_FOUND)
 
     quiz = attempt.quiz
+    flush_answer_buffer(attempt)
 
     # 🔧 Normalize submitted_qids → strings
     submitted_qids = set(str(qid) for qid in attempt.answers.values_list('question_id', flat=True))
@@ -1202,34 +1001,16 @@ def finalize_quiz(request):
     selected_qids = set(str(qid) for qid in selected_qids_raw)
 
     # 🔄 Fill missing answers as "unanswered"
-    for q in SCQQuestion.objects.filter(question_id__in=selected_qids):
-        if str(q.question_id) not in submitted_qids:
-            StudentAnswer.objects.create(
-                attempt=attempt,
-                question_type='scq',
-                question_id=q.question_id,
-                answer_data={'selected': None}
-            )
-
-    for q in MCQQuestion.objects.filter(question_id__in=selected_qids):
-        if str(q.question_id) not in submitted_qids:
-            StudentAnswer.objects.create(
-                attempt=attempt,
-                question_type='mcq',
-                question_id=q.question_id,
-                answer_data={'selected': []}
-            )
-
-    for q in FIBQuestion.objects.filter(question_id__in=selected_qids):
-        if str(q.question_id) not in submitted_qids:
-            StudentAnswer.objects.create(
-                attempt=attempt,
-                question_type='fib',
-                question_id=q.question_id,
-                answer_data={}
-            )
+    unanswered = {'scq': {'selected': None}, 'mcq': {'selected': []}, 'fib': {}}
+    selected_keys = get_answer_keys(selected_qids)
+    fill_unanswered(attempt, [
+        (qid, key.question_type, unanswered[key.question_type])
+        for qid, key in selected_keys.items()
+        if key.question_type in unanswered and qid not in submitted_qids
+    ])
 
-    answers = attempt.answers.all()
+    answers = list(attempt.answers.all())
+    answer_keys = get_answer_keys_for_answers(answers)
     correct = 0
     total = 0
     feedback = []
@@ -1238,65 +1019,11 @@ def finalize_quiz(request):
         total += 1
         qid = answer.question_id
         qtype = answer.question_type
-        student_answer = answer.answer_data
-        is_correct = False
-        correct_answer = None
-
-        if qtype == 'scq':
-            try:
-                q = SCQQuestion.objects.get(question_id=qid)
-                correct_label = (q.correct_answer or "").strip().upper()
-                option_map = {'A': q.option_a, 'B': q.option_b, 'C': q.option_c, 'D': q.option_d}
-                correct_answer = option_map.get(correct_label)
-                selected = student_answer.get('selected') if isinstance(student_answer, dict) else student_answer
-                is_correct = (
-                    normalize_text(selected) == normalize_text(correct_answer)
-                    if selected and correct_answer else False
-                )
-            except SCQQuestion.DoesNotExist:
-                continue
-
-        elif qtype == 'mcq':
-            try:
-                q = MCQQuestion.objects.get(question_id=qid)
-                correct_labels = [x.strip().lower() for x in q.correct_answers.split(',')]
-                options_map = {
-                    'a': q.option_a,
-                    'b': q.option_b,
-                    'c': q.option_c,
-                    'd': q.option_d
-                }
-                correct_answer = sorted([
-                    normalize_text(options_map[label]) for label in correct_labels if label in options_map
-                ])
-                selected = student_answer.get('selected', []) if isinstance(student_answer, dict) else student_answer
-                if isinstance(selected, str):
-                    selected = [selected]
-                selected = sorted([normalize_text(x) for x in selected])
-                is_correct = selected == correct_answer
-            except MCQQuestion.DoesNotExist:
-                continue
-
-        elif qtype == 'fib':
-            try:
-                q = FIBQuestion.objects.get(question_id=qid)
-                correct_answer = q.correct_answers
-                if isinstance(student_answer, dict) and isinstance(correct_answer, dict):
-                    normalized_student = {
-                        str(k).strip().lower(): normalize_numeric_commas(v)
-                        for k, v in student_answer.items()
-                        if v and str(v).strip()
-                    }
-                    normalized_correct = {
-                        str(k).strip().lower(): normalize_numeric_commas(v)
-                        for k, v in correct_answer.items()
-                        if v and str(v).strip()
-                    }
-                    is_correct = normalized_student == normalized_correct
-                else:
-                    is_correct = False
-            except FIBQuestion.DoesNotExist:
-                continue
+        key = answer_key_for(answer_keys, qid, qtype)
+        if qtype in ('scq', 'mcq', 'fib') and key is None:
+            continue
+        is_correct = grade_answer(key, answer.answer_data)
+        correct_answer = key.correct_answer if key else None
 
         if is_correct:
             correct += 1
@@ -1304,7 +1031,7 @@ def finalize_quiz(request):
         feedback.append({
             'question_id': str(qid),
             'question_type': qtype,
-            'student_answer': student_answer,
+            'student_answer': answer.answer_data,
             'correct_answer': correct_answer,
             'is_correct': is_correct
         })
@@ -1323,6 +1050,7 @@ def finalize_quiz(request):
     attempt.score = result.marks_obtained
     attempt.completed_at = timezone.now()
     attempt.save()
+    discard_answer_buffer(attempt)
 
     # Progress tracking hook (no scoring/attempt logic change).
     update_topic_progress(user, quiz)
@@ -1496,25 +1224,10 @@ from django.db.models import Max, Q
 def admin_student_quiz_history(request, student_id):
     student = get_object_or_404(User, id=student_id, role='student')
 
-    # Step 1: Fetch all completed attempts (ordered to make latest ones first)
-    all_attempts = (
-        StudentQuizAttempt.objects
-        .filter(student=student, completed_at__isnull=False)
-        .select_related('quiz', 'quiz__subject', 'quiz__grade')
-        .order_by('quiz_id', '-completed_at')
-    )
-
-    # Step 2: Retain only the latest attempt per quiz
-    latest_attempts_map = {}
-    for attempt in all_attempts:
-        key = attempt.quiz_id
-        if key not in latest_attempts_map:
-            latest_attempts_map[key] = attempt  # First = latest due to ordering
+    # Step 1: Fetch the latest completed attempt per quiz
+    latest_attempts = latest_completed_attempts(student)
 
-    # Step 3: Convert to list of attempts
-    latest_attempts = list(latest_attempts_map.values())
-
-    # Step 4: Prepare quiz history
+    # Step 2: Prepare quiz history
     quiz_history = []
     for attempt in latest_attempts:
         quiz = attempt.quiz
@@ -1537,7 +1250,7 @@ def admin_student_quiz_history(request, student_id):
             "attempt_time": attempt.completed_at,
         })
 
-    # Step 5: Sort by latest date
+    # Step 3: Sort by latest date
     quiz_history.sort(key=lambda x: x['attempt_time'], reverse=True)
 
     return render(request, 'admin/core/admin_student_quiz_history.html', {
@@ -1550,12 +1263,8 @@ def admin_student_quiz_history(request, student_id):
 def get_current_user(request):
     user = request.user
 
-    # mark expired if past expiry
-    today = timezone.now().date()
-    if user.subscription_expiry and user.subscription_expiry < today:
-        if user.account_status != 'expired':
-            user.account_status = 'expired'
-            user.save(update_fields=["account_status"])
+    # report expired if past expiry; expire_subscriptions persists it
+    user.account_status = effective_account_status(user)
 
     return Response({
         "id": user.id,
@@ -1881,20 +1590,10 @@ def student_quiz_history_view(request):
 
     student = request.user
 
-    from django.db.models import Max
     from django.utils.timezone import localtime
 
-    # Step 1: Get latest attempt per quiz
-    latest_attempt_ids = StudentQuizAttempt.objects.filter(
-        student=student,
-        completed_at__isnull=False
-    ).values('quiz').annotate(latest=Max('completed_at')).values_list('latest', flat=True)
-
-    # Step 2: Fetch only those latest attempts
-    attempts = StudentQuizAttempt.objects.filter(
-        student=student,
-        completed_at__in=latest_attempt_ids
-    ).order_by('-completed_at')
+    # Latest completed attempt per quiz
+    attempts = latest_completed_attempts(student)
 
     results = []
     for attempt in attempts:
@@ -2113,16 +1812,6 @@ def _teacher_scoped_students_queryset(teacher):
     return teacher_students_queryset(teacher)
 
 
-def _task_assigned_students(task, teacher):
-    scoped = teacher_students_queryset(teacher).select_related("grade")
-    if task.target_students.exists():
-        student_ids = task.target_students.values_list("id", flat=True)
-        return list(scoped.filter(id__in=student_ids).order_by("full_name", "username"))
-    if task.target_grade_id:
-        return list(scoped.filter(grade_id=task.target_grade_id).order_by("full_name", "username"))
-    return []
-
-
 def _quiz_total_marks(quiz):
     total_questions = quiz.assignments.aggregate(total=Sum("num_questions"))["total"] or 0
     return total_questions * quiz.marks_per_question
@@ -2135,26 +1824,6 @@ def _attempt_percentage(attempt, quiz):
     return round((attempt.score / total_marks) * 100, 2)
 
 
-def _latest_attempts_map(student_ids, quiz_ids):
-    if not student_ids or not quiz_ids:
-        return {}
-
-    attempts_map = {}
-    attempts_qs = (
-        StudentQuizAttempt.objects.filter(
-            student_id__in=student_ids,
-            quiz_id__in=quiz_ids,
-            completed_at__isnull=False,
-        )
-        .order_by("student_id", "quiz_id", "-completed_at")
-    )
-    for attempt in attempts_qs:
-        key = (attempt.student_id, attempt.quiz_id)
-        if key not in attempts_map:
-            attempts_map[key] = attempt
-    return attempts_map
-
-
 def _task_status_label(task):
     today = timezone.now().date()
     if not task.is_active:
@@ -2225,8 +1894,9 @@ def school_dashboard_summary(request):
     if not school:
         return Response({'error': 'No school is linked to this account.'}, status=400)
 
-    students_count = User.objects.filter(school=school, role='student').count()
-    teachers_count = User.objects.filter(school=school, role='teacher').count()
+    roster_counts = get_school_snapshot(school, 'roster_counts')
+    students_count = roster_counts['students']
+    teachers_count = roster_counts['teachers']
     total_users = students_count + teachers_count
 
     max_students = school.max_students
@@ -2513,6 +2183,19 @@ def school_upload_roster(request):
 
     send_welcome_emails = _parse_request_bool(request.data.get('send_welcome_emails'))
 
+    if _parse_request_bool(request.data.get('background')):
+        job = enqueue_roster_import(
+            upload,
+            school=school,
+            created_by=user,
+            allowed_roles={'student', 'teacher'},
+            send_welcome_emails=send_welcome_emails,
+        )
+        return Response({
+            'job': serialize_roster_import_job(job),
+            'message': 'Roster import queued. Poll the job for progress.',
+        }, status=202)
+
     result = import_roster_from_file(
         upload,
         school=school,
@@ -2544,6 +2227,30 @@ def school_upload_roster(request):
     return Response(response_data, status=200)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, HasPaidSubscription])
+def school_roster_import_status(request, job_id):
+    user = request.user
+    if user.role != 'school_admin':
+        return Response({'error': 'Only school admins can access this endpoint.'}, status=403)
+
+    school = user.school
+    if not school:
+        return Response({'error': 'No school is linked to this account.'}, status=400)
+
+    job = RosterImportJob.objects.filter(id=job_id, school=school).first()
+    if not job:
+        return Response({'error': 'Roster import not found.'}, status=404)
+
+    response_data = serialize_roster_import_job(job)
+    if job.status == RosterImportJob.STATUS_COMPLETED:
+        response_data['onboarding'] = {
+            'roster_uploaded': school_has_roster(school),
+            'ready': school.is_subscription_active and school_has_roster(school),
+        }
+    return Response(response_data, status=200)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, HasPaidSubscription])
 def school_analytics_summary(request):
@@ -2555,7 +2262,7 @@ def school_analytics_summary(request):
     if not school:
         return Response({'error': 'No school is linked to this account.'}, status=400)
 
-    return Response(build_school_analytics_summary(school), status=200)
+    return Response(get_school_snapshot(school, 'analytics_summary'), status=200)
 
 
 @api_view(['GET'])
@@ -2614,7 +2321,7 @@ def school_teacher_analytics(request):
     if not school:
         return Response({'error': 'No school is linked to this account.'}, status=400)
 
-    return Response(build_school_teacher_analytics(school), status=200)
+    return Response(get_school_snapshot(school, 'teacher_analytics'), status=200)
 
 
 @api_view(['GET'])
@@ -2701,36 +2408,28 @@ def teacher_dashboard_summary(request):
     completed_task_items_count = 0
     grade_pending = defaultdict(int)
 
-    for task in active_tasks:
-        assigned = _task_assigned_students(task, user)
-        task_quizzes = [tq for tq in task.task_quizzes.all() if tq.quiz]
-        quiz_ids = [tq.quiz.id for tq in task_quizzes]
-        attempts_map = _latest_attempts_map([s.id for s in assigned], quiz_ids)
-
-        for student in assigned:
+    resolved = resolve_task_assignments(active_tasks, _teacher_scoped_students_queryset(user))
+    for assignment in resolved.assignments:
+        for student in assignment.students:
             grade_name = student.grade.name if student.grade else "Unassigned Grade"
-            for tq in task_quizzes:
-                if attempts_map.get((student.id, tq.quiz.id)):
+            for tq in assignment.task_quizzes:
+                if resolved.is_completed(student.id, tq.quiz_id):
                     completed_task_items_count += 1
                 else:
                     pending_task_items_count += 1
                     student_stats[student.id]["pending_task_items"] += 1
                     grade_pending[grade_name] += 1
 
-    attempts_qs = StudentQuizAttempt.objects.filter(
-        student_id__in=student_ids,
-        completed_at__isnull=False,
-    ).select_related("quiz", "student")
-
-    latest_for_avg = {}
-    for att in attempts_qs.order_by("student_id", "quiz_id", "-completed_at"):
-        key = (att.student_id, att.quiz_id)
-        if key not in latest_for_avg:
-            latest_for_avg[key] = att
+    latest_attempts = list(
+        latest_attempts_queryset(student_id__in=student_ids)
+        .select_related("quiz")
+        .order_by("student_id", "quiz_id")
+    )
+    quiz_totals = quiz_total_marks_map(att.quiz for att in latest_attempts)
 
     all_percentages = []
-    for att in latest_for_avg.values():
-        pct = _attempt_percentage(att, att.quiz)
+    for att in latest_attempts:
+        pct = percentage_of_total(att.score, quiz_totals.get(att.quiz_id))
         all_percentages.append(pct)
         student_stats[att.student_id]["percentages"].append(pct)
         student_stats[att.student_id]["attempt_count"] += 1
@@ -2795,11 +2494,14 @@ def teacher_dashboard_summary(request):
         .select_related("student", "quiz")
         .order_by("-completed_at")[:5]
     )
+    quiz_totals.update(quiz_total_marks_map(
+        att.quiz for att in recent_attempts if att.quiz_id not in quiz_totals
+    ))
     recent_activity = [
         {
             "student_name": att.student.full_name or att.student.username,
             "quiz_title": att.quiz.title,
-            "percentage": _attempt_percentage(att, att.quiz),
+            "percentage": percentage_of_total(att.score, quiz_totals.get(att.quiz_id)),
             "completed_at": att.completed_at.strftime("%Y-%m-%d") if att.completed_at else None,
         }
         for att in recent_attempts
@@ -2988,19 +2690,15 @@ def teacher_tasks_list(request):
         .order_by('-created_at')
     )
 
-    data = []
-    for t in tasks:
-        task_quizzes = [tq for tq in t.task_quizzes.all() if tq.quiz]
-        quiz_objs = [tq.quiz for tq in task_quizzes]
-        quiz_totals = {q.id: _quiz_total_marks(q) for q in quiz_objs}
+    resolved = resolve_task_assignments(tasks, _teacher_scoped_students_queryset(user))
 
-        assigned_students = _task_assigned_students(t, user)
-        student_ids = [s.id for s in assigned_students]
-        quiz_ids = [q.id for q in quiz_objs]
-        attempts_map = _latest_attempts_map(student_ids, quiz_ids)
-
-        is_grade_wide = bool(t.target_grade_id) and not t.target_students.exists()
-        target_type = "grade_wide" if is_grade_wide else "selected_students"
+    data = []
+    for assignment in resolved.assignments:
+        t = assignment.task
+        task_quizzes = assignment.task_quizzes
+        quiz_objs = assignment.quizzes
+        assigned_students = assignment.students
+        target_type = "grade_wide" if assignment.is_grade_wide else "selected_students"
 
         data.append({
             'task_id': t.id,
@@ -3014,7 +2712,7 @@ def teacher_tasks_list(request):
             'target_students_count': len(assigned_students),
             'quizzes': [{'id': q.id, 'title': q.title} for q in quiz_objs],
             'assigned_students': [
-                _serialize_student_task_progress(s, task_quizzes, attempts_map, quiz_totals)
+                _serialize_student_task_progress(s, task_quizzes, resolved.attempts_map, resolved.quiz_totals)
                 for s in assigned_students
             ],
             'created_at': t.created_at.strftime('%Y-%m-%d') if t.created_at else None,
@@ -3043,9 +2741,17 @@ def teacher_delete_task(request, task_id):
 
 
 
+STUDENT_TASKS_PAGE_SIZE = 20
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, HasPaidSubscription])
 def student_tasks_list(request):
+    """
+    GET /api/student/tasks/
+    Optional ?page=&page_size= paginate the task list; the summary always
+    covers every visible task.
+    """
     user = request.user
 
     if user.role != 'student':
@@ -3062,21 +2768,68 @@ def student_tasks_list(request):
     if student_grade is not None:
         filters |= Q(target_grade=student_grade)
 
-    qs = (
+    task_ids = list(
         qs.filter(filters)
         .distinct()
-        .select_related('teacher', 'target_grade')
-        .prefetch_related('task_quizzes__quiz')
-        .order_by('-created_at')
+        .order_by('-created_at', '-id')
+        .values_list('id', flat=True)
     )
 
-    tasks_out = []
+    completed_quiz_ids = completed_quiz_ids_for(user)
+
+    quiz_ids_by_task = defaultdict(list)
+    for task_id, quiz_id in TeacherTaskQuiz.objects.filter(
+        task_id__in=task_ids, quiz__isnull=False
+    ).values_list('task_id', 'quiz_id'):
+        quiz_ids_by_task[task_id].append(quiz_id)
+
     pending_quiz_count = 0
     pending_tasks_count = 0
+    for task_id in task_ids:
+        pending = [qid for qid in quiz_ids_by_task[task_id] if qid not in completed_quiz_ids]
+        pending_quiz_count += len(pending)
+        if pending:
+            pending_tasks_count += 1
+
+    summary = {
+        "tasks_count": len(task_ids),
+        "pending_quiz_count": pending_quiz_count,
+        "pending_tasks_count": pending_tasks_count,
+    }
+
+    pagination = None
+    page_ids = task_ids
+    if 'page' in request.GET or 'page_size' in request.GET:
+        try:
+            page_size = min(max(int(request.GET.get('page_size', STUDENT_TASKS_PAGE_SIZE)), 1), 100)
+        except (TypeError, ValueError):
+            page_size = STUDENT_TASKS_PAGE_SIZE
+        page = Paginator(task_ids, page_size).get_page(request.GET.get('page'))
+        page_ids = list(page.object_list)
+        pagination = {
+            "page": page.number,
+            "page_size": page_size,
+            "total_pages": page.paginator.num_pages,
+            "has_next": page.has_next(),
+        }
 
-    for task in qs:
+    tasks = (
+        TeacherTask.objects.filter(id__in=page_ids)
+        .select_related('teacher', 'target_grade')
+        .prefetch_related(
+            Prefetch(
+                'task_quizzes',
+                queryset=TeacherTaskQuiz.objects.select_related(
+                    'quiz', 'quiz__grade', 'quiz__subject', 'quiz__chapter'
+                ),
+            )
+        )
+        .order_by('-created_at', '-id')
+    ) if page_ids else []
+
+    tasks_out = []
+    for task in tasks:
         quizzes_out = []
-        task_has_pending_quiz = False
 
         # IMPORTANT: quizzes are through TeacherTaskQuiz
         for tq in task.task_quizzes.all():
@@ -3084,28 +2837,15 @@ def student_tasks_list(request):
             if not quiz:
                 continue
 
-            attempted = StudentQuizAttempt.objects.filter(
-                student=user,
-                quiz=quiz,
-                completed_at__isnull=False
-            ).exists()
-
-            if not attempted:
-                pending_quiz_count += 1
-                task_has_pending_quiz = True
-
             quizzes_out.append({
                 "quiz_id": quiz.id,
                 "title": quiz.title,
                 "grade": quiz.grade.name if quiz.grade else "",
                 "subject": quiz.subject.name if quiz.subject else "",
                 "chapter": quiz.chapter.name if quiz.chapter else "",
-                "attempted": attempted,
+                "attempted": quiz.id in completed_quiz_ids,
             })
 
-        if quizzes_out and task_has_pending_quiz:
-            pending_tasks_count += 1
-
         tasks_out.append({
             "task_id": task.id,
             "message": task.message,
@@ -3125,14 +2865,13 @@ def student_tasks_list(request):
             "quizzes": quizzes_out,
         })
 
-    return Response({
+    response_data = {
         "tasks": tasks_out,
-        "summary": {
-            "tasks_count": len(tasks_out),
-            "pending_quiz_count": pending_quiz_count,
-            "pending_tasks_count": pending_tasks_count,
-        }
-    }, status=200)
+        "summary": summary,
+    }
+    if pagination is not None:
+        response_data["pagination"] = pagination
+    return Response(response_data, status=200)
 
 def privacy_policy(request):
     return render(request, "privacy_policy.html")
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 from datetime import timedelta
 import dj_database_url
 
@@ -104,6 +105,80 @@ else:
         }
     }
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# core/cache_layer.py holds the named-cache helpers.
+#
+# `users` and `analytics` are written on hot paths (every authenticated
+# request, every dashboard rebuild) and, like the answer-key versions in
+# `catalog`, must be invalidated on every web instance at once, so they always
+# use database tables shared through the main database (created by core
+# migrations).
+#
+# `default` is shared by every gunicorn worker on the host:
+# CACHE_BACKEND=file (default) keeps entries under CACHE_DIR; CACHE_BACKEND=db
+# uses database tables (run `python manage.py createcachetable` after
+# switching). FileBasedCache has no index: every set() lists the cache's whole
+# directory to decide whether to cull, and past MAX_ENTRIES it also deletes a
+# random third of the files, so it only suits small, rarely written caches.
+#
+# Tests run against per-process copies of these caches (see TEST_RUNNER).
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file").lower()
+CACHE_DIR = Path(os.getenv("CACHE_DIR", Path(tempfile.gettempdir()) / "learnify-cache"))
+
+# name -> (default timeout in seconds, max entries)
+CACHE_NAMES = {
+    "default": (300, 5000),
+    "catalog": (60 * 60, 5000),      # grades, subjects, quizzes
+    "analytics": (15 * 60, 5000),    # per-school dashboards and reports
+    "users": (60, 20000),            # short-lived authenticated user records
+}
+DATABASE_CACHE_NAMES = {"catalog", "analytics", "users"}
+
+
+def _cache_config(name, timeout, max_entries):
+    if CACHE_BACKEND == "db" or name in DATABASE_CACHE_NAMES:
+        backend = "django.core.cache.backends.db.DatabaseCache"
+        location = f"learnify_cache_{name}"
+    else:
+        backend = "django.core.cache.backends.filebased.FileBasedCache"
+        location = str(CACHE_DIR / name)
+    return {
+        "BACKEND": backend,
+        "LOCATION": location,
+        "TIMEOUT": timeout,
+        "OPTIONS": {"MAX_ENTRIES": max_entries},
+    }
+
+
+CACHES = {name: _cache_config(name, *limits) for name, limits in CACHE_NAMES.items()}
+
+# Write-behind buffers for in-progress attempts (ANSWER_WRITE_BEHIND). They
+# must be shared by every worker and never evicted before they are flushed,
+# so they only live in a Redis server configured with
+# `maxmemory-policy noeviction`. Without ANSWER_BUFFER_REDIS_URL there is no
+# "answers" cache and answers are saved directly.
+if os.getenv("ANSWER_BUFFER_REDIS_URL"):
+    CACHES["answers"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("ANSWER_BUFFER_REDIS_URL"),
+        "TIMEOUT": 6 * 60 * 60,
+    }
+
+# Swaps the file caches for in-memory ones while tests run.
+TEST_RUNNER = "learnify.test_runner.LocalCacheTestRunner"
+
+# Hold in-progress quiz answers in the "answers" cache and write them in bulk
+# when the attempt is finalized (and every minute via flush_answer_buffers),
+# instead of one row write per submit_answer call. Needs ANSWER_BUFFER_REDIS_URL.
+ANSWER_WRITE_BEHIND = os.getenv("ANSWER_WRITE_BEHIND", "0") == "1"
+
+# Completed quiz attempts older than this move to the archive tables when
+# `python manage.py archive_attempts` runs (core/attempt_archive.py).
+ATTEMPT_ARCHIVE_AFTER_DAYS = int(os.getenv("ATTEMPT_ARCHIVE_AFTER_DAYS", "365"))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -150,6 +225,10 @@ CKEDITOR_UPLOAD_PATH = "uploads"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads that must never be served (roster spreadsheets with passwords);
+# see core/storage.py. Roster import workers need to reach this directory.
+PRIVATE_MEDIA_ROOT = Path(os.getenv("PRIVATE_MEDIA_ROOT", BASE_DIR / "private_media"))
+
 # Optional: dedicated local folder for backups/exports
 BACKUP_DIR = BASE_DIR / "backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
@@ -209,7 +288,7 @@ CKEDITOR_CONFIGS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.SchoolAwareJWTAuthentication',
     ),
 }
 
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def local_test_caches():
+    """
+    settings.CACHES with every cache swapped for a per-process LocMemCache,
+    so a test run never reads or clears the caches that the site on this
+    host (or its database) is using.
+    """
+    return {
+        name: {
+            **config,
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": f"learnify-test-{name}",
+        }
+        for name, config in settings.CACHES.items()
+    }
+
+
+class LocalCacheTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_override = override_settings(CACHES=local_test_caches())
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,9 +0,0 @@
-#!/bin/bash
-# Activate virtual environment
-source /Users/syedamirshah/Documents/Learnify-Amir/backend/venv/bin/activate
-
-# Navigate to backend folder
-cd /Users/syedamirshah/Documents/Learnify-Amir/backend
-
-# Run the Django backup command
-python manage.py backupdata
\ No newline at end of file
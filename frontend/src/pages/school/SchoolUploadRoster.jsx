@@ -1,10 +1,14 @@
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
 import axiosInstance from "../../utils/axiosInstance";
 import SchoolPageShell from "../../components/school/SchoolPageShell";
 import {
+  ROSTER_IMPORT_POLL_MS,
   buildRosterUploadFormData,
   formatRosterEmailSummary,
+  isRosterImportFinished,
+  rosterImportJobToResult,
+  rosterImportProgressPercent,
   shouldShowRosterEmailResults,
 } from "../../utils/schoolRosterUploadHelpers";
 
@@ -27,6 +31,37 @@ export default function SchoolUploadRoster() {
   const [error, setError] = useState("");
   const [result, setResult] = useState(null);
   const [lastUploadSentEmails, setLastUploadSentEmails] = useState(false);
+  const [importJob, setImportJob] = useState(null);
+
+  useEffect(() => {
+    if (!importJob || isRosterImportFinished(importJob)) {
+      return undefined;
+    }
+
+    const timer = window.setTimeout(async () => {
+      try {
+        const res = await axiosInstance.get(`school/roster-imports/${importJob.id}/`);
+        const job = res.data;
+        setImportJob(job);
+        if (job.status === "completed") {
+          setResult(rosterImportJobToResult(job));
+        } else if (job.status === "failed") {
+          setError(job.error || "Failed to upload roster.");
+        }
+      } catch (err) {
+        setImportJob(null);
+        setError(
+          err?.response?.data?.error ||
+            err?.response?.data?.detail ||
+            "Lost track of the roster import. Refresh to check the roster."
+        );
+      }
+    }, ROSTER_IMPORT_POLL_MS);
+
+    return () => window.clearTimeout(timer);
+  }, [importJob]);
+
+  const importInProgress = Boolean(importJob) && !isRosterImportFinished(importJob);
 
   const handleDownloadTemplate = async () => {
     setDownloading(true);
@@ -55,14 +90,22 @@ export default function SchoolUploadRoster() {
     setUploading(true);
     setError("");
     setResult(null);
+    setImportJob(null);
 
-    const formData = buildRosterUploadFormData(selectedFile, { sendWelcomeEmails });
+    const formData = buildRosterUploadFormData(selectedFile, {
+      sendWelcomeEmails,
+      background: true,
+    });
 
     try {
       const res = await axiosInstance.post("school/upload-roster/", formData, {
         headers: { "Content-Type": "multipart/form-data" },
       });
-      setResult(res.data || null);
+      if (res.status === 202 && res.data?.job) {
+        setImportJob(res.data.job);
+      } else {
+        setResult(res.data || null);
+      }
       setLastUploadSentEmails(sendWelcomeEmails);
       setSelectedFile(null);
       event.target.reset();
@@ -127,7 +170,7 @@ export default function SchoolUploadRoster() {
             </label>
             <button
               type="submit"
-              disabled={uploading || !selectedFile}
+              disabled={uploading || importInProgress || !selectedFile}
               className="rounded-2xl bg-[#42b72a] px-5 py-3 text-sm font-bold text-white shadow-sm transition hover:bg-green-700 disabled:cursor-not-allowed disabled:opacity-60"
             >
               {uploading ? "Uploading..." : "Upload Roster"}
@@ -135,6 +178,23 @@ export default function SchoolUploadRoster() {
           </form>
         </section>
 
+        {importInProgress ? (
+          <section className="rounded-3xl border border-emerald-200 bg-white p-5 shadow-sm">
+            <h2 className="text-lg font-black text-emerald-950">Importing Roster</h2>
+            <p className="mt-2 text-sm text-gray-600">
+              {importJob.total_rows
+                ? `Processed ${importJob.processed_rows} of ${importJob.total_rows} rows.`
+                : "Waiting for the import to start..."}
+            </p>
+            <div className="mt-4 h-3 w-full overflow-hidden rounded-full bg-emerald-100">
+              <div
+                className="h-full rounded-full bg-[#42b72a] transition-all"
+                style={{ width: `${rosterImportProgressPercent(importJob)}%` }}
+              />
+            </div>
+          </section>
+        ) : null}
+
         {error ? (
           <p className="rounded-2xl border border-red-200 bg-red-50 p-4 text-red-700">{error}</p>
         ) : null}
@@ -1,14 +1,47 @@
 export const ROSTER_SEND_WELCOME_EMAILS_FIELD = "send_welcome_emails";
+export const ROSTER_BACKGROUND_FIELD = "background";
+export const ROSTER_IMPORT_POLL_MS = 2000;
 
-export function buildRosterUploadFormData(file, { sendWelcomeEmails = false } = {}) {
+export function buildRosterUploadFormData(
+  file,
+  { sendWelcomeEmails = false, background = false } = {}
+) {
   const formData = new FormData();
   formData.append("file", file);
   if (sendWelcomeEmails) {
     formData.append(ROSTER_SEND_WELCOME_EMAILS_FIELD, "true");
   }
+  if (background) {
+    formData.append(ROSTER_BACKGROUND_FIELD, "true");
+  }
   return formData;
 }
 
+export function isRosterImportFinished(job) {
+  return job?.status === "completed" || job?.status === "failed";
+}
+
+export function rosterImportProgressPercent(job) {
+  if (!job?.total_rows) {
+    return 0;
+  }
+  return Math.min(100, Math.round((job.processed_rows / job.total_rows) * 100));
+}
+
+export function rosterImportJobToResult(job) {
+  const uploaded = job?.uploaded ?? 0;
+  const skipped = job?.skipped ?? 0;
+  return {
+    uploaded,
+    skipped,
+    errors: job?.errors || [],
+    emails_sent: job?.emails_sent,
+    emails_skipped: job?.emails_skipped,
+    onboarding: job?.onboarding,
+    message: `Imported ${uploaded} user(s). Skipped ${skipped} existing username(s).`,
+  };
+}
+
 export function shouldShowRosterEmailResults(result, sendWelcomeEmails) {
   if (!sendWelcomeEmails || !result) {
     return false;
@@ -1,8 +1,12 @@
 import { describe, expect, it } from "vitest";
 import {
+  ROSTER_BACKGROUND_FIELD,
   ROSTER_SEND_WELCOME_EMAILS_FIELD,
   buildRosterUploadFormData,
   formatRosterEmailSummary,
+  isRosterImportFinished,
+  rosterImportJobToResult,
+  rosterImportProgressPercent,
   shouldShowRosterEmailResults,
 } from "./schoolRosterUploadHelpers";
 
@@ -37,4 +41,31 @@ describe("schoolRosterUploadHelpers", () => {
       emailsSkipped: 0,
     });
   });
+
+  it("submits background only when requested", () => {
+    const file = new File(["x"], "roster.xlsx");
+    expect(buildRosterUploadFormData(file).get(ROSTER_BACKGROUND_FIELD)).toBeNull();
+    expect(
+      buildRosterUploadFormData(file, { background: true }).get(ROSTER_BACKGROUND_FIELD)
+    ).toBe("true");
+  });
+
+  it("tracks background import progress", () => {
+    expect(rosterImportProgressPercent({ processed_rows: 50, total_rows: 200 })).toBe(25);
+    expect(rosterImportProgressPercent({ processed_rows: 0, total_rows: 0 })).toBe(0);
+    expect(isRosterImportFinished({ status: "running" })).toBe(false);
+    expect(isRosterImportFinished({ status: "completed" })).toBe(true);
+    expect(isRosterImportFinished({ status: "failed" })).toBe(true);
+  });
+
+  it("converts a finished job into an import result", () => {
+    const result = rosterImportJobToResult({
+      uploaded: 3,
+      skipped: 1,
+      errors: [{ row: 4, error: "Grade is required." }],
+    });
+    expect(result.uploaded).toBe(3);
+    expect(result.errors).toHaveLength(1);
+    expect(result.message).toBe("Imported 3 user(s). Skipped 1 existing username(s).");
+  });
 });